@@ -1,5 +1,7 @@
 import structlog
 import logging
+import json
+import os
 
 structlog.configure(
     processors=[
@@ -29,3 +31,84 @@ SUPPORTED_CONTENT_TYPES = {
     "text/yaml",
     "text/xml",
 }
+
+DEFAULT_EMBEDDING_MODEL = "BAAI/bge-base-en-v1.5"
+DEFAULT_RERANKER_MODEL = "jinaai/jina-reranker-v2-base-multilingual"
+
+# Load the default models in the background at startup instead of on first use
+WARM_UP = os.getenv("HEIDA_WARM_UP", "true").lower() in ("1", "true", "yes")
+
+# Chunk sizes are counted in embedding model tokens, or in characters with "chars"
+CHUNK_UNIT = os.getenv("HEIDA_CHUNK_UNIT", "tokens")
+CHUNK_SIZE = int(os.getenv("HEIDA_CHUNK_SIZE", "128"))
+CHUNK_OVERLAP = int(os.getenv("HEIDA_CHUNK_OVERLAP", "16"))
+
+# BM25 term analysis: optional "porter" stemming and "english" stopword removal
+ANALYZER_STEMMER = os.getenv("HEIDA_ANALYZER_STEMMER", "")
+ANALYZER_STOPWORDS = os.getenv("HEIDA_ANALYZER_STOPWORDS", "")
+
+# Hybrid retrieval: candidates taken from each retriever and how they are fused
+SEMANTIC_CANDIDATES = int(os.getenv("HEIDA_SEMANTIC_CANDIDATES", "50"))
+LEXICAL_CANDIDATES = int(os.getenv("HEIDA_LEXICAL_CANDIDATES", "50"))
+FUSION_METHOD = os.getenv("HEIDA_FUSION_METHOD", "rrf")
+FUSION_RRF_K = float(os.getenv("HEIDA_FUSION_RRF_K", "60"))
+FUSION_SEMANTIC_WEIGHT = float(os.getenv("HEIDA_FUSION_SEMANTIC_WEIGHT", "0.5"))
+
+# Reranking policies per endpoint ("retrieve", "retrieve_batch", "collections",
+# "search"), falling back to "default"; see RerankPolicy for the parameters
+RERANK_POLICIES = json.loads(os.getenv("HEIDA_RERANK_POLICIES", "{}"))
+
+INDEX_DIR = os.getenv("HEIDA_INDEX_DIR", "data/indexes")
+# Collections are merged into one segment in the background once they have more
+# segments, or a larger fraction of deleted chunks, than these limits
+MERGE_MAX_SEGMENTS = int(os.getenv("HEIDA_MERGE_MAX_SEGMENTS", "8"))
+MERGE_DELETED_RATIO = float(os.getenv("HEIDA_MERGE_DELETED_RATIO", "0.3"))
+EMBEDDING_CACHE_PATH = os.getenv(
+    "HEIDA_EMBEDDING_CACHE_PATH", "data/cache/embeddings.sqlite3"
+)
+EMBEDDING_CACHE_MAX_ITEMS = int(
+    os.getenv("HEIDA_EMBEDDING_CACHE_MAX_ITEMS", "100000")
+)
+
+# Search result and fetched page caches for /api/v1/search
+WEB_CACHE_PATH = os.getenv("HEIDA_WEB_CACHE_PATH", "data/cache/web.sqlite3")
+WEB_CACHE_MAX_MEMORY_ITEMS = int(os.getenv("HEIDA_WEB_CACHE_MAX_MEMORY_ITEMS", "1000"))
+WEB_CACHE_MAX_DISK_ITEMS = int(os.getenv("HEIDA_WEB_CACHE_MAX_DISK_ITEMS", "50000"))
+SEARCH_CACHE_TTL = float(os.getenv("HEIDA_SEARCH_CACHE_TTL", "3600"))
+PAGE_CACHE_TTL = float(os.getenv("HEIDA_PAGE_CACHE_TTL", "604800"))
+PAGE_CACHE_FRESH_SECONDS = float(os.getenv("HEIDA_PAGE_CACHE_FRESH_SECONDS", "600"))
+
+# Outbound HTTP: pooled connections, request concurrency and response size caps
+HTTP_MAX_CONNECTIONS = int(os.getenv("HEIDA_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_CONNECTIONS_PER_HOST = int(
+    os.getenv("HEIDA_HTTP_MAX_CONNECTIONS_PER_HOST", "8")
+)
+FETCH_MAX_CONCURRENCY = int(os.getenv("HEIDA_FETCH_MAX_CONCURRENCY", "32"))
+FETCH_MAX_PER_HOST = int(os.getenv("HEIDA_FETCH_MAX_PER_HOST", "4"))
+FETCH_MAX_BYTES = int(os.getenv("HEIDA_FETCH_MAX_BYTES", str(5 * 1024 * 1024)))
+
+# Pages not fetched this many seconds after a search starts are dropped
+SEARCH_DEADLINE_SECONDS = float(os.getenv("HEIDA_SEARCH_DEADLINE_SECONDS", "8"))
+
+# Worker pools for CPU-bound stages; 0 process workers runs them in threads instead
+THREAD_POOL_WORKERS = int(os.getenv("HEIDA_THREAD_POOL_WORKERS", "8"))
+PROCESS_POOL_WORKERS = int(
+    os.getenv("HEIDA_PROCESS_POOL_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+
+# Parallel PDF page extraction; at most this many page ranges are extracted at once
+PDF_EXTRACT_WORKERS = int(
+    os.getenv("HEIDA_PDF_EXTRACT_WORKERS", str(PROCESS_POOL_WORKERS))
+)
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("HEIDA_PDF_PARALLEL_MIN_PAGES", "32"))
+
+# Micro-batching of query encoding and reranking across concurrent requests
+BATCH_WINDOW_MS = float(os.getenv("HEIDA_BATCH_WINDOW_MS", "5"))
+BATCH_MAX_SIZE = int(os.getenv("HEIDA_BATCH_MAX_SIZE", "128"))
+
+MAX_BATCH_QUERIES = int(os.getenv("HEIDA_MAX_BATCH_QUERIES", "100"))
+
+# Vector index backend for stored collections: "flat" (exact), "ivf" or "hnsw"
+VECTOR_INDEX = os.getenv("HEIDA_VECTOR_INDEX", "flat")
+VECTOR_INDEX_PARAMS = json.loads(os.getenv("HEIDA_VECTOR_INDEX_PARAMS", "{}"))
+VECTOR_INDEX_MIN_SIZE = int(os.getenv("HEIDA_VECTOR_INDEX_MIN_SIZE", "10000"))
@@ -0,0 +1,200 @@
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+from app.core.config import PROCESS_POOL_WORKERS, THREAD_POOL_WORKERS, logger
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import threading
+import time
+
+
+class PoolStats:
+    """
+    Queue and wait-time counters for one worker pool.
+
+    Attributes:
+        max_workers (int): Size of the pool
+        submitted (int): Tasks submitted
+        completed (int): Tasks finished, successfully or not
+        failed (int): Tasks that raised
+        wait_seconds_total (float): Sum of time tasks spent queued before starting
+        wait_seconds_max (float): Longest time a task spent queued
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._lock = threading.Lock()
+
+    def on_submit(self) -> None:
+        with self._lock:
+            self.submitted += 1
+
+    def on_start(self, wait_seconds: float) -> None:
+        with self._lock:
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+
+    def on_done(self, future: Future) -> None:
+        with self._lock:
+            self.completed += 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+
+    def as_dict(self) -> Dict:
+        with self._lock:
+            in_flight = self.submitted - self.completed
+            started = self.completed or 1
+            return {
+                "max_workers": self.max_workers,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "in_flight": in_flight,
+                "queue_depth": max(0, in_flight - self.max_workers),
+                "wait_seconds_mean": self.wait_seconds_total / started,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+
+def _run_timed(fn: Callable, args, kwargs):
+    """Run fn in a pool worker and report when it started."""
+    started_at = time.time()
+    return started_at, fn(*args, **kwargs)
+
+
+class Executor:
+    """
+    Dispatches CPU-bound pipeline stages off the asyncio event loop.
+
+    Model inference (SentenceTransformer.encode, CrossEncoder.predict) releases the
+    GIL inside torch and runs in a thread pool. Pure-Python work such as PDF parsing
+    holds the GIL and runs in a process pool instead. Both pools are created lazily
+    and record queue depth and wait time.
+
+    Setting `process_workers` to 0 disables the process pool; process-bound work then
+    runs in the thread pool.
+
+    Attributes:
+        thread_workers (int): Thread pool size (default: HEIDA_THREAD_POOL_WORKERS)
+        process_workers (int): Process pool size (default: HEIDA_PROCESS_POOL_WORKERS)
+    """
+
+    def __init__(
+        self,
+        thread_workers: int = THREAD_POOL_WORKERS,
+        process_workers: int = PROCESS_POOL_WORKERS,
+    ):
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._thread_stats = PoolStats(thread_workers)
+        self._process_stats = PoolStats(process_workers)
+        self._lock = threading.Lock()
+
+    def _thread_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(
+                    max_workers=self.thread_workers, thread_name_prefix="heida-worker"
+                )
+            return self._threads
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._processes is None:
+                # Forking a process that has loaded torch can deadlock, so spawn
+                self._processes = ProcessPoolExecutor(
+                    max_workers=self.process_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._processes
+
+    def submit_thread(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Submit fn to the thread pool, propagating the caller's contextvars.
+
+        Returns:
+            Future: Resolves to the return value of fn
+        """
+        context = contextvars.copy_context()
+        return self._submit(
+            self._thread_pool(),
+            self._thread_stats,
+            functools.partial(context.run, fn),
+            args,
+            kwargs,
+        )
+
+    def submit_process(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Submit fn to the process pool, or the thread pool when it is disabled.
+
+        fn and its arguments must be picklable.
+
+        Returns:
+            Future: Resolves to the return value of fn
+        """
+        if self.process_workers <= 0:
+            return self.submit_thread(fn, *args, **kwargs)
+        return self._submit(self._process_pool(), self._process_stats, fn, args, kwargs)
+
+    def _submit(self, pool, stats: PoolStats, fn, args, kwargs) -> Future:
+        submitted_at = time.time()
+        stats.on_submit()
+        inner = pool.submit(_run_timed, fn, args, kwargs)
+        outer: Future = Future()
+
+        def done(future: Future) -> None:
+            stats.on_done(future)
+            if future.cancelled():
+                outer.cancel()
+            elif future.exception() is not None:
+                outer.set_exception(future.exception())
+            else:
+                started_at, result = future.result()
+                stats.on_start(max(0.0, started_at - submitted_at))
+                outer.set_result(result)
+
+        inner.add_done_callback(done)
+        return outer
+
+    async def run_in_thread(self, fn: Callable, *args, **kwargs):
+        """Await fn running in the thread pool."""
+        return await asyncio.wrap_future(self.submit_thread(fn, *args, **kwargs))
+
+    async def run_in_process(self, fn: Callable, *args, **kwargs):
+        """Await fn running in the process pool."""
+        return await asyncio.wrap_future(self.submit_process(fn, *args, **kwargs))
+
+    def stats(self) -> Dict:
+        """
+        Report queue depth and wait time for each pool.
+
+        Returns:
+            dict: Counters for the thread and process pools
+        """
+        return {
+            "threads": self._thread_stats.as_dict(),
+            "processes": self._process_stats.as_dict(),
+        }
+
+    def shutdown(self) -> None:
+        """Shut down both pools, waiting for running tasks."""
+        with self._lock:
+            threads, self._threads = self._threads, None
+            processes, self._processes = self._processes, None
+        if threads is not None:
+            threads.shutdown(wait=True)
+        if processes is not None:
+            processes.shutdown(wait=True)
+        logger.info("Executor shut down")
+
+
+executor = Executor()
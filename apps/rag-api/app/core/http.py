@@ -0,0 +1,103 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+from urllib.parse import urlsplit
+from aiohttp import ClientSession, TCPConnector
+from app.core.config import (
+    FETCH_MAX_CONCURRENCY,
+    FETCH_MAX_PER_HOST,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_CONNECTIONS_PER_HOST,
+    logger,
+)
+import asyncio
+
+
+class HttpClient:
+    """
+    Long-lived aiohttp session shared by every outbound request of a worker.
+
+    Reusing one session keeps connections alive and caches DNS lookups, so
+    repeated requests to the same host skip DNS, TCP and TLS setup. The session
+    is created lazily on the running event loop and recreated if the loop
+    changes.
+
+    Besides the connector's connection limits, `limit` bounds how many requests
+    run at once, globally and per host, including time spent reading bodies.
+
+    Attributes:
+        max_connections (int): Connector pool size (default: HEIDA_HTTP_MAX_CONNECTIONS)
+        max_connections_per_host (int): Pooled connections per host
+            (default: HEIDA_HTTP_MAX_CONNECTIONS_PER_HOST)
+        max_concurrency (int): Requests in flight at once (default: HEIDA_FETCH_MAX_CONCURRENCY)
+        max_per_host (int): Requests in flight per host (default: HEIDA_FETCH_MAX_PER_HOST)
+    """
+
+    def __init__(
+        self,
+        max_connections: int = HTTP_MAX_CONNECTIONS,
+        max_connections_per_host: int = HTTP_MAX_CONNECTIONS_PER_HOST,
+        max_concurrency: int = FETCH_MAX_CONCURRENCY,
+        max_per_host: int = FETCH_MAX_PER_HOST,
+    ):
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self._session: Optional[ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._global_limit: Optional[asyncio.Semaphore] = None
+        # host -> [semaphore, number of requests holding or waiting for it]
+        self._host_limits: Dict[str, List] = {}
+
+    def session(self) -> ClientSession:
+        """
+        Return the shared session, creating it on the running loop if needed.
+
+        Returns:
+            ClientSession: Session backed by the pooled connector
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                ttl_dns_cache=300,
+                keepalive_timeout=30,
+                enable_cleanup_closed=True,
+            )
+            self._session = ClientSession(connector=connector)
+            self._loop = loop
+            self._global_limit = asyncio.Semaphore(self.max_concurrency)
+            self._host_limits = {}
+            logger.info(
+                "Created HTTP session",
+                max_connections=self.max_connections,
+                max_connections_per_host=self.max_connections_per_host,
+            )
+        return self._session
+
+    @asynccontextmanager
+    async def limit(self, url: str) -> AsyncIterator[None]:
+        """Hold a global and a per-host request slot for the duration of the block."""
+        self.session()
+        host = urlsplit(url).netloc.lower()
+        entry = self._host_limits.setdefault(
+            host, [asyncio.Semaphore(self.max_per_host), 0]
+        )
+        entry[1] += 1
+        try:
+            async with self._global_limit, entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and self._host_limits.get(host) is entry:
+                del self._host_limits[host]
+
+    async def close(self) -> None:
+        """Close the shared session and its pooled connections."""
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
+
+
+http_client = HttpClient()
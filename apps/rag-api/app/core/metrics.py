@@ -0,0 +1,285 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import threading
+import time
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+COUNT_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384)
+BYTES_BUCKETS = tuple(1024 * 4**i for i in range(9))
+
+
+class Histogram:
+    """
+    Prometheus histogram with optional labels.
+
+    Observations are counted into cumulative `le` buckets per label set, along
+    with their sum and count, and rendered in the Prometheus text format.
+
+    Attributes:
+        name (str): Metric name
+        documentation (str): HELP text
+        buckets (Sequence[float]): Upper bounds of the buckets, ascending
+        labelnames (Sequence[str]): Names of the labels passed to `observe`
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        labelnames: Sequence[str] = (),
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        """
+        Record one observation.
+
+        Raises:
+            ValueError: If the labels do not match `labelnames`
+        """
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        """Render the histogram as Prometheus text format lines."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = sorted(
+                (key, list(counts), total)
+                for key, (counts, total) in self._series.items()
+            )
+        for key, counts, total in series:
+            labels = [
+                f'{name}="{_escape(value)}"'
+                for name, value in zip(self.labelnames, key)
+            ]
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format(bound)
+                bucket_labels = ",".join([*labels, f'le="{le}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            suffix = f"{{{','.join(labels)}}}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {_format(total)}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds the process-wide metrics and renders them for /metrics."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        labelnames: Sequence[str] = (),
+    ) -> Histogram:
+        """Register a histogram, or return the one already registered under `name`."""
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Histogram(
+                    name, documentation, buckets, labelnames
+                )
+            return self._metrics[name]
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: Exposition text, ending with a newline
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = [line for metric in metrics for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.histogram(
+    "heida_stage_seconds", "Wall time of one pipeline stage", labelnames=("stage",)
+)
+DOCUMENT_CHUNKS = metrics.histogram(
+    "heida_document_chunks", "Chunks produced per processed document", COUNT_BUCKETS
+)
+BATCH_SIZE = metrics.histogram(
+    "heida_batch_size",
+    "Inputs per model call",
+    COUNT_BUCKETS,
+    labelnames=("batch",),
+)
+FETCH_BYTES = metrics.histogram(
+    "heida_fetch_bytes", "Body bytes read per fetched page", BYTES_BUCKETS
+)
+
+
+class RequestTimings:
+    """
+    Per-request breakdown of stage durations.
+
+    Stages recorded more than once in a request, such as one fetch per page,
+    add up; concurrent stages therefore sum to more than the request's wall time.
+    """
+
+    def __init__(self):
+        self._seconds: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self._seconds[stage] = self._seconds.get(stage, 0.0) + seconds
+
+    def as_dict(self) -> Dict[str, float]:
+        """Stage durations in seconds, in the order stages first ran."""
+        with self._lock:
+            return {
+                stage: round(seconds, 6) for stage, seconds in self._seconds.items()
+            }
+
+
+_request_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+@contextmanager
+def request_timings() -> Iterator[RequestTimings]:
+    """
+    Collect the stage timings recorded while the block runs.
+
+    The timings follow the context into executor threads and asyncio tasks
+    started inside the block.
+    """
+    timings = RequestTimings()
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+
+def current_timings() -> RequestTimings:
+    """
+    Timings of the enclosing `request_timings` block.
+
+    Outside of one, a fresh RequestTimings is returned that nothing records into.
+    """
+    return _request_timings.get() or RequestTimings()
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Observe a stage duration and add it to the current request's timings."""
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Time the block as one run of `stage`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+class StageTimer:
+    """
+    Splits the wall time of interleaved stages into exclusive durations.
+
+    Streaming pipelines pull pages, chunks and batches through nested
+    generators, so stage durations overlap. While a stage runs, time is charged
+    to it; entering a nested stage pauses the outer one. `record` then reports
+    each stage's total once.
+    """
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+        self._stack: List[str] = []
+        self._mark = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        self._charge()
+        self._stack.append(name)
+        try:
+            yield
+        finally:
+            self._charge()
+            self._stack.pop()
+
+    def iterate(self, name: str, iterable: Iterable) -> Iterator:
+        """Yield from `iterable`, charging the time spent producing items to `name`."""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def record(self) -> None:
+        """Report the stage totals with `record_stage`."""
+        for name, seconds in self.seconds.items():
+            record_stage(name, seconds)
+
+    def _charge(self) -> None:
+        now = time.perf_counter()
+        if self._stack:
+            name = self._stack[-1]
+            self.seconds[name] = self.seconds.get(name, 0.0) + now - self._mark
+        self._mark = now
+
+
+def _format(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
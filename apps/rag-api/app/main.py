@@ -1,24 +1,213 @@
-from typing import Dict
+from contextlib import asynccontextmanager
+from typing import Dict, List
 
-from starlette.responses import StreamingResponse
+from starlette.responses import PlainTextResponse, StreamingResponse
 import uvicorn
-from duckduckgo_search import DDGS  # NOTE: probably remove to switch to brave
-from langchain_community.document_loaders import BraveSearchLoader
-from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
+import asyncio
+import hashlib
 import json
 
 from app.core import SUPPORTED_CONTENT_TYPES, logger
-from app.services import DocumentProcessor, Reranker, Retriever
+from app.core.executor import executor
+from app.core.http import http_client
+from app.core.metrics import current_timings, metrics, request_timings
+from app.core.config import (
+    DEFAULT_EMBEDDING_MODEL,
+    DEFAULT_RERANKER_MODEL,
+    MAX_BATCH_QUERIES,
+    WARM_UP,
+)
+from app.models import CollectionQuery
+from app.services import (
+    DocumentProcessor,
+    Reranker,
+    RerankPolicy,
+    Retriever,
+    embedding_cache,
+    model_registry,
+)
+from app.services.index_store import index_store
+from app.services.analyzer import Analyzer
+from app.services.web_cache import web_cache
+from app.services.search_client import BraveSearchClient
 from app.services.web_fetcher import WebFetcher
+from app.services.web_search import WebSearch, format_results
 from dotenv import load_dotenv
 import os
 
-app = FastAPI()
+
+def _warm_up() -> None:
+    try:
+        model_registry.warm_up(
+            embedding_models=[DEFAULT_EMBEDDING_MODEL],
+            cross_encoders=[DEFAULT_RERANKER_MODEL],
+        )
+    except Exception as e:
+        logger.error("Warm-up failed", error=str(e), error_type=type(e).__name__)
+        raise
+    logger.info("Models loaded", models=model_registry.stats())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start loading the default models in the background, unless HEIDA_WARM_UP is off.
+
+    The worker serves requests while models load: /health answers at once and
+    /ready reports 503 until warm-up has finished. Without warm-up, models (and
+    torch) are loaded by the first request that needs them.
+    """
+    app.state.warm_up = (
+        asyncio.ensure_future(executor.run_in_thread(_warm_up)) if WARM_UP else None
+    )
+    yield
+    executor.shutdown()
+    await http_client.close()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.middleware("http")
+async def record_timings(request: Request, call_next):
+    """
+    Collect the stage timings of each request.
+
+    Endpoints include the breakdown in their response body, and it is also sent
+    as a Server-Timing header, in milliseconds.
+    """
+    with request_timings() as timings:
+        response = await call_next(request)
+    stages = timings.as_dict()
+    if stages:
+        response.headers["Server-Timing"] = ", ".join(
+            f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in stages.items()
+        )
+    return response
+
 
 # TODO: Other features to consider:
 # - GitHub repo integration
 
 
+def _validate_upload(file: UploadFile) -> None:
+    """
+    Reject missing or unsupported uploads.
+
+    Raises:
+        HTTPException: If no file was uploaded or its type is unsupported
+    """
+    if not file:
+        logger.warning("No file uploaded")
+        raise HTTPException(status_code=400, detail="No file")
+    elif file.content_type not in SUPPORTED_CONTENT_TYPES:
+        logger.warning("Unsupported file type", content_type=file.content_type)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file type. Supported types are: {', '.join(SUPPORTED_CONTENT_TYPES)}",
+        )
+
+
+def _document_entry(file: UploadFile, file_content: bytes) -> Dict:
+    """Manifest fields identifying an uploaded version of a document."""
+    return {
+        "filename": file.filename,
+        "content_type": file.content_type,
+        "sha256": hashlib.sha256(file_content).hexdigest(),
+    }
+
+
+def _schedule_merge(manifest: Dict) -> None:
+    """Merge a collection's segments in the thread pool once it needs it."""
+    if index_store.needs_merge(manifest):
+        executor.submit_thread(_merge_collection, manifest["collection_id"])
+
+
+def _merge_collection(collection_id: str) -> None:
+    try:
+        index_store.merge(collection_id)
+    except Exception as e:
+        logger.error(
+            "Background merge failed",
+            error=str(e),
+            error_type=type(e).__name__,
+            collection_id=collection_id,
+        )
+
+
+@app.get("/health")
+async def health() -> Dict:
+    """
+    Liveness probe: the worker is running and its event loop responds.
+
+    Returns:
+        dict: Contains the status
+    """
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready() -> Dict:
+    """
+    Readiness probe: the worker has finished warming up and can serve traffic.
+
+    Returns:
+        dict: Contains the status and the loaded models
+
+    Raises:
+        HTTPException: If warm-up is still running or failed
+    """
+    warm_up = getattr(app.state, "warm_up", None)
+    if warm_up is not None and not warm_up.done():
+        raise HTTPException(status_code=503, detail="Warming up")
+    if warm_up is not None and warm_up.exception() is not None:
+        raise HTTPException(status_code=503, detail="Warm-up failed")
+    return {"status": "ready", "models": model_registry.stats()}
+
+
+@app.get("/metrics")
+async def prometheus_metrics() -> PlainTextResponse:
+    """
+    Endpoint to expose stage latency, chunk count, batch size and fetch size
+    histograms for this worker in the Prometheus text format.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/v1/models")
+async def list_models() -> Dict:
+    """
+    Endpoint to report the models loaded in this worker.
+
+    Returns:
+        dict: Contains load time and memory usage for each loaded model
+    """
+    return {"models": model_registry.stats()}
+
+
+@app.get("/api/v1/cache")
+async def cache_stats() -> Dict:
+    """
+    Endpoint to report cache hit/miss counters for this worker.
+
+    Returns:
+        dict: Contains counters for each cache
+    """
+    return {"embeddings": embedding_cache.stats(), "web": web_cache.stats()}
+
+
+@app.get("/api/v1/executor")
+async def executor_stats() -> Dict:
+    """
+    Endpoint to report worker pool and micro-batching counters for this worker.
+
+    Returns:
+        dict: Counters for the thread and process pools and each model batcher
+    """
+    return {**executor.stats(), "batchers": model_registry.batch_stats()}
+
+
 @app.get("/api/v1/search")
 async def search_documents(query: str) -> StreamingResponse:
     """
@@ -46,88 +235,25 @@ async def search_documents(query: str) -> StreamingResponse:
             raise HTTPException(
                 status_code=500, detail="Missing Brave API key in environment"
             )
+
         async def event_generator():
             try:
-                yield f"data: {json.dumps({'status': 'searching'})}\n\n"
-
-                loader = BraveSearchLoader(
-                    query=query, api_key=BRAVE_API_KEY, search_kwargs={"count": 3}
-                )
-                raw_results = loader.load()
-
-                yield f"data: {json.dumps({'status': 'found_results'})}\n\n"
-                logger.info("Search results loaded", count=len(raw_results))
-
-                urls = []
-                url_metadata = {}
-
-                for i, result in enumerate(raw_results):
-                    url = result.metadata["link"]
-                    urls.append(url)
-                    url_metadata[url] = {
-                        "title": result.metadata["title"],
-                        "url": url,
-                        "source": "brave",
-                        "result_index": i,
-                    }
-
-                yield f"data: {json.dumps({'status': 'indexing'})}\n\n"
-
-                fetcher = WebFetcher()
-                url_contents = await fetcher.fetch_all(urls)
-
-                yield f"data: {json.dumps({'status': 'fetched'})}\n\n"
-
-                combined_content = ""
-                content_metadata = {}
-
-                for i, (url, (title, content)) in enumerate(url_contents.items()):
-                    if content:
-                        content_metadata[i] = {
-                            "title": title or url_metadata[url]["title"],
-                            "url": url,
-                            "source": "web",
-                            "result_index": i,
-                        }
-                        combined_content += f"{content}\n\n"
-
-                yield f"data: {json.dumps({'status': 'running_rag'})}\n\n"
-
-                processor = DocumentProcessor()
-                chunks, embeddings, bm25 = processor.process_documents(
-                    combined_content.encode("utf-8"),
-                    content_type="text/plain",
+                processor = await executor.run_in_thread(
+                    DocumentProcessor, executor=executor
                 )
-
-                retriever = Retriever(processor.model)
-                results = retriever.retrieve(
-                    query=query,
-                    chunks=chunks,
-                    embeddings=embeddings,
-                    bm25=bm25,
-                    top_k=3,
+                reranker = await executor.run_in_thread(
+                    Reranker, batched=True, policy=RerankPolicy.for_endpoint("search")
                 )
-
-                reranker = Reranker()
-                reranked_results = reranker.rerank(
-                    query, [result["chunk"] for result in results]
+                web_search = WebSearch(
+                    client=BraveSearchClient(BRAVE_API_KEY),
+                    fetcher=WebFetcher(cache=web_cache),
+                    processor=processor,
+                    reranker=reranker,
+                    cache=web_cache,
+                    executor=executor,
                 )
-
-                search_results = [
-                    {
-                        "content": result["chunk"].content,
-                        "metadata": result["chunk"].metadata,
-                        "score": result.get("score", 0),
-                    }
-                    for result in reranked_results
-                ]
-
-                yield f"data: {json.dumps({
-                    'query': query,
-                    'results': search_results,
-                    'count': len(search_results),
-                    'status': "completed"
-                })}\n\n"
+                async for event in web_search.stream(query):
+                    yield f"data: {json.dumps(event)}\n\n"
 
             except Exception as e:
                 logger.error("Event generation failed", error=str(e))
@@ -172,57 +298,519 @@ async def retrieve(
     if not query or query.isspace():
         logger.warning("Empty query")
         raise HTTPException(status_code=400, detail="Query cannot be empty")
-    elif not file:
-        logger.warning("No file uploaded")
-        raise HTTPException(status_code=400, detail="No file")
-    elif file.content_type not in SUPPORTED_CONTENT_TYPES:
-        logger.warning("Unsupported file type", content_type=file.content_type)
+    _validate_upload(file)
+
+    try:
+        file_content = await file.read()
+        logger.info("File read successfully", content_length=len(file_content))
+
+        processor = await executor.run_in_thread(DocumentProcessor, executor=executor)
+        chunks, embeddings, bm25 = await executor.run_in_thread(
+            processor.process_documents, file_content, file.content_type
+        )
+
+        retriever = await executor.run_in_thread(
+            Retriever,
+            processor.model,
+            model_name=processor.model_name,
+            analyzer=processor.analyzer,
+        )
+        results = await executor.run_in_thread(
+            retriever.retrieve,
+            query=query,
+            chunks=chunks,
+            embeddings=embeddings,
+            bm25=bm25,
+        )
+
+        reranker = await executor.run_in_thread(
+            Reranker, batched=True, policy=RerankPolicy.for_endpoint("retrieve")
+        )
+        reranked_results = await executor.run_in_thread(
+            reranker.rerank,
+            query,
+            [result["chunk"] for result in results],
+            [result["score"] for result in results],
+        )
+
+        search_results = format_results(reranked_results)
+
+        return {
+            "query": query,
+            "results": search_results,
+            "count": len(search_results),
+            "timings": current_timings().as_dict(),
+        }
+
+    except Exception as e:
+        logger.error(
+            "Retrieval failed",
+            error=str(e),
+            error_type=type(e).__name__,
+            query=query if query else None,
+        )
+        raise HTTPException(
+            status_code=500, detail=f"An error occurred during retrieval: {str(e)}"
+        )
+
+
+@app.post("/api/v1/retrieve/batch")
+async def retrieve_batch(
+    queries: List[str] = Form(...),
+    file: UploadFile = File(...),
+    top_k: int = Form(10, ge=1, le=100),
+) -> Dict:
+    """
+    Endpoint to perform document retrieval for many queries against one uploaded file.
+
+    The document is processed once, all queries are encoded and scored in a single
+    batch, and all (query, chunk) pairs are reranked in one cross-encoder call.
+
+    Args:
+        queries (List[str]): The search queries, one form field per query
+        file (UploadFile): The document file to search through
+        top_k (int): Number of results per query (default: 10)
+
+    Returns:
+        dict: Contains per-query results in the order of `queries`, and the query count
+
+    Raises:
+        HTTPException: If a query is empty, there are too many queries, the file type
+            is unsupported or processing fails
+    """
+    logger.info(
+        "Received batch retrieval request",
+        file_type=file.content_type,
+        query_count=len(queries),
+    )
+
+    if any(not query or query.isspace() for query in queries):
+        logger.warning("Empty query in batch")
+        raise HTTPException(status_code=400, detail="Queries cannot be empty")
+    elif len(queries) > MAX_BATCH_QUERIES:
+        logger.warning("Too many queries", query_count=len(queries))
         raise HTTPException(
             status_code=400,
-            detail=f"Unsupported file type. Supported types are: {', '.join(SUPPORTED_CONTENT_TYPES)}",
+            detail=f"At most {MAX_BATCH_QUERIES} queries are allowed per batch",
         )
+    _validate_upload(file)
 
     try:
         file_content = await file.read()
         logger.info("File read successfully", content_length=len(file_content))
 
-        processor = DocumentProcessor()
-        chunks, embeddings, bm25 = processor.process_documents(
-            file_content, file.content_type
+        processor = await executor.run_in_thread(DocumentProcessor, executor=executor)
+        chunks, embeddings, bm25 = await executor.run_in_thread(
+            processor.process_documents, file_content, file.content_type
         )
 
-        retriever = Retriever(processor.model)
-        results = retriever.retrieve(
-            query=query, chunks=chunks, embeddings=embeddings, bm25=bm25
+        retriever = await executor.run_in_thread(
+            Retriever,
+            processor.model,
+            model_name=processor.model_name,
+            analyzer=processor.analyzer,
+        )
+        results = await executor.run_in_thread(
+            retriever.retrieve_many,
+            queries=queries,
+            chunks=chunks,
+            embeddings=embeddings,
+            bm25=bm25,
+            top_k=top_k,
         )
 
-        reranker = Reranker()
-        reranked_results = reranker.rerank(
-            query, [result["chunk"] for result in results]
+        reranker = await executor.run_in_thread(
+            Reranker, batched=True, policy=RerankPolicy.for_endpoint("retrieve_batch")
+        )
+        reranked_results = await executor.run_in_thread(
+            reranker.rerank_many,
+            queries,
+            [
+                [result["chunk"] for result in query_results]
+                for query_results in results
+            ],
+            [
+                [result["score"] for result in query_results]
+                for query_results in results
+            ],
         )
 
-        search_results = []
-        for result in reranked_results:
-            search_results.append(
+        batch_results = []
+        for query, query_results in zip(queries, reranked_results):
+            search_results = format_results(query_results)
+            batch_results.append(
                 {
-                    "content": result["chunk"].content,
-                    "metadata": result["chunk"].metadata,
-                    "score": result.get("score", 0),
+                    "query": query,
+                    "results": search_results,
+                    "count": len(search_results),
                 }
             )
 
+        return {
+            "results": batch_results,
+            "count": len(batch_results),
+            "timings": current_timings().as_dict(),
+        }
+
+    except Exception as e:
+        logger.error(
+            "Batch retrieval failed",
+            error=str(e),
+            error_type=type(e).__name__,
+            query_count=len(queries),
+        )
+        raise HTTPException(
+            status_code=500, detail=f"An error occurred during retrieval: {str(e)}"
+        )
+
+
+@app.post("/api/v1/collections")
+async def create_collection(file: UploadFile = File(...)) -> Dict:
+    """
+    Endpoint to ingest a document into a persistent collection.
+
+    The document is processed once and its chunks, embeddings and BM25 index are
+    stored on disk. Uploading the same file again returns the existing collection;
+    if the file was since replaced in or deleted from that collection, it is added
+    back to it.
+
+    Args:
+        file (UploadFile): The document file to index
+
+    Returns:
+        dict: Contains the collection id and chunk count
+
+    Raises:
+        HTTPException: If file type is unsupported or processing fails
+    """
+    logger.info("Received ingest request", file_type=file.content_type)
+    _validate_upload(file)
+
+    try:
+        file_content = await file.read()
+        processor = await executor.run_in_thread(DocumentProcessor, executor=executor)
+        collection_id = index_store.collection_id(
+            file_content,
+            file.content_type,
+            processor.model_name,
+            processor.chunk_size,
+            processor.chunk_overlap,
+            processor.chunk_unit,
+            processor.analyzer.name,
+        )
+
+        document = _document_entry(file, file_content)
+        document_id = file.filename or "document"
+        exists = index_store.exists(collection_id)
+        if exists:
+            manifest = index_store.info(collection_id)
+            if any(
+                entry.get("sha256") == document["sha256"]
+                for entry in manifest["documents"].values()
+            ):
+                logger.info("Collection already indexed", collection_id=collection_id)
+                return {
+                    "collection_id": collection_id,
+                    "chunk_count": manifest["chunk_count"],
+                    "created": False,
+                }
+            logger.info(
+                "Document missing from collection",
+                collection_id=collection_id,
+                document_id=document_id,
+            )
+
+        chunks, embeddings, bm25 = await executor.run_in_thread(
+            processor.process_documents, file_content, file.content_type
+        )
+        if exists:
+            manifest = await executor.run_in_thread(
+                index_store.upsert_document,
+                collection_id,
+                document_id,
+                chunks,
+                embeddings,
+                bm25,
+                document,
+            )
+            _schedule_merge(manifest)
+        else:
+            manifest = await executor.run_in_thread(
+                index_store.save,
+                collection_id,
+                chunks,
+                embeddings,
+                bm25,
+                metadata={
+                    "filename": file.filename,
+                    "content_type": file.content_type,
+                    "model": processor.model_name,
+                    "chunk_size": processor.chunk_size,
+                    "chunk_overlap": processor.chunk_overlap,
+                    "chunk_unit": processor.chunk_unit,
+                    "analyzer": processor.analyzer.config(),
+                },
+                document_id=document_id,
+                document=document,
+            )
+        return {
+            "collection_id": collection_id,
+            "chunk_count": manifest["chunk_count"],
+            "created": not exists,
+            "timings": current_timings().as_dict(),
+        }
+
+    except Exception as e:
+        logger.error("Ingest failed", error=str(e), error_type=type(e).__name__)
+        raise HTTPException(
+            status_code=500, detail=f"An error occurred during ingestion: {str(e)}"
+        )
+
+
+@app.get("/api/v1/collections")
+async def list_collections() -> Dict:
+    """
+    Endpoint to list stored collections.
+
+    Returns:
+        dict: Contains the manifest of every stored collection
+    """
+    collections = index_store.list()
+    return {"collections": collections, "count": len(collections)}
+
+
+@app.get("/api/v1/collections/{collection_id}")
+async def get_collection(collection_id: str) -> Dict:
+    """
+    Endpoint to read a collection manifest.
+
+    Raises:
+        HTTPException: If the collection does not exist
+    """
+    try:
+        return index_store.info(collection_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Collection not found")
+
+
+@app.delete("/api/v1/collections/{collection_id}")
+async def delete_collection(collection_id: str) -> Dict:
+    """
+    Endpoint to delete a collection.
+
+    Raises:
+        HTTPException: If the collection does not exist
+    """
+    try:
+        index_store.delete(collection_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Collection not found")
+    return {"collection_id": collection_id, "deleted": True}
+
+
+@app.put("/api/v1/collections/{collection_id}/documents/{document_id}")
+async def upsert_document(
+    collection_id: str, document_id: str, file: UploadFile = File(...)
+) -> Dict:
+    """
+    Endpoint to add a document to a collection or re-ingest a changed version.
+
+    The document is processed with the collection's model, chunking and analyzer
+    settings and stored as a new segment; a previous version is marked deleted.
+    Chunks whose text is unchanged reuse their stored embeddings, and uploading
+    an unchanged file is a no-op.
+
+    Args:
+        collection_id (str): Id returned by the ingest endpoint
+        document_id (str): Id of the document within the collection
+        file (UploadFile): The document file
+
+    Returns:
+        dict: Contains the document's chunk count and how many chunk embeddings
+            were reused
+
+    Raises:
+        HTTPException: If the collection does not exist or is stored in an older
+            format, the file type is unsupported or processing fails
+    """
+    logger.info(
+        "Received document upsert",
+        collection_id=collection_id,
+        document_id=document_id,
+        file_type=file.content_type,
+    )
+    _validate_upload(file)
+    try:
+        manifest = index_store.manifest(collection_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Collection not found")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    try:
+        file_content = await file.read()
+        document = _document_entry(file, file_content)
+        previous = manifest["documents"].get(document_id)
+        if previous is not None and previous.get("sha256") == document["sha256"]:
+            logger.info("Document unchanged", document_id=document_id)
+            return {
+                "collection_id": collection_id,
+                "document_id": document_id,
+                "chunk_count": previous["chunk_count"],
+                "created": False,
+                "updated": False,
+            }
+
+        processor = await executor.run_in_thread(
+            DocumentProcessor,
+            model=manifest["model"],
+            chunk_size=manifest["chunk_size"],
+            chunk_overlap=manifest["chunk_overlap"],
+            chunk_unit=manifest["chunk_unit"],
+            executor=executor,
+            analyzer=Analyzer(**manifest["analyzer"]),
+        )
+        reuse = None
+        if previous is not None:
+            reuse = await executor.run_in_thread(
+                index_store.document_embeddings, collection_id, document_id
+            )
+        chunks, embeddings, bm25 = await executor.run_in_thread(
+            processor.process_documents, file_content, file.content_type, reuse
+        )
+        manifest = await executor.run_in_thread(
+            index_store.upsert_document,
+            collection_id,
+            document_id,
+            chunks,
+            embeddings,
+            bm25,
+            document,
+        )
+        _schedule_merge(manifest)
+        return {
+            "collection_id": collection_id,
+            "document_id": document_id,
+            "chunk_count": len(chunks),
+            "reused_embeddings": sum(text in (reuse or {}) for text in chunks.texts()),
+            "created": previous is None,
+            "updated": True,
+            "timings": current_timings().as_dict(),
+        }
+
+    except Exception as e:
+        logger.error(
+            "Document upsert failed",
+            error=str(e),
+            error_type=type(e).__name__,
+            collection_id=collection_id,
+        )
+        raise HTTPException(
+            status_code=500, detail=f"An error occurred during ingestion: {str(e)}"
+        )
+
+
+@app.delete("/api/v1/collections/{collection_id}/documents/{document_id}")
+async def delete_document(collection_id: str, document_id: str) -> Dict:
+    """
+    Endpoint to remove a document from a collection.
+
+    Raises:
+        HTTPException: If the collection or document does not exist, or it is the
+            collection's only document
+    """
+    try:
+        manifest = await executor.run_in_thread(
+            index_store.delete_document, collection_id, document_id
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Document not found")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    _schedule_merge(manifest)
+    return {
+        "collection_id": collection_id,
+        "document_id": document_id,
+        "deleted": True,
+        "chunk_count": manifest["chunk_count"],
+    }
+
+
+@app.post("/api/v1/collections/{collection_id}/query")
+async def query_collection(collection_id: str, request: CollectionQuery) -> Dict:
+    """
+    Endpoint to perform retrieval against a stored collection.
+
+    Args:
+        collection_id (str): Id returned by the ingest endpoint
+        request (CollectionQuery): The search query and number of results
+
+    Returns:
+        dict: Contains the query, retrieval results, and result count
+
+    Raises:
+        HTTPException: If the collection does not exist or is stored in an older
+            format, or retrieval fails
+    """
+    query = request.query
+    if query.isspace():
+        logger.warning("Empty query")
+        raise HTTPException(status_code=400, detail="Query cannot be empty")
+
+    try:
+        manifest = index_store.manifest(collection_id)
+        chunks, embeddings, bm25 = await executor.run_in_thread(
+            index_store.load, collection_id
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Collection not found")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    try:
+        model = await executor.run_in_thread(
+            model_registry.get_embedding_model, manifest["model"]
+        )
+        retriever = await executor.run_in_thread(
+            Retriever,
+            model,
+            model_name=manifest["model"],
+            analyzer=Analyzer(**manifest["analyzer"]),
+        )
+        results = await executor.run_in_thread(
+            retriever.retrieve,
+            query=query,
+            chunks=chunks,
+            embeddings=embeddings,
+            bm25=bm25,
+            top_k=request.top_k,
+        )
+
+        reranker = await executor.run_in_thread(
+            Reranker, batched=True, policy=RerankPolicy.for_endpoint("collections")
+        )
+        reranked_results = await executor.run_in_thread(
+            reranker.rerank,
+            query,
+            [result["chunk"] for result in results],
+            [result["score"] for result in results],
+        )
+
+        search_results = format_results(reranked_results)
         return {
             "query": query,
+            "collection_id": collection_id,
             "results": search_results,
             "count": len(search_results),
+            "timings": current_timings().as_dict(),
         }
 
     except Exception as e:
         logger.error(
-            "Retrieval failed",
+            "Collection query failed",
             error=str(e),
             error_type=type(e).__name__,
-            query=query if query else None,
+            collection_id=collection_id,
         )
         raise HTTPException(
             status_code=500, detail=f"An error occurred during retrieval: {str(e)}"
@@ -0,0 +1 @@
+from .schemas import CollectionQuery
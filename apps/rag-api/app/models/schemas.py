@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+
+
+class CollectionQuery(BaseModel):
+    query: str = Field(..., min_length=1)
+    top_k: int = Field(10, ge=1, le=100)
@@ -1,3 +1,6 @@
 from .retriever import Retriever
 from .document_processor import DocumentProcessor, Chunk
-from .reranker import Reranker
+from .chunk_store import ChunkStore
+from .reranker import Reranker, RerankPolicy
+from .model_registry import ModelRegistry, model_registry
+from .embedding_cache import EmbeddingCache, embedding_cache
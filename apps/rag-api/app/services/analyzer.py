@@ -0,0 +1,146 @@
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+from app.core.config import ANALYZER_STEMMER, ANALYZER_STOPWORDS
+import re
+
+TOKEN_PATTERN = r"\w+"
+
+ENGLISH_STOPWORDS = frozenset("""
+    a about above after again against all am an and any are as at be because been
+    before being below between both but by can could did do does doing down during
+    each few for from further had has have having he her here hers herself him
+    himself his how i if in into is it its itself just me more most my myself no nor
+    not now of off on once only or other our ours ourselves out over own same she
+    should so some such than that the their theirs them themselves then there these
+    they this those through to too under until up very was we were what when where
+    which while who whom why will with would you your yours yourself yourselves
+    """.split())
+
+STOPWORD_LISTS = {"english": ENGLISH_STOPWORDS}
+
+
+@lru_cache(maxsize=100_000)
+def porter_stem(token: str) -> str:
+    """Porter-stem a token; term frequencies are Zipfian, so most calls hit the cache."""
+    return _porter().stem(token)
+
+
+@lru_cache(maxsize=1)
+def _porter():
+    # Imported lazily: the stemmer needs no NLTK data, but NLTK itself is slow to import
+    from nltk.stem.porter import PorterStemmer
+
+    return PorterStemmer()
+
+
+class Analyzer:
+    """
+    Lexical analyzer turning text into BM25 terms.
+
+    Text is lowercased, split into word tokens with one compiled regex, and
+    optionally filtered against a stopword list and Porter-stemmed. Indexing and
+    querying must use the same analyzer, so stored collections record its
+    `config` and are queried with an analyzer rebuilt from it.
+
+    `analyze_many` lowercases a whole batch in one call and runs the regex over
+    each text in C, which is what chunk indexing uses.
+
+    Attributes:
+        lowercase (bool): Lowercase text before tokenizing (default: True)
+        stemmer (str): "porter" or None (default: None)
+        stopwords (str): Name of a stopword list in STOPWORD_LISTS, or None
+            (default: None)
+        pattern (str): Regex matching one token (default: TOKEN_PATTERN)
+    """
+
+    def __init__(
+        self,
+        lowercase: bool = True,
+        stemmer: Optional[str] = None,
+        stopwords: Optional[str] = None,
+        pattern: str = TOKEN_PATTERN,
+    ):
+        if stemmer not in (None, "porter"):
+            raise ValueError(f"Unknown stemmer: {stemmer}")
+        if stopwords is not None and stopwords not in STOPWORD_LISTS:
+            raise ValueError(f"Unknown stopword list: {stopwords}")
+        self.lowercase = lowercase
+        self.stemmer = stemmer
+        self.stopwords = stopwords
+        self.pattern = pattern
+        self._regex = re.compile(pattern)
+        self._stopword_set = STOPWORD_LISTS[stopwords] if stopwords else None
+
+    def config(self) -> Dict:
+        """
+        Describe the analyzer so it can be rebuilt with `Analyzer(**config)`.
+
+        Returns:
+            dict: lowercase, stemmer, stopwords and pattern
+        """
+        return {
+            "lowercase": self.lowercase,
+            "stemmer": self.stemmer,
+            "stopwords": self.stopwords,
+            "pattern": self.pattern,
+        }
+
+    @property
+    def name(self) -> str:
+        parts = [self.pattern, "lower" if self.lowercase else "cased"]
+        if self.stopwords:
+            parts.append(f"stop={self.stopwords}")
+        if self.stemmer:
+            parts.append(f"stem={self.stemmer}")
+        return "|".join(parts)
+
+    def analyze(self, text: str) -> List[str]:
+        """
+        Turn one text into terms.
+
+        Args:
+            text: Text to analyze
+
+        Returns:
+            List[str]: Terms in text order
+        """
+        if self.lowercase:
+            text = text.lower()
+        return self._filter(self._regex.findall(text))
+
+    def analyze_many(self, texts: Iterable[str]) -> List[List[str]]:
+        """
+        Turn a batch of texts into terms.
+
+        Args:
+            texts: Texts to analyze
+
+        Returns:
+            List[List[str]]: Terms of each text
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        if self.lowercase:
+            joined = "\0".join(texts)
+            # NUL is not a word character, so it safely separates the texts
+            # unless one of them contains it
+            if joined.count("\0") == len(texts) - 1:
+                texts = joined.lower().split("\0")
+            else:
+                texts = [text.lower() for text in texts]
+        findall = self._regex.findall
+        return [self._filter(findall(text)) for text in texts]
+
+    def _filter(self, tokens: List[str]) -> List[str]:
+        if self._stopword_set is not None:
+            stopwords = self._stopword_set
+            tokens = [token for token in tokens if token not in stopwords]
+        if self.stemmer == "porter":
+            tokens = [porter_stem(token) for token in tokens]
+        return tokens
+
+
+default_analyzer = Analyzer(
+    stemmer=ANALYZER_STEMMER or None, stopwords=ANALYZER_STOPWORDS or None
+)
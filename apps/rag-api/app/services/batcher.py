@@ -0,0 +1,138 @@
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Sequence
+from app.core import logger
+from app.core.config import BATCH_MAX_SIZE, BATCH_WINDOW_MS
+from app.core.metrics import BATCH_SIZE
+import queue
+import threading
+import time
+
+
+class MicroBatcher:
+    """
+    Coalesces model calls from concurrent requests into shared forward passes.
+
+    Request threads submit jobs, each a list of inputs, and block on the returned
+    future. A single worker thread takes the first waiting job, keeps collecting
+    jobs until `window_ms` has passed or `max_batch_size` inputs are queued, runs
+    `fn` once on the concatenated inputs and hands every job its slice of the
+    outputs. A job larger than `max_batch_size` runs on its own.
+
+    Attributes:
+        fn: Callable mapping a list of inputs to a sequence of outputs of equal length
+        name (str): Label used in logs and stats
+        window_ms (float): How long to wait for more jobs (default: HEIDA_BATCH_WINDOW_MS)
+        max_batch_size (int): Input count that closes a batch early (default: HEIDA_BATCH_MAX_SIZE)
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[List], Sequence],
+        name: str = "batch",
+        window_ms: float = BATCH_WINDOW_MS,
+        max_batch_size: int = BATCH_MAX_SIZE,
+    ):
+        self.fn = fn
+        self.name = name
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self._queue: "queue.Queue" = queue.Queue()
+        self._pending = None
+        self._counts = {"jobs": 0, "batches": 0, "items": 0, "max_items": 0}
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+    def submit(self, items: List) -> Future:
+        """
+        Queue a job and return a future for its outputs.
+
+        Args:
+            items: Inputs of this job
+
+        Returns:
+            Future: Resolves to the list of outputs for `items`, in order
+        """
+        future: Future = Future()
+        if not items:
+            future.set_result([])
+            return future
+        self._ensure_worker()
+        self._queue.put((list(items), future))
+        return future
+
+    def __call__(self, items: List) -> List:
+        """Submit a job and wait for its outputs."""
+        return self.submit(items).result()
+
+    def stats(self) -> Dict:
+        """
+        Report how well jobs are being coalesced.
+
+        Returns:
+            dict: jobs, batches, items, max_items and mean_batch_size
+        """
+        with self._lock:
+            counts = dict(self._counts)
+        return {
+            "name": self.name,
+            **counts,
+            "mean_batch_size": (
+                counts["items"] / counts["batches"] if counts["batches"] else 0.0
+            ),
+        }
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name=f"heida-batcher-{self.name}", daemon=True
+                )
+                self._worker.start()
+
+    def _collect(self) -> List:
+        # A job that did not fit in the previous batch opens the next one
+        job, self._pending = self._pending, None
+        jobs = [job if job is not None else self._queue.get()]
+        size = len(jobs[0][0])
+        deadline = time.monotonic() + self.window_ms / 1000
+
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                job = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if size + len(job[0]) > self.max_batch_size:
+                self._pending = job
+                break
+            jobs.append(job)
+            size += len(job[0])
+        return jobs
+
+    def _run(self) -> None:
+        while True:
+            jobs = self._collect()
+            items = [item for job_items, _ in jobs for item in job_items]
+            BATCH_SIZE.observe(len(items), batch=self.name)
+            try:
+                outputs = self.fn(items)
+            except Exception as e:
+                logger.error("Batched call failed", batcher=self.name, error=str(e))
+                for _, future in jobs:
+                    future.set_exception(e)
+                continue
+
+            offset = 0
+            for job_items, future in jobs:
+                future.set_result(list(outputs[offset : offset + len(job_items)]))
+                offset += len(job_items)
+
+            with self._lock:
+                self._counts["jobs"] += len(jobs)
+                self._counts["batches"] += 1
+                self._counts["items"] += len(items)
+                self._counts["max_items"] = max(self._counts["max_items"], len(items))
@@ -0,0 +1,613 @@
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from scipy import sparse
+import numpy as np
+import json
+
+VARIANTS = ("okapi", "plus", "l")
+
+DEFAULT_DELTA = {"okapi": 0.0, "plus": 1.0, "l": 0.5}
+
+
+class Vocabulary(Mapping):
+    """
+    Read-only mapping of terms to row ids, backed by a sorted term blob.
+
+    The UTF-8 encoded terms are concatenated in sorted order and located through
+    an offsets array, so every term takes only its own length, however long the
+    longest term is. Terms are found by binary search over the blob, so a
+    vocabulary rebuilt from memory-mapped arrays is usable at once: no dict of
+    every term is built in each process that opens it, and only the pages a
+    lookup touches are read.
+
+    Attributes:
+        blob: uint8 array of the encoded terms in sorted order
+        offsets: Start of each term in `blob`, plus the end of the last one
+        ids: Row id of each term in sorted order
+    """
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray, ids: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+        self.ids = ids
+
+    @classmethod
+    def from_terms(cls, terms: Sequence[str]) -> "Vocabulary":
+        """Build a vocabulary from terms ordered by row id."""
+        return cls.from_encoded([term.encode("utf-8") for term in terms])
+
+    @classmethod
+    def from_encoded(cls, terms: Sequence[bytes]) -> "Vocabulary":
+        """Build a vocabulary from UTF-8 encoded terms ordered by row id."""
+        order = sorted(range(len(terms)), key=terms.__getitem__)
+        return cls.from_sorted(
+            [terms[i] for i in order], np.asarray(order, dtype=np.int64)
+        )
+
+    @classmethod
+    def from_sorted(cls, terms: Sequence[bytes], ids: np.ndarray) -> "Vocabulary":
+        """Build a vocabulary from sorted encoded terms and their row ids."""
+        lengths = np.fromiter(map(len, terms), dtype=np.int64, count=len(terms))
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        blob = np.frombuffer(b"".join(terms), dtype=np.uint8)
+        return cls(blob, offsets, ids)
+
+    def sorted_terms(self) -> List[bytes]:
+        """Encoded terms in sorted order."""
+        blob = self.blob.tobytes()
+        bounds = self.offsets.tolist()
+        return [blob[start:stop] for start, stop in zip(bounds, bounds[1:])]
+
+    def ordered_terms(self) -> List[bytes]:
+        """Encoded terms ordered by row id."""
+        ordered: List[bytes] = [b""] * len(self)
+        for term, term_id in zip(self.sorted_terms(), self.ids.tolist()):
+            ordered[term_id] = term
+        return ordered
+
+    def _term(self, position: int) -> bytes:
+        return self.blob[self.offsets[position] : self.offsets[position + 1]].tobytes()
+
+    def lookup(self, terms: Sequence[str]) -> np.ndarray:
+        """
+        Look up the row ids of many terms.
+
+        Args:
+            terms: Terms to look up
+
+        Returns:
+            np.ndarray: Row id of each term, or -1 for terms not in the vocabulary
+        """
+        ids = np.full(len(terms), -1, dtype=np.int64)
+        for i, term in enumerate(terms):
+            key = term.encode("utf-8")
+            low, high = 0, len(self)
+            while low < high:
+                middle = (low + high) // 2
+                if self._term(middle) < key:
+                    low = middle + 1
+                else:
+                    high = middle
+            if low < len(self) and self._term(low) == key:
+                ids[i] = self.ids[low]
+        return ids
+
+    def __getitem__(self, term: str) -> int:
+        term_id = int(self.lookup([term])[0])
+        if term_id < 0:
+            raise KeyError(term)
+        return term_id
+
+    def __iter__(self) -> Iterator[str]:
+        return (term.decode("utf-8") for term in self.ordered_terms())
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class SparseBM25:
+    """
+    Vectorized BM25 index backed by a sparse term-document matrix.
+
+    Term frequencies are stored as a CSR matrix with one row per term and one column
+    per document. IDF and document length normalization are folded into a weight
+    matrix with the same sparsity structure when the index is built, so scoring a
+    query is a single sparse matrix-vector product between the query term counts and
+    the weight matrix.
+
+    Okapi scores match rank_bm25's BM25Okapi. BM25+ and BM25L follow Lv & Zhai
+    (2011) and only score documents that contain the term, which keeps the weight
+    matrix sparse; rank_bm25 instead shifts every document by a per-term constant
+    (BM25Plus) or multiplies by an extra term frequency factor (BM25L).
+
+    Attributes:
+        variant (str): One of "okapi", "plus" or "l" (default: "okapi")
+        k1 (float): Term frequency saturation (default: 1.5)
+        b (float): Length normalization strength (default: 0.75)
+        epsilon (float): IDF floor factor for Okapi (default: 0.25)
+        delta (float): Lower bound for BM25+/BM25L (default: 1.0 for plus, 0.5 for l)
+        vocab (Vocabulary): Mapping of term to row id
+        tf: CSR term frequency matrix with shape (n_terms, n_docs)
+        weights: CSR BM25 weight matrix with the same structure as tf
+        doc_len: Token count of each document
+    """
+
+    def __init__(
+        self,
+        corpus: Sequence[Sequence[str]],
+        variant: str = "okapi",
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+        delta: Optional[float] = None,
+    ):
+        if variant not in VARIANTS:
+            raise ValueError(
+                f"Unknown BM25 variant: {variant}. Supported: {', '.join(VARIANTS)}"
+            )
+        if not corpus:
+            raise ValueError("Cannot build a BM25 index from an empty corpus")
+
+        self.variant = variant
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self.delta = DEFAULT_DELTA[variant] if delta is None else delta
+
+        vocab: Dict[str, int] = {}
+        term_ids = [
+            vocab.setdefault(term, len(vocab))
+            for document in corpus
+            for term in document
+        ]
+        self.vocab = Vocabulary.from_terms(list(vocab))
+        self.doc_len = np.fromiter(
+            (len(document) for document in corpus), dtype=np.int32, count=len(corpus)
+        )
+        doc_ids = np.repeat(np.arange(len(corpus), dtype=np.int32), self.doc_len)
+
+        # Duplicate (term, doc) entries are summed into term frequencies
+        self.tf = sparse.csr_matrix(
+            (
+                np.ones(len(term_ids), dtype=np.float32),
+                (np.asarray(term_ids, dtype=np.int32), doc_ids),
+            ),
+            shape=(len(self.vocab), len(corpus)),
+        )
+        self.tf.sum_duplicates()
+        self._compute_weights()
+
+    @property
+    def corpus_size(self) -> int:
+        return len(self.doc_len)
+
+    def _compute_weights(self) -> None:
+        n_docs = self.corpus_size
+        self.avgdl = float(self.doc_len.mean()) if n_docs else 0.0
+        self.idf = self._idf(np.diff(self.tf.indptr), n_docs)
+        self.weights = self._weights(self.tf, self.idf, self.avgdl)
+
+    def _idf(self, df: np.ndarray, n_docs: int) -> np.ndarray:
+        """IDF of terms with document frequencies `df`; terms with df 0 get 0."""
+        df = df.astype(np.float64)
+        present = df > 0
+        df = np.where(present, df, 1.0)
+        if self.variant == "okapi":
+            idf = np.log(n_docs - df + 0.5) - np.log(df + 0.5)
+            if present.any():
+                # Terms in more than half the documents get a floor of eps * mean idf
+                idf[idf < 0] = self.epsilon * idf[present].mean()
+        elif self.variant == "plus":
+            idf = np.log((n_docs + 1) / df)
+        else:
+            idf = np.log(n_docs + 1) - np.log(df + 0.5)
+        return np.where(present, idf, 0.0)
+
+    def _weights(
+        self, rows: sparse.csr_matrix, idf: np.ndarray, avgdl: float
+    ) -> sparse.csr_matrix:
+        """
+        BM25 weights of some rows of the term frequency matrix.
+
+        Args:
+            rows: Rows of `tf`, e.g. all of them or those of the query terms
+            idf: IDF of each row
+            avgdl: Average document length
+
+        Returns:
+            sparse.csr_matrix: float32 weights with the same structure as `rows`
+        """
+        length_norm = 1 - self.b + self.b * self.doc_len / (avgdl or 1.0)
+        tf = rows.data.astype(np.float64)
+        term_idf = np.repeat(idf, np.diff(rows.indptr))
+        doc_norm = length_norm[rows.indices]
+
+        if self.variant == "l":
+            ctd = tf / doc_norm
+            data = (
+                term_idf
+                * (self.k1 + 1)
+                * (ctd + self.delta)
+                / (self.k1 + ctd + self.delta)
+            )
+        else:
+            data = term_idf * (
+                tf * (self.k1 + 1) / (tf + self.k1 * doc_norm) + self.delta
+            )
+
+        return sparse.csr_matrix(
+            (data.astype(np.float32), rows.indices, rows.indptr), shape=rows.shape
+        )
+
+    @classmethod
+    def concat(cls, indexes: Sequence["SparseBM25"]) -> "SparseBM25":
+        """
+        Combine indexes over disjoint document sets into one index.
+
+        Documents keep their order, index by index. Term frequencies are merged
+        under a shared vocabulary and IDF and average length are recomputed over
+        the combined corpus, so the result scores exactly like an index built
+        from the concatenated corpus. Parameters are taken from the first index.
+
+        Args:
+            indexes: Indexes to combine
+
+        Returns:
+            SparseBM25: Index over all documents
+        """
+        if not indexes:
+            raise ValueError("Cannot build a BM25 index from an empty corpus")
+        first = indexes[0]
+        combined = cls.__new__(cls)
+        for name, value in first.params().items():
+            setattr(combined, name, value)
+
+        vocab, term_maps = _union_vocabulary([index.vocab for index in indexes])
+        combined.vocab = vocab
+        rows, cols, data = [], [], []
+        doc_offset = 0
+        for index, term_map in zip(indexes, term_maps):
+            tf = index.tf.tocoo()
+            rows.append(term_map[tf.row])
+            cols.append(tf.col.astype(np.int64) + doc_offset)
+            data.append(tf.data)
+            doc_offset += index.corpus_size
+
+        combined.doc_len = np.concatenate([index.doc_len for index in indexes])
+        combined.tf = sparse.csr_matrix(
+            (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(len(combined.vocab), doc_offset),
+        )
+        combined._compute_weights()
+        return combined
+
+    def take(self, doc_ids: Sequence[int]) -> "SparseBM25":
+        """
+        Build an index over some of the documents, e.g. to drop deleted ones.
+
+        Terms left without documents are removed and IDF and average length are
+        recomputed, so the result scores exactly like an index built from the
+        selected documents alone.
+
+        Args:
+            doc_ids: Documents to keep, in the order they appear in the result
+
+        Returns:
+            SparseBM25: Index over the selected documents
+
+        Raises:
+            ValueError: If `doc_ids` is empty
+        """
+        doc_ids = np.asarray(doc_ids, dtype=np.int64)
+        if not len(doc_ids):
+            raise ValueError("Cannot build a BM25 index from an empty corpus")
+        tf = self.tf[:, doc_ids].tocsr()
+        kept = np.flatnonzero(np.diff(tf.indptr))
+
+        index = self.__class__.__new__(self.__class__)
+        for name, value in self.params().items():
+            setattr(index, name, value)
+        terms = self.vocab.ordered_terms()
+        index.vocab = Vocabulary.from_encoded([terms[i] for i in kept.tolist()])
+        index.doc_len = self.doc_len[doc_ids]
+        index.tf = tf[kept]
+        index._compute_weights()
+        return index
+
+    def _query_vector(self, query: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        term_ids = self.vocab.lookup(query)
+        return np.unique(term_ids[term_ids >= 0], return_counts=True)
+
+    def get_scores(self, query: Sequence[str]) -> np.ndarray:
+        """
+        Score every document against a tokenized query.
+
+        Args:
+            query: Query tokens; repeated tokens count multiple times
+
+        Returns:
+            np.ndarray: BM25 score per document with shape (n_docs,)
+        """
+        term_ids, counts = self._query_vector(query)
+        if not len(term_ids):
+            return np.zeros(self.corpus_size)
+        scores = counts.astype(np.float32) @ self.weights[term_ids]
+        return np.asarray(scores, dtype=np.float64).ravel()
+
+    def get_scores_many(self, queries: Sequence[Sequence[str]]) -> np.ndarray:
+        """
+        Score every document against a batch of tokenized queries.
+
+        The queries are stacked into a sparse (n_queries, n_terms) count matrix and
+        multiplied with the weight matrix in a single product.
+
+        Args:
+            queries: Tokenized queries
+
+        Returns:
+            np.ndarray: BM25 scores with shape (n_queries, n_docs)
+        """
+        counts = self._query_matrix(queries)
+        return (counts @ self.weights).toarray().astype(np.float64)
+
+    def _query_matrix(self, queries: Sequence[Sequence[str]]) -> sparse.csr_matrix:
+        """Term counts of tokenized queries with shape (n_queries, n_terms)."""
+        term_ids = self.vocab.lookup([term for query in queries for term in query])
+        rows = np.repeat(np.arange(len(queries)), [len(query) for query in queries])
+        found = term_ids >= 0
+        return sparse.csr_matrix(
+            (
+                np.ones(int(found.sum()), dtype=np.float32),
+                (rows[found], term_ids[found]),
+            ),
+            shape=(len(queries), len(self.vocab)),
+        )
+
+    def top_k(self, query: Sequence[str], k: int) -> List[Tuple[int, float]]:
+        """
+        Return the k best scoring documents.
+
+        Args:
+            query: Query tokens
+            k: Number of results to return
+
+        Returns:
+            List[Tuple[int, float]]: (doc_id, score) pairs sorted by descending score
+        """
+        scores = self.get_scores(query)
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top_indices = np.argpartition(scores, -k)[-k:]
+        top_indices = top_indices[np.argsort(-scores[top_indices], kind="stable")]
+        return [(int(idx), float(scores[idx])) for idx in top_indices]
+
+    def save(self, path: str) -> None:
+        """
+        Serialize the index to a compressed .npz file.
+
+        Only term frequencies, document lengths, the vocabulary and parameters are
+        stored; weights are recomputed on load.
+        """
+        terms = "\0".join(self.vocab)
+        np.savez_compressed(
+            path,
+            tf_data=self.tf.data,
+            tf_indices=self.tf.indices,
+            tf_indptr=self.tf.indptr,
+            doc_len=self.doc_len,
+            terms=np.frombuffer(terms.encode("utf-8"), dtype=np.uint8),
+            params=np.frombuffer(json.dumps(self.params()).encode(), dtype=np.uint8),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "SparseBM25":
+        """Load an index written by `save`."""
+        with np.load(path) as data:
+            params = json.loads(data["params"].tobytes().decode())
+            terms = data["terms"].tobytes().decode("utf-8")
+            index = cls.__new__(cls)
+            index.variant = params["variant"]
+            index.k1 = params["k1"]
+            index.b = params["b"]
+            index.epsilon = params["epsilon"]
+            index.delta = params["delta"]
+            index.vocab = Vocabulary.from_terms(terms.split("\0") if terms else [])
+            index.doc_len = data["doc_len"]
+            index.tf = sparse.csr_matrix(
+                (data["tf_data"], data["tf_indices"], data["tf_indptr"]),
+                shape=(len(index.vocab), len(index.doc_len)),
+            )
+        index._compute_weights()
+        return index
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Arrays that fully describe the index, for storing it in a segment.
+
+        Unlike `save`, the precomputed weights and IDF are included, so an index
+        rebuilt from memory-mapped arrays scores without computing anything, and
+        the vocabulary is stored sorted, so it is searched in place.
+        """
+        return {
+            "tf_data": self.tf.data,
+            "tf_indices": self.tf.indices,
+            "tf_indptr": self.tf.indptr,
+            "weights": self.weights.data,
+            "idf": self.idf,
+            "doc_len": self.doc_len,
+            "vocab_blob": self.vocab.blob,
+            "vocab_offsets": self.vocab.offsets,
+            "vocab_ids": self.vocab.ids,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], params: Dict) -> "SparseBM25":
+        """
+        Rebuild an index from `arrays` and `params` without copying the arrays.
+
+        Memory-mapped arrays stay memory-mapped, so processes that open the same
+        files share their pages.
+        """
+        index = cls.__new__(cls)
+        for name, value in params.items():
+            setattr(index, name, value)
+        if "vocab_blob" in arrays:
+            index.vocab = Vocabulary(
+                arrays["vocab_blob"], arrays["vocab_offsets"], arrays["vocab_ids"]
+            )
+        else:
+            # Segments written before the vocabulary was stored sorted
+            terms = arrays["terms"].tobytes().decode("utf-8")
+            index.vocab = Vocabulary.from_terms(terms.split("\0") if terms else [])
+        index.doc_len = arrays["doc_len"]
+        index.avgdl = float(index.doc_len.mean()) if len(index.doc_len) else 0.0
+        index.idf = arrays["idf"]
+        shape = (len(index.vocab), len(index.doc_len))
+        structure = (arrays["tf_indices"], arrays["tf_indptr"])
+        index.tf = sparse.csr_matrix(
+            (arrays["tf_data"], *structure), shape=shape, copy=False
+        )
+        index.weights = sparse.csr_matrix(
+            (arrays["weights"], *structure), shape=shape, copy=False
+        )
+        return index
+
+    def params(self) -> Dict:
+        return {
+            "variant": self.variant,
+            "k1": self.k1,
+            "b": self.b,
+            "epsilon": self.epsilon,
+            "delta": self.delta,
+        }
+
+
+class SegmentedBM25:
+    """
+    BM25 over the indexes of several segments with collection-wide statistics.
+
+    Segments keep their own term frequencies, but IDF and the average document
+    length come from the live documents of all segments together, so scores
+    equal those of a single SparseBM25 built from the live documents. Each
+    segment's stored weights assume its own statistics, so the weights of the
+    query terms' rows are recomputed per query; this touches the same postings
+    the sparse product reads anyway.
+
+    Document ids run through the segments in order, deleted documents included;
+    deleted documents score 0.
+
+    Attributes:
+        indexes (List[SparseBM25]): Index of each segment
+        live: Per segment, a boolean mask of its live documents, or None if all are
+        offsets (np.ndarray): First document id of each segment, plus the total
+        idf (List[np.ndarray]): Per segment, the collection-wide IDF of its terms
+        avgdl (float): Average length of the live documents
+    """
+
+    def __init__(
+        self,
+        indexes: Sequence[SparseBM25],
+        live: Optional[Sequence[Optional[np.ndarray]]] = None,
+    ):
+        if not indexes:
+            raise ValueError("Cannot build a BM25 index from an empty corpus")
+        self.indexes = list(indexes)
+        self.live = list(live) if live is not None else [None] * len(self.indexes)
+        self.offsets = np.cumsum([0] + [index.corpus_size for index in self.indexes])
+
+        vocab, term_maps = _union_vocabulary([index.vocab for index in self.indexes])
+        dfs = []
+        n_docs, total_len = 0, 0
+        for index, mask in zip(self.indexes, self.live):
+            if mask is None:
+                dfs.append(np.diff(index.tf.indptr))
+                doc_len = index.doc_len
+            else:
+                # Count only the live documents among each term's postings
+                posting_terms = np.repeat(
+                    np.arange(len(index.vocab)), np.diff(index.tf.indptr)
+                )
+                dfs.append(
+                    np.bincount(
+                        posting_terms,
+                        weights=mask[index.tf.indices],
+                        minlength=len(index.vocab),
+                    ).astype(np.int64)
+                )
+                doc_len = index.doc_len[mask]
+            n_docs += len(doc_len)
+            total_len += int(doc_len.sum())
+
+        df = np.zeros(len(vocab), dtype=np.int64)
+        for term_map, segment_df in zip(term_maps, dfs):
+            np.add.at(df, term_map, segment_df)
+        idf = self.indexes[0]._idf(df, n_docs)
+        self.idf = [idf[term_map] for term_map in term_maps]
+        self.avgdl = total_len / n_docs if n_docs else 0.0
+        self.live_count = n_docs
+
+        deleted = [
+            np.flatnonzero(~mask) + offset
+            for mask, offset in zip(self.live, self.offsets)
+            if mask is not None
+        ]
+        self._deleted = (
+            np.concatenate(deleted) if deleted else np.zeros(0, dtype=np.int64)
+        )
+
+    @property
+    def corpus_size(self) -> int:
+        return int(self.offsets[-1])
+
+    def get_scores(self, query: Sequence[str]) -> np.ndarray:
+        """
+        Score every document against a tokenized query.
+
+        Returns:
+            np.ndarray: BM25 score per document with shape (n_docs,)
+        """
+        return self.get_scores_many([query])[0]
+
+    def get_scores_many(self, queries: Sequence[Sequence[str]]) -> np.ndarray:
+        """
+        Score every document against a batch of tokenized queries.
+
+        Returns:
+            np.ndarray: BM25 scores with shape (n_queries, n_docs)
+        """
+        scores = np.zeros((len(queries), self.corpus_size))
+        for index, idf, offset in zip(self.indexes, self.idf, self.offsets):
+            counts = index._query_matrix(queries)
+            term_ids = np.unique(counts.indices)
+            if not len(term_ids):
+                continue
+            weights = index._weights(index.tf[term_ids], idf[term_ids], self.avgdl)
+            segment_scores = (counts[:, term_ids] @ weights).toarray()
+            scores[:, offset : offset + index.corpus_size] = segment_scores
+        scores[:, self._deleted] = 0.0
+        return scores
+
+
+def _union_vocabulary(
+    vocabs: Sequence[Vocabulary],
+) -> Tuple[Vocabulary, List[np.ndarray]]:
+    """
+    Merge vocabularies into one.
+
+    Returns:
+        tuple: The merged vocabulary, and per input vocabulary an array mapping
+            its row ids to row ids of the merged one
+    """
+    sorted_terms = [vocab.sorted_terms() for vocab in vocabs]
+    terms = sorted(set().union(*sorted_terms))
+    positions = {term: i for i, term in enumerate(terms)}
+    term_maps = []
+    for vocab, vocab_terms in zip(vocabs, sorted_terms):
+        term_map = np.empty(len(vocab), dtype=np.int64)
+        term_map[vocab.ids] = np.fromiter(
+            map(positions.__getitem__, vocab_terms), dtype=np.int64, count=len(vocab)
+        )
+        term_maps.append(term_map)
+    merged = Vocabulary.from_sorted(terms, np.arange(len(terms), dtype=np.int64))
+    return merged, term_maps
@@ -0,0 +1,286 @@
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory cache with least-recently-used eviction.
+
+    Attributes:
+        max_items (int): Maximum number of entries kept (default: 10000)
+        ttl (float): Optional lifetime of an entry in seconds; expired entries are
+            dropped on access
+    """
+
+    def __init__(self, max_items: int = 10000, ttl: Optional[float] = None):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._expires: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable):
+        with self._lock:
+            if key not in self._data:
+                return None
+            if self.ttl is not None and self._expires[key] <= time.time():
+                del self._data[key]
+                del self._expires[key]
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key: Hashable, value) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self.ttl is not None:
+                self._expires[key] = time.time() + self.ttl
+            while len(self._data) > self.max_items:
+                evicted, _ = self._data.popitem(last=False)
+                self._expires.pop(evicted, None)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._expires.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    """
+    Disk-backed key/blob cache stored in a single SQLite file.
+
+    The database runs in WAL mode so several worker processes can share one file.
+    It is opened lazily on first access. Several caches can share a file by using
+    different tables.
+
+    When `max_items` is set, reads record an access time and writes evict the least
+    recently used rows beyond the limit. When `ttl` is set, rows older than `ttl`
+    seconds are ignored on read and purged on write.
+
+    Attributes:
+        path (str): Path of the SQLite database file
+        table (str): Table holding the entries (default: "cache")
+        max_items (int): Optional maximum number of rows kept
+        ttl (float): Optional lifetime of a row in seconds
+    """
+
+    # SQLite limits the number of bound parameters per statement
+    _BATCH = 500
+
+    def __init__(
+        self,
+        path: str,
+        table: str = "cache",
+        max_items: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name: {table}")
+        self.path = path
+        self.table = table
+        self.max_items = max_items
+        self.ttl = ttl
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        keys = list(keys)
+        found = {}
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            for start in range(0, len(keys), self._BATCH):
+                batch = keys[start : start + self._BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT key, value FROM {self.table} "
+                    f"WHERE key IN ({placeholders}) "
+                    "AND (expires_at IS NULL OR expires_at > ?)",
+                    [*batch, now],
+                ).fetchall()
+                found.update(rows)
+            if found and self.max_items is not None:
+                with conn:
+                    conn.executemany(
+                        f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?",
+                        [(now, key) for key in found],
+                    )
+        return found
+
+    def set(self, key: str, value: bytes) -> None:
+        self.set_many([(key, value)])
+
+    def set_many(self, items: List[Tuple[str, bytes]]) -> None:
+        if not items:
+            return
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl is not None else None
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO {self.table} "
+                    "(key, value, accessed_at, expires_at) VALUES (?, ?, ?, ?)",
+                    [(key, value, now, expires_at) for key, value in items],
+                )
+                if self.ttl is not None:
+                    conn.execute(
+                        f"DELETE FROM {self.table} WHERE expires_at <= ?", (now,)
+                    )
+                if self.max_items is not None:
+                    conn.execute(
+                        f"DELETE FROM {self.table} WHERE key IN ("
+                        f"SELECT key FROM {self.table} "
+                        "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                        (self.max_items,),
+                    )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(f"DELETE FROM {self.table}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            conn = self._connect()
+            return conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(key TEXT PRIMARY KEY, value BLOB, accessed_at REAL, expires_at REAL)"
+            )
+            # Tables created before eviction support only have key and value
+            columns = {
+                row[1] for row in self._conn.execute(f"PRAGMA table_info({self.table})")
+            }
+            for column in ("accessed_at", "expires_at"):
+                if column not in columns:
+                    self._conn.execute(
+                        f"ALTER TABLE {self.table} ADD COLUMN {column} REAL"
+                    )
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_accessed_at "
+                f"ON {self.table} (accessed_at)"
+            )
+            self._conn.commit()
+        return self._conn
+
+
+class TieredCache:
+    """
+    Two-tier cache for JSON-serializable values.
+
+    Lookups go through an in-memory LRU tier first and an optional SQLite tier
+    second; disk hits are promoted to memory. Both tiers share the same TTL.
+
+    Attributes:
+        memory: In-memory LRU tier
+        disk: Optional SQLite tier holding JSON-encoded values
+    """
+
+    def __init__(
+        self,
+        path: Optional[str],
+        table: str,
+        max_memory_items: int = 1000,
+        max_disk_items: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ):
+        self.memory = LRUCache(max_items=max_memory_items, ttl=ttl)
+        self.disk = (
+            SQLiteCache(path, table=table, max_items=max_disk_items, ttl=ttl)
+            if path
+            else None
+        )
+        self._counts = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+        if self.disk is not None:
+            blob = self.disk.get(key)
+            if blob is not None:
+                value = json.loads(blob)
+                self.memory.set(key, value)
+                self._count("disk_hits")
+                return value
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, json.dumps(value).encode())
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def stats(self) -> Dict:
+        """
+        Report hit/miss counters.
+
+        Returns:
+            dict: memory_hits, disk_hits, misses, hit_rate and memory_items
+        """
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts["memory_hits"] + counts["disk_hits"] + counts["misses"]
+        hits = counts["memory_hits"] + counts["disk_hits"]
+        return {
+            **counts,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_items": len(self.memory),
+        }
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+        with self._lock:
+            self._counts = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
@@ -0,0 +1,324 @@
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+# Per-chunk metadata keys derived from the store's columns
+CHUNK_FIELDS = ("chunk_index", "total_chunks", "page")
+NO_PAGE = -1
+
+
+@dataclass(slots=True)
+class Chunk:
+    content: str
+    metadata: Dict
+    index: int
+
+
+class ChunkStore:
+    """
+    Columnar storage for the chunks of one or more documents.
+
+    Chunk texts are UTF-8 encoded into one contiguous byte buffer and located by
+    an offsets array, and per-chunk fields are NumPy arrays: the id of the chunk's
+    document, its position within the document and the page it starts on.
+    Document metadata (e.g. every pypdf metadata entry of a PDF) is stored once
+    per document rather than copied into each chunk.
+
+    Indexing the store materializes a Chunk whose metadata merges the document
+    metadata with the chunk's `chunk_index`, `total_chunks` and `page`, so only
+    chunks that are actually returned cost Python objects.
+
+    Attributes:
+        buffer (np.ndarray): UTF-8 bytes of all chunk texts, as uint8
+        offsets (np.ndarray): Byte offset of each chunk, plus the buffer length
+        doc_ids (np.ndarray): Document id of each chunk
+        positions (np.ndarray): Index of each chunk within its document
+        pages (np.ndarray): Page each chunk starts on, or NO_PAGE
+        documents (List[Dict]): Metadata of each document
+    """
+
+    def __init__(
+        self,
+        buffer: np.ndarray,
+        offsets: np.ndarray,
+        doc_ids: np.ndarray,
+        positions: np.ndarray,
+        pages: np.ndarray,
+        documents: List[Dict],
+    ):
+        if not len(offsets) == len(doc_ids) + 1 == len(positions) + 1 == len(pages) + 1:
+            raise ValueError("Chunk columns must have one entry per chunk")
+        self.buffer = buffer
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.positions = positions
+        self.pages = pages
+        self.documents = documents
+        self._doc_counts = np.bincount(doc_ids, minlength=len(documents))
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def __getitem__(self, i: int) -> Chunk:
+        i = int(i)
+        if not 0 <= i < len(self):
+            raise IndexError(f"Chunk {i} out of range for {len(self)} chunks")
+        doc_id = self.doc_ids.item(i)
+        metadata = {
+            **self.documents[doc_id],
+            "chunk_index": self.positions.item(i),
+            "total_chunks": self._doc_counts.item(doc_id),
+        }
+        page = self.pages.item(i)
+        if page != NO_PAGE:
+            metadata["page"] = page
+        return Chunk(content=self.text(i), metadata=metadata, index=i)
+
+    def __iter__(self) -> Iterator[Chunk]:
+        return (self[i] for i in range(len(self)))
+
+    def text(self, i: int) -> str:
+        """Text of chunk `i`, decoded without building its metadata."""
+        start, end = self.offsets.item(i), self.offsets.item(i + 1)
+        return self.buffer[start:end].tobytes().decode()
+
+    def texts(self) -> Iterator[str]:
+        """Texts of all chunks, in order."""
+        return (self.text(i) for i in range(len(self)))
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes held by the text buffer and the per-chunk columns."""
+        return sum(
+            array.nbytes
+            for array in (
+                self.buffer,
+                self.offsets,
+                self.doc_ids,
+                self.positions,
+                self.pages,
+            )
+        )
+
+    def update_metadata(self, metadata: Dict) -> None:
+        """Add fields to the metadata of every document in the store."""
+        for document in self.documents:
+            document.update(metadata)
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[Chunk]) -> "ChunkStore":
+        """
+        Build a store from Chunk objects, e.g. ones built by hand or in tests.
+
+        Consecutive chunks with the same metadata, apart from their chunk fields,
+        are grouped into one document. Chunk indices are not kept; chunks are
+        numbered by their position.
+        """
+        builder = ChunkStoreBuilder()
+        previous = None
+        doc_id = -1
+        for chunk in chunks:
+            document = {
+                key: value
+                for key, value in chunk.metadata.items()
+                if key not in CHUNK_FIELDS
+            }
+            if document != previous:
+                doc_id = builder.add_document(document)
+                previous = document
+            builder.add(
+                chunk.content,
+                doc_id,
+                page=chunk.metadata.get("page"),
+                position=chunk.metadata.get("chunk_index"),
+            )
+        return builder.build()
+
+    @classmethod
+    def concat(cls, stores: Sequence["ChunkStore"]) -> "ChunkStore":
+        """
+        Combine stores into one, keeping chunks in order, store by store.
+
+        Args:
+            stores: Stores to combine
+
+        Returns:
+            ChunkStore: Store over all chunks; document ids are renumbered
+
+        Raises:
+            ValueError: If `stores` is empty
+        """
+        if not stores:
+            raise ValueError("Cannot combine an empty list of chunk stores")
+        offsets = [np.zeros(1, dtype=np.int64)]
+        doc_ids = []
+        byte_offset, doc_offset = 0, 0
+        for store in stores:
+            offsets.append(store.offsets[1:] + byte_offset)
+            doc_ids.append(store.doc_ids + doc_offset)
+            byte_offset += int(store.offsets[-1])
+            doc_offset += len(store.documents)
+        return cls(
+            np.concatenate([store.buffer for store in stores]),
+            np.concatenate(offsets),
+            np.concatenate(doc_ids).astype(np.int32),
+            np.concatenate([store.positions for store in stores]),
+            np.concatenate([store.pages for store in stores]),
+            [dict(document) for store in stores for document in store.documents],
+        )
+
+    def take(self, rows: Sequence[int]) -> "ChunkStore":
+        """
+        Build a store from some of the chunks, e.g. to drop deleted documents.
+
+        Documents without a remaining chunk are dropped. Chunk positions are kept,
+        so documents should be kept or dropped as a whole.
+
+        Args:
+            rows: Chunks to keep, in the order they appear in the result
+
+        Returns:
+            ChunkStore: Store over the selected chunks
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        starts = self.offsets[rows]
+        lengths = self.offsets[rows + 1] - starts
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        # Byte positions of the kept texts, gathered in one indexing operation
+        source = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+        documents, doc_ids = np.unique(self.doc_ids[rows], return_inverse=True)
+        return ChunkStore(
+            np.ascontiguousarray(self.buffer[source]),
+            offsets,
+            doc_ids.astype(np.int32),
+            np.ascontiguousarray(self.positions[rows]),
+            np.ascontiguousarray(self.pages[rows]),
+            [dict(self.documents[doc_id]) for doc_id in documents.tolist()],
+        )
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """The text buffer and per-chunk columns, for storing the store in a segment."""
+        return {
+            "text": self.buffer,
+            "offsets": self.offsets,
+            "doc_ids": self.doc_ids,
+            "positions": self.positions,
+            "pages": self.pages,
+        }
+
+    @classmethod
+    def from_arrays(
+        cls, arrays: Dict[str, np.ndarray], documents: List[Dict]
+    ) -> "ChunkStore":
+        """Rebuild a store from `arrays` without copying them, e.g. memory-mapped."""
+        return cls(
+            arrays["text"],
+            arrays["offsets"],
+            arrays["doc_ids"],
+            arrays["positions"],
+            arrays["pages"],
+            documents,
+        )
+
+
+class SegmentedChunks:
+    """
+    Read-only view over the chunk stores of several segments.
+
+    Chunk ids run through the stores in order, so they line up with the
+    document ids of SegmentedBM25 and the vector ids of SegmentedIndex over the
+    same segments.
+
+    Attributes:
+        stores (List[ChunkStore]): Store of each segment
+        offsets (np.ndarray): First chunk id of each store, plus the total
+    """
+
+    def __init__(self, stores: Sequence[ChunkStore]):
+        self.stores = list(stores)
+        self.offsets = np.cumsum([0] + [len(store) for store in self.stores])
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+
+    def __getitem__(self, i: int) -> Chunk:
+        i = int(i)
+        if not 0 <= i < len(self):
+            raise IndexError(f"Chunk {i} out of range for {len(self)} chunks")
+        segment = int(np.searchsorted(self.offsets, i, side="right")) - 1
+        chunk = self.stores[segment][i - self.offsets.item(segment)]
+        chunk.index = i
+        return chunk
+
+    def __iter__(self) -> Iterator[Chunk]:
+        return (self[i] for i in range(len(self)))
+
+
+class ChunkStoreBuilder:
+    """
+    Appends chunks to growing buffers and freezes them into a ChunkStore.
+
+    Example:
+        builder = ChunkStoreBuilder()
+        doc_id = builder.add_document({"title": "Report"})
+        builder.add("First chunk", doc_id, page=1)
+        store = builder.build()
+    """
+
+    def __init__(self):
+        # Typed arrays rather than lists, to hold millions of chunks compactly
+        self._buffer = bytearray()
+        self._offsets = array("q", [0])
+        self._doc_ids = array("i")
+        self._positions = array("i")
+        self._pages = array("i")
+        self._documents: List[Dict] = []
+        self._doc_counts: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._doc_ids)
+
+    def add_document(self, metadata: Dict) -> int:
+        """Register a document's metadata and return its id."""
+        self._documents.append(metadata)
+        self._doc_counts.append(0)
+        return len(self._documents) - 1
+
+    def add(
+        self,
+        text: str,
+        doc_id: int,
+        page: Optional[int] = None,
+        position: Optional[int] = None,
+    ) -> int:
+        """
+        Append a chunk and return its index in the store.
+
+        Args:
+            text: Chunk text
+            doc_id: Id returned by `add_document`
+            page: Page the chunk starts on, if the document has pages
+            position: Index within the document (default: the next one)
+        """
+        self._buffer += text.encode()
+        self._offsets.append(len(self._buffer))
+        self._doc_ids.append(doc_id)
+        self._positions.append(
+            self._doc_counts[doc_id] if position is None else position
+        )
+        self._pages.append(NO_PAGE if page is None else page)
+        self._doc_counts[doc_id] += 1
+        return len(self._doc_ids) - 1
+
+    def build(self) -> ChunkStore:
+        """Freeze the chunks added so far into a ChunkStore."""
+        return ChunkStore(
+            np.frombuffer(bytes(self._buffer), dtype=np.uint8),
+            np.array(self._offsets, dtype=np.int64),
+            np.array(self._doc_ids, dtype=np.int32),
+            np.array(self._positions, dtype=np.int32),
+            np.array(self._pages, dtype=np.int32),
+            list(self._documents),
+        )
@@ -0,0 +1,161 @@
+from typing import List, Optional, Sequence, Tuple
+import bisect
+
+DEFAULT_SEPARATORS = ("\n\n", "\n", ". ", "—", ", ", " ")
+
+
+class Chunker:
+    """
+    Single-pass text splitter returning chunk offsets.
+
+    Chunks are sized in characters, or in tokens when a tokenizer is given, so
+    chunk_size can match the embedding model's sequence limit. In token mode the
+    text is tokenized once and chunk limits are looked up in the token offsets.
+
+    Chunks are cut greedily from left to right: each chunk ends after the last
+    occurrence of the coarsest separator that fits within chunk_size, or at the
+    size limit when none does. The next chunk starts at the first separator inside
+    the final chunk_overlap units of the previous one, so overlaps begin on a word
+    or sentence boundary. Separators are only searched for inside the current
+    window, so each character is scanned about once per separator.
+
+    Leading and trailing whitespace is excluded from each chunk, and whitespace-only
+    chunks are skipped.
+
+    Attributes:
+        chunk_size (int): Maximum chunk length in units (default: 500)
+        chunk_overlap (int): Units shared by consecutive chunks (default: 50)
+        tokenizer: Optional Hugging Face tokenizer; when set, units are tokens
+            rather than characters
+        separators (Sequence[str]): Split points from coarsest to finest
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 500,
+        chunk_overlap: int = 50,
+        tokenizer=None,
+        separators: Sequence[str] = DEFAULT_SEPARATORS,
+    ):
+        if chunk_size <= 0 or not 0 <= chunk_overlap < chunk_size:
+            raise ValueError(
+                f"Invalid chunk size {chunk_size} with overlap {chunk_overlap}"
+            )
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.tokenizer = tokenizer
+        self.separators = tuple(separator for separator in separators if separator)
+        # A separator ending with another one adds no boundaries of its own
+        # when looking for where the next chunk starts
+        self._start_separators = [
+            (separator, len(separator))
+            for separator in self.separators
+            if not any(
+                other != separator and separator.endswith(other)
+                for other in self.separators
+            )
+        ]
+
+    @property
+    def unit(self) -> str:
+        return "chars" if self.tokenizer is None else "tokens"
+
+    def split(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Split text into chunks.
+
+        Args:
+            text: Text to split
+
+        Returns:
+            List[Tuple[int, int]]: (start, end) offsets of each chunk in `text`
+        """
+        n = len(text)
+        token_starts = self._token_starts(text)
+
+        spans = []
+        start = previous_end = 0
+        while start < n:
+            limit = self._limit(token_starts, start, n)
+            if limit >= n:
+                end = n
+            else:
+                end = self._last_boundary(text, max(start, previous_end), limit)
+                if end is None:
+                    end = max(limit, previous_end + 1)
+            span = _strip(text, start, end)
+            if span is not None:
+                spans.append(span)
+            if end >= n:
+                break
+
+            floor = max(self._overlap_floor(token_starts, end), start + 1)
+            start = self._first_boundary(text, floor, end)
+            previous_end = end
+        return spans
+
+    def split_text(self, text: str) -> List[str]:
+        """
+        Split text into chunk strings.
+
+        Args:
+            text: Text to split
+
+        Returns:
+            List[str]: Chunks in document order
+        """
+        return [text[start:end] for start, end in self.split(text)]
+
+    def _token_starts(self, text: str) -> Optional[List[int]]:
+        if self.tokenizer is None:
+            return None
+        encoding = self.tokenizer(
+            text,
+            add_special_tokens=False,
+            return_offsets_mapping=True,
+            verbose=False,
+        )
+        return [start for start, _ in encoding["offset_mapping"]]
+
+    def _limit(self, token_starts: Optional[List[int]], start: int, n: int) -> int:
+        """Offset where a chunk starting at `start` reaches chunk_size units."""
+        if token_starts is None:
+            return min(start + self.chunk_size, n)
+        i = bisect.bisect_left(token_starts, start) + self.chunk_size
+        return token_starts[i] if i < len(token_starts) else n
+
+    def _overlap_floor(self, token_starts: Optional[List[int]], end: int) -> int:
+        """Earliest offset within chunk_overlap units before `end`."""
+        if token_starts is None:
+            return end - self.chunk_overlap
+        i = bisect.bisect_left(token_starts, end) - self.chunk_overlap
+        return token_starts[i] if i >= 0 else 0
+
+    def _last_boundary(self, text: str, low: int, limit: int) -> Optional[int]:
+        """End of the last separator in (low, limit], trying coarse separators first."""
+        for separator in self.separators:
+            found = text.rfind(separator, low, limit)
+            if found >= 0:
+                return found + len(separator)
+        return None
+
+    def _first_boundary(self, text: str, floor: int, end: int) -> int:
+        """End of the first separator in [floor, end), or `end` if there is none."""
+        first = end
+        for separator, width in self._start_separators:
+            found = text.find(
+                separator, floor - width if floor > width else 0, first - 1
+            )
+            if found >= 0:
+                first = found + width
+        return first
+
+
+def _strip(text: str, start: int, end: int) -> Optional[Tuple[int, int]]:
+    # Chunks rarely start or end with more than a few spaces, so walking the
+    # edges is cheaper than stripping a copy of the chunk
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return (start, end) if start < end else None
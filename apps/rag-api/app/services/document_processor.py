@@ -1,23 +1,75 @@
-from dataclasses import dataclass
-from typing import Dict, Tuple
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from sentence_transformers import SentenceTransformer
-from rank_bm25 import BM25Okapi
-from nltk.tokenize import word_tokenize
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import json
-from bs4 import BeautifulSoup, Tag
 from app.core import logger
-from pypdf import PdfReader
-import io
+from app.core.executor import Executor
+from app.core.metrics import BATCH_SIZE, DOCUMENT_CHUNKS, StageTimer
+import numpy as np
+import bisect
 
-from app.core.config import SUPPORTED_CONTENT_TYPES
+from app.core.config import (
+    CHUNK_OVERLAP,
+    CHUNK_SIZE,
+    CHUNK_UNIT,
+    DEFAULT_EMBEDDING_MODEL,
+    SUPPORTED_CONTENT_TYPES,
+)
+from app.services.analyzer import Analyzer, default_analyzer
+from app.services.bm25 import SparseBM25
+from app.services.chunk_store import Chunk, ChunkStore, ChunkStoreBuilder
+from app.services.chunker import Chunker
+from app.services.embedding_cache import EmbeddingCache, embedding_cache
+from app.services.html_extractor import extract_html
+from app.services.model_registry import model_registry
+from app.services.pdf_extractor import iter_pdf_pages, iter_pdf_pages_parallel
 
 
-@dataclass
-class Chunk:
-    content: str
-    metadata: Dict
-    index: int
+def extract_text(file_content, content_type: str) -> Tuple[str, Dict]:
+    """
+    Extract plain text and metadata if applicable from various file formats.
+
+    Supports PDF, JSON, HTML, and JavaScript files. Handles text extraction
+    with appropriate preprocessing for each format. This is a module-level function
+    so it can run in a worker process.
+
+    Args:
+        file_content: Raw file content bytes
+        content_type: MIME type of the file
+
+    Returns:
+        Tuple[str, Dict] : Extracted text and metadata
+
+    Raises:
+        ValueError: If file type is unsupported or processing fails
+    """
+    logger.info("Extracting text from file", content_type=content_type)
+    if content_type not in SUPPORTED_CONTENT_TYPES:
+        logger.error(f"Unsupported file type: {content_type}")
+        raise ValueError(f"Unsupported file type: {content_type}")
+
+    metadata = {}
+
+    try:
+        if content_type == "application/pdf":
+            pdf_info, pages = iter_pdf_pages(file_content)
+            metadata.update(pdf_info)
+            text = "".join(f"{page_text}\n" for _, page_text in pages)
+            return text, metadata
+
+        content = file_content.decode("utf-8")
+        if content_type == "application/json":
+            json_data = json.loads(content)
+            return json.dumps(json_data, indent=2), metadata
+        elif content_type == "text/html":
+            page = extract_html(content, separator=" ")
+            metadata.update({"title": page.title, "description": page.description})
+            return page.text, metadata
+        elif content_type in ["text/javascript", "application/javascript"]:
+            return content, metadata
+        # TODO: add more types or a fallback
+        return content, metadata
+    except Exception as e:
+        logger.error("Text extraction failed", error=str(e), content_type=content_type)
+        raise ValueError(f"Error processing file: {str(e)}")
 
 
 class DocumentProcessor:
@@ -28,96 +80,74 @@ class DocumentProcessor:
     It supports multiple file formats and creates both semantic embeddings and BM25 indices
     for hybrid search.
 
-    Implementation uses RecursiveCharacterTextSplitter from LangChain for chunking,
-    BGE embeddings for semantic representations, and BM25Okapi for lexical search.
+    Implementation uses Chunker for chunking, BGE embeddings for semantic
+    representations, and SparseBM25 for lexical search. Chunks are sized in the
+    embedding model's tokens by default, and chunk_size is capped at the model's
+    sequence limit so chunks are never truncated when embedded.
 
     Attributes:
-        text_splitter: RecursiveCharacterTextSplitter for document chunking
-        model: SentenceTransformer model for computing embeddings (default: BAAI/bge-base-en-v1.5)
-        chunk_size (int): Size of text chunks (default: 500)
-        chunk_overlap (int): Overlap between chunks (default: 50)
+        chunker: Chunker for document chunking
+        model: SentenceTransformer model for computing embeddings (default: BAAI/bge-base-en-v1.5),
+            shared across instances through the model registry
+        model_name (str): Name of the embedding model
+        embedding_cache: EmbeddingCache consulted before encoding chunks
+        executor: Optional Executor; when set, PDF and HTML extraction run in its
+            process pool
+        analyzer: Analyzer producing BM25 terms; queries must use the same one
+            (default: the configured analyzer)
+        chunk_size (int): Size of text chunks (default: HEIDA_CHUNK_SIZE)
+        chunk_overlap (int): Overlap between chunks (default: HEIDA_CHUNK_OVERLAP)
+        chunk_unit (str): "tokens" or "chars" (default: HEIDA_CHUNK_UNIT)
+        embed_batch_size (int): Chunks embedded per encoder call while streaming
+            (default: 256)
     """
 
     def __init__(
         self,
-        model: str = "BAAI/bge-base-en-v1.5",
-        chunk_size: int = 500,
-        chunk_overlap: int = 50,
+        model: str = DEFAULT_EMBEDDING_MODEL,
+        chunk_size: int = CHUNK_SIZE,
+        chunk_overlap: int = CHUNK_OVERLAP,
+        chunk_unit: str = CHUNK_UNIT,
+        embedding_cache: EmbeddingCache = embedding_cache,
+        executor: Optional[Executor] = None,
+        embed_batch_size: int = 256,
+        analyzer: Analyzer = default_analyzer,
     ):
+        if chunk_unit not in ("tokens", "chars"):
+            raise ValueError(f"Unknown chunk unit: {chunk_unit}")
+        self.model = model_registry.get_embedding_model(model)
+        self.model_name = model
+
+        tokenizer = None
+        if chunk_unit == "tokens":
+            tokenizer = model_registry.get_tokenizer(model)
+            max_seq_length = getattr(self.model, "max_seq_length", None)
+            if max_seq_length and chunk_size > max_seq_length - 2:
+                # Leave room for the [CLS] and [SEP] tokens added when encoding
+                chunk_size = max_seq_length - 2
+                chunk_overlap = min(chunk_overlap, chunk_size // 2)
         logger.info(
             "Initializing DocumentProcessor",
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
+            chunk_unit=chunk_unit,
         )
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            separators=["\n\n", "\n", ". ", "—", ", ", " ", ""],
-        )
-        self.model = SentenceTransformer(model)
+        self.chunker = Chunker(chunk_size, chunk_overlap, tokenizer=tokenizer)
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.chunk_unit = chunk_unit
+        self.embedding_cache = embedding_cache
+        self.executor = executor
+        self.embed_batch_size = embed_batch_size
+        self.analyzer = analyzer
 
     def extract_text(self, file_content, content_type: str) -> Tuple[str, Dict]:
         """
         Extract plain text and metadata if applicable from various file formats.
 
-        Supports PDF, JSON, HTML, and JavaScript files. Handles text extraction
-        with appropriate preprocessing for each format.
-
-        Args:
-            file_content: Raw file content bytes
-            content_type: MIME type of the file
-
-        Returns:
-            Tuple[str, Dict] : Extracted text and metadata
-
-        Raises:
-            ValueError: If file type is unsupported or processing fails
+        See `extract_text` at module level.
         """
-        logger.info("Extracting text from file", content_type=content_type)
-        if content_type not in SUPPORTED_CONTENT_TYPES:
-            logger.error(f"Unsupported file type: {content_type}")
-            raise ValueError(f"Unsupported file type: {content_type}")
-
-        metadata = {}
-
-        try:
-            if content_type == "application/pdf":
-                pdf_file = io.BytesIO(file_content)
-                pdf_reader = PdfReader(pdf_file)
-                text = ""
-                if pdf_reader.metadata:
-                    metadata.update(pdf_reader.metadata)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-                return text, metadata
-
-            content = file_content.decode("utf-8")
-            if content_type == "application/json":
-                json_data = json.loads(content)
-                return json.dumps(json_data, indent=2), metadata
-            elif content_type == "text/html":
-                soup = BeautifulSoup(content, "html.parser")
-                meta_tag = soup.find("meta", {"name": "description"})
-                metadata.update(
-                    {
-                        "title": soup.title.string if soup.title else None,
-                        "description": meta_tag["content"]
-                        if meta_tag and isinstance(meta_tag, Tag)
-                        else None,
-                    }
-                )
-                for script in soup(["script", "style"]):
-                    script.decompose()
-                return soup.get_text(separator=" ", strip=True), metadata
-            elif content_type in ["text/javascript", "application/javascript"]:
-                return content, metadata
-            # TODO: add more types or a fallback
-            return content, metadata
-        except Exception as e:
-            logger.error(
-                "Text extraction failed", error=str(e), content_type=content_type
-            )
-            raise ValueError(f"Error processing file: {str(e)}")
+        return extract_text(file_content, content_type)
 
     # NOTE: Contextual enrichment works but kinda slow/expensive
     # def create_context(self, chunk):
@@ -131,54 +161,198 @@ class DocumentProcessor:
     #     return completion.choices[0].message.content
     #
 
-    def process_documents(self, file_content, content_type: str) -> tuple:
+    def process_documents(
+        self,
+        file_content,
+        content_type: str,
+        reuse: Optional[Dict[str, np.ndarray]] = None,
+    ) -> tuple:
         """
         Process document and metadata content into chunks with embeddings and BM25 index.
 
+        PDFs are streamed page by page: with an executor, page ranges are extracted
+        in its process pool (see `iter_pdf_pages_parallel`). HTML is parsed in the
+        process pool as well, while plain text, JSON and JavaScript are decoded inline. Each page is split into chunks as soon as it
+        is parsed, with overlap kept across page boundaries, and chunks are embedded
+        and tokenized in batches of `embed_batch_size`. PDF chunks record the page
+        they start on in their `page` metadata.
+
+        Chunks are collected into a ChunkStore, which keeps the document metadata
+        once instead of copying it into every chunk.
+
+        Since the stages interleave, a StageTimer splits the elapsed time into the
+        extract, chunk, embed, analyze and bm25 stages.
+
         Args:
             file_content: Raw file content bytes
             content_type: MIME type of the file
+            reuse: Embeddings of known chunk texts, e.g. the chunks of a previous
+                version of the document; matching chunks are not embedded again
 
         Returns:
-            tuple: Tuple containing chunks, embeddings, and BM25 index
+            tuple: Tuple containing the ChunkStore, embeddings, and BM25 index
         """
         logger.info("Processing document", content_type=content_type)
-        text, doc_metadata = self.extract_text(file_content, content_type)
-        raw_chunks = self.text_splitter.split_text(text)
+        timer = StageTimer()
+        with timer.stage("extract"):
+            if content_type == "application/pdf" and self._parallel_pdf():
+                doc_metadata, pages = iter_pdf_pages_parallel(
+                    file_content, self.executor
+                )
+            elif content_type == "application/pdf":
+                doc_metadata, pages = iter_pdf_pages(file_content)
+            elif content_type == "text/html":
+                text, doc_metadata = self._run_cpu_bound(
+                    extract_text, file_content, content_type
+                )
+                pages = iter([(None, text)])
+            else:
+                # Decoding text is cheaper than pickling it to a worker process
+                text, doc_metadata = extract_text(file_content, content_type)
+                pages = iter([(None, text)])
+        pages = timer.iterate("extract", pages)
 
         # NOTE: Contextual enrichment
         # for i, chunk in enumerate(chunks):
         #    context = self.create_context(chunk)
         #    chunks[i] = f"{context}; {chunk}"
 
-        if not raw_chunks:
+        builder = ChunkStoreBuilder()
+        doc_id = builder.add_document(doc_metadata)
+        embedding_batches = []
+        tokenized_corpus = []
+        batch = []
+        for content, page in timer.iterate("chunk", self.iter_chunks(pages)):
+            builder.add(content, doc_id, page=page)
+            batch.append(content)
+            if len(batch) >= self.embed_batch_size:
+                self._embed_batch(
+                    batch, embedding_batches, tokenized_corpus, timer, reuse
+                )
+                batch = []
+        if batch:
+            self._embed_batch(batch, embedding_batches, tokenized_corpus, timer, reuse)
+
+        if not len(builder):
             logger.error("No chunks generated from document")
             raise ValueError("No text chunks were generated from the document")
 
-        chunks = []
-        for i, content in enumerate(raw_chunks):
-            chunk = Chunk(
-                content=content,
-                metadata={
-                    **doc_metadata,
-                    "chunk_index": i,
-                    "total_chunks": len(raw_chunks),
-                },
-                index=i,
-            )
-            chunks.append(chunk)
-
-        logger.info("Generated chunks", chunk_count=len(chunks))
-
-        # NOTE: probably move to separate method
-        chunk_texts = [chunk.content for chunk in chunks]
-        embeddings = self.model.encode(chunk_texts, normalize_embeddings=True)
+        chunks = builder.build()
+        logger.info(
+            "Generated chunks",
+            chunk_count=len(chunks),
+            memory_bytes=chunks.memory_bytes,
+        )
+
+        embeddings = np.concatenate(embedding_batches)
         logger.info("Generated embeddings", embedding_shape=embeddings.shape)
 
-        tokenized_corpus = [word_tokenize(text.lower()) for text in chunk_texts]
-        bm25 = BM25Okapi(tokenized_corpus)
+        with timer.stage("bm25"):
+            bm25 = SparseBM25(tokenized_corpus)
         logger.info("Created BM25 index")
 
-        logger.info("Document processed", chunk_count=len(chunks))
+        timer.record()
+        DOCUMENT_CHUNKS.observe(len(chunks))
+        logger.info(
+            "Document processed",
+            chunk_count=len(chunks),
+            seconds={stage: round(t, 4) for stage, t in timer.seconds.items()},
+        )
 
         return chunks, embeddings, bm25
+
+    def iter_chunks(
+        self, pages: Iterable[Tuple[Optional[int], str]]
+    ) -> Iterator[Tuple[str, Optional[int]]]:
+        """
+        Split a stream of pages into chunks without joining the whole document.
+
+        Pages are appended to a working buffer that is re-split after every page.
+        All chunks but the last are final and yielded; the buffer then restarts at
+        the last chunk, which may still grow with text from the next page. Overlap
+        between chunks is therefore preserved across page boundaries, and the buffer
+        never holds much more than one page plus one chunk.
+
+        Args:
+            pages: (page_number, text) pairs in document order
+
+        Yields:
+            Tuple[str, Optional[int]]: Chunk text and the page the chunk starts on
+        """
+        buffer = ""
+        # (offset in buffer, page number) of each page start still in the buffer
+        page_starts: List[Tuple[int, Optional[int]]] = []
+
+        def page_at(offset: int) -> Optional[int]:
+            offsets = [start for start, _ in page_starts]
+            return page_starts[bisect.bisect_right(offsets, offset) - 1][1]
+
+        for page, text in pages:
+            if buffer:
+                buffer += "\n"
+            page_starts.append((len(buffer), page))
+            buffer += text
+
+            spans = self.chunker.split(buffer)
+            if len(spans) < 2:
+                continue
+            for start, end in spans[:-1]:
+                yield buffer[start:end], page_at(start)
+
+            keep = spans[-1][0]
+            last_page = page_at(keep)
+            buffer = buffer[keep:]
+            page_starts = [(0, last_page)] + [
+                (start - keep, number) for start, number in page_starts if start > keep
+            ]
+
+        for start, end in self.chunker.split(buffer):
+            yield buffer[start:end], page_at(start)
+
+    def _embed_batch(
+        self,
+        chunk_texts: List[str],
+        embedding_batches: List[np.ndarray],
+        tokenized_corpus: List[List[str]],
+        timer: StageTimer,
+        reuse: Optional[Dict[str, np.ndarray]] = None,
+    ) -> None:
+        BATCH_SIZE.observe(len(chunk_texts), batch="embed")
+        with timer.stage("embed"):
+            embedding_batches.append(self._encode(chunk_texts, reuse))
+        with timer.stage("analyze"):
+            tokenized_corpus.extend(self.analyzer.analyze_many(chunk_texts))
+
+    def _encode(
+        self, chunk_texts: List[str], reuse: Optional[Dict[str, np.ndarray]]
+    ) -> np.ndarray:
+        """Embed chunks through the cache, taking known texts from `reuse`."""
+        if not reuse:
+            return self.embedding_cache.encode(self.model, self.model_name, chunk_texts)
+        missing = [text for text in chunk_texts if text not in reuse]
+        encoded = {}
+        if missing:
+            vectors = self.embedding_cache.encode(self.model, self.model_name, missing)
+            encoded = dict(zip(missing, vectors))
+        logger.info(
+            "Reused chunk embeddings",
+            reused=len(chunk_texts) - len(missing),
+            encoded=len(missing),
+        )
+        return np.stack(
+            [reuse[text] if text in reuse else encoded[text] for text in chunk_texts]
+        ).astype(np.float32, copy=False)
+
+    def _parallel_pdf(self) -> bool:
+        return self.executor is not None and self.executor.process_workers > 0
+
+    def _run_cpu_bound(self, fn, *args):
+        """
+        Run a GIL-bound step in the executor's process pool, or inline without one.
+
+        Blocks the calling thread, which is expected to be an executor worker thread
+        rather than the event loop.
+        """
+        if self.executor is None:
+            return fn(*args)
+        return self.executor.submit_process(fn, *args).result()
@@ -0,0 +1,137 @@
+from typing import Dict, List, Optional
+from app.core import logger
+from app.core.config import EMBEDDING_CACHE_MAX_ITEMS, EMBEDDING_CACHE_PATH
+from app.services.cache import LRUCache, SQLiteCache
+import numpy as np
+import hashlib
+import threading
+import unicodedata
+
+
+class EmbeddingCache:
+    """
+    Content-addressed cache for chunk embeddings.
+
+    Embeddings are keyed by the model name and a hash of the normalized chunk text,
+    so identical chunks from re-uploaded documents or re-fetched pages are only
+    encoded once. Lookups go through an in-memory LRU tier first and an SQLite
+    tier on disk second; only misses reach the encoder.
+
+    Attributes:
+        memory: In-memory LRU tier holding float32 vectors
+        disk: Optional SQLite tier holding raw float32 bytes
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = EMBEDDING_CACHE_PATH,
+        max_memory_items: int = EMBEDDING_CACHE_MAX_ITEMS,
+    ):
+        self.memory = LRUCache(max_items=max_memory_items)
+        self.disk = SQLiteCache(path) if path else None
+        self._counts = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model_name: str, text: str) -> str:
+        """
+        Build the cache key for a chunk.
+
+        Text is NFC-normalized and whitespace-collapsed before hashing so that
+        formatting-only differences share an entry.
+        """
+        normalized = " ".join(unicodedata.normalize("NFC", text).split())
+        return hashlib.sha256(f"{model_name}\0{normalized}".encode()).hexdigest()
+
+    def encode(self, model, model_name: str, texts: List[str]) -> np.ndarray:
+        """
+        Return normalized embeddings for texts, encoding only cache misses.
+
+        Args:
+            model: SentenceTransformer used for misses
+            model_name: Name of the model, part of the cache key
+            texts: Texts to embed
+
+        Returns:
+            np.ndarray: float32 embeddings with shape (len(texts), dim)
+        """
+        keys = [self.key(model_name, text) for text in texts]
+        vectors: Dict[str, np.ndarray] = {}
+
+        for key in keys:
+            if key not in vectors:
+                vector = self.memory.get(key)
+                if vector is not None:
+                    vectors[key] = vector
+        memory_hits = len(vectors)
+
+        pending = [key for key in dict.fromkeys(keys) if key not in vectors]
+        disk_hits = 0
+        if pending and self.disk is not None:
+            for key, blob in self.disk.get_many(pending).items():
+                vector = np.frombuffer(blob, dtype=np.float32)
+                vectors[key] = vector
+                self.memory.set(key, vector)
+                disk_hits += 1
+
+        # Encode each distinct missing text once
+        misses = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in misses:
+                misses[key] = text
+        if misses:
+            encoded = np.asarray(
+                model.encode(list(misses.values()), normalize_embeddings=True),
+                dtype=np.float32,
+            )
+            for key, vector in zip(misses, encoded):
+                vectors[key] = vector
+                self.memory.set(key, vector)
+            if self.disk is not None:
+                self.disk.set_many(
+                    [(key, vector.tobytes()) for key, vector in zip(misses, encoded)]
+                )
+
+        with self._lock:
+            self._counts["memory_hits"] += memory_hits
+            self._counts["disk_hits"] += disk_hits
+            self._counts["misses"] += len(misses)
+
+        logger.info(
+            "Embedding cache lookup",
+            model=model_name,
+            memory_hits=memory_hits,
+            disk_hits=disk_hits,
+            misses=len(misses),
+        )
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([vectors[key] for key in keys])
+
+    def stats(self) -> Dict:
+        """
+        Report hit/miss counters.
+
+        Returns:
+            dict: memory_hits, disk_hits, misses, hit_rate and memory_items
+        """
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts["memory_hits"] + counts["disk_hits"] + counts["misses"]
+        hits = counts["memory_hits"] + counts["disk_hits"]
+        return {
+            **counts,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_items": len(self.memory),
+        }
+
+    def clear(self) -> None:
+        """Drop all cached embeddings and reset counters."""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+        with self._lock:
+            self._counts = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+
+embedding_cache = EmbeddingCache()
@@ -0,0 +1,138 @@
+from typing import Optional, Sequence, Tuple
+from app.core.config import FUSION_METHOD, FUSION_RRF_K, FUSION_SEMANTIC_WEIGHT
+from app.services.vector_index import top_k_rows
+import numpy as np
+
+FUSION_METHODS = ("rrf", "combsum", "combmnz", "minmax")
+
+# (ids, scores) of one retriever's candidates for one query
+Ranking = Tuple[np.ndarray, np.ndarray]
+
+
+def min_max(scores: np.ndarray) -> np.ndarray:
+    """
+    Scale scores to [0, 1]; a list whose scores are all equal maps to ones.
+
+    Args:
+        scores: Scores of one candidate list
+
+    Returns:
+        np.ndarray: Normalized scores
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    if not len(scores):
+        return scores
+    low, high = scores.min(), scores.max()
+    if high == low:
+        return np.ones_like(scores)
+    return (scores - low) / (high - low)
+
+
+def reciprocal_ranks(scores: np.ndarray, k: float) -> np.ndarray:
+    """
+    1 / (k + rank) of each candidate, ranking by descending score from 1.
+
+    Args:
+        scores: Scores of one candidate list, in any order
+        k: Smoothing constant; larger values flatten the rank discount
+
+    Returns:
+        np.ndarray: Reciprocal rank of each candidate, aligned with `scores`
+    """
+    ranks = np.empty(len(scores), dtype=np.float64)
+    ranks[np.argsort(-np.asarray(scores), kind="stable")] = np.arange(
+        1, len(scores) + 1
+    )
+    return 1.0 / (k + ranks)
+
+
+class Fusion:
+    """
+    Combines the candidate lists of several retrievers into one ranking.
+
+    Each candidate list is a pair of NumPy arrays (ids, scores). The lists are
+    concatenated and every candidate's contribution is summed per id with one
+    `np.bincount`, so the cost grows linearly with the total number of candidates
+    and deep candidate pools stay cheap to fuse. An id missing from a list
+    contributes nothing for it.
+
+    Methods:
+        rrf: Reciprocal rank fusion, sum of weight / (rrf_k + rank). Uses only
+            ranks, so it is insensitive to the scale of each retriever's scores.
+        combsum: Sum of weighted min-max normalized scores.
+        combmnz: combsum multiplied by the number of lists containing the id.
+        minmax: Weighted mean of min-max normalized scores, in [0, 1].
+
+    Attributes:
+        method (str): One of FUSION_METHODS (default: HEIDA_FUSION_METHOD)
+        weights (Sequence[float]): Weight of each candidate list, in the order
+            they are passed to `fuse` (default: 1 for every list)
+        rrf_k (float): Smoothing constant for "rrf" (default: HEIDA_FUSION_RRF_K)
+    """
+
+    def __init__(
+        self,
+        method: str = FUSION_METHOD,
+        weights: Optional[Sequence[float]] = None,
+        rrf_k: float = FUSION_RRF_K,
+    ):
+        if method not in FUSION_METHODS:
+            raise ValueError(f"Unknown fusion method: {method}")
+        if rrf_k < 0:
+            raise ValueError(f"rrf_k must not be negative, got {rrf_k}")
+        self.method = method
+        self.weights = tuple(weights) if weights is not None else None
+        self.rrf_k = rrf_k
+
+    def fuse(
+        self, rankings: Sequence[Ranking], top_k: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fuse candidate lists into one ranking.
+
+        Args:
+            rankings: One (ids, scores) pair per retriever; ids must be unique
+                within a list
+            top_k: Number of results to keep (default: all fused candidates)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Ids and fused scores, sorted by
+                descending score
+
+        Raises:
+            ValueError: If the number of weights does not match the number of lists
+        """
+        weights = self.weights or (1.0,) * len(rankings)
+        if len(weights) != len(rankings):
+            raise ValueError(
+                f"Got {len(rankings)} candidate lists for {len(weights)} weights"
+            )
+
+        ids = [np.asarray(list_ids, dtype=np.int64) for list_ids, _ in rankings]
+        contributions = [
+            weight * self._contribution(np.asarray(scores, dtype=np.float64))
+            for weight, (_, scores) in zip(weights, rankings)
+        ]
+        all_ids = np.concatenate(ids) if ids else np.zeros(0, dtype=np.int64)
+        if not len(all_ids):
+            return all_ids, np.zeros(0)
+
+        unique_ids, inverse = np.unique(all_ids, return_inverse=True)
+        fused = np.bincount(
+            inverse, weights=np.concatenate(contributions), minlength=len(unique_ids)
+        )
+        if self.method == "combmnz":
+            fused *= np.bincount(inverse, minlength=len(unique_ids))
+        elif self.method == "minmax":
+            fused /= sum(weights) or 1.0
+
+        top, scores = top_k_rows(fused[None, :], top_k or len(unique_ids))
+        return unique_ids[top[0]], scores[0]
+
+    def _contribution(self, scores: np.ndarray) -> np.ndarray:
+        if self.method == "rrf":
+            return reciprocal_ranks(scores, self.rrf_k)
+        return min_max(scores)
+
+
+default_fusion = Fusion(weights=(FUSION_SEMANTIC_WEIGHT, 1 - FUSION_SEMANTIC_WEIGHT))
@@ -0,0 +1,731 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from app.core import logger
+from app.core.config import INDEX_DIR, MERGE_DELETED_RATIO, MERGE_MAX_SEGMENTS
+from app.core.metrics import timed
+from app.services.bm25 import SegmentedBM25, SparseBM25
+from app.services.chunk_store import Chunk, ChunkStore, SegmentedChunks
+from app.services.segment import Segment
+from app.services.vector_index import SegmentedIndex, VectorIndex, create_vector_index
+import numpy as np
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+
+FORMAT_VERSION = 6
+
+
+class IndexStore:
+    """
+    On-disk store for processed document collections.
+
+    A collection holds the chunks, embedding matrix and BM25 statistics produced by
+    DocumentProcessor.process_documents, so a document can be uploaded once and
+    queried many times. Each collection lives in its own directory under `root` and
+    survives process restarts. Recently used collections are kept in memory.
+
+    The data is stored in immutable Segments whose arrays are memory-mapped when
+    loaded, so loading is near-instant, the uvicorn workers of one host share a
+    collection through the page cache, and with the quantized "int8" and "binary"
+    backends only their compact codes stay resident. The configured VectorIndex
+    backend is built when a segment is written and stored in it, so loading
+    never quantizes, trains or builds an index again.
+
+    Collections are updated without rebuilding them: an added or re-ingested
+    document is written as a new small segment, and the chunks of deleted or
+    replaced documents are marked deleted in a per-segment deletes file. Queries
+    fan out over the segments with collection-wide BM25 statistics. `merge`
+    compacts the segments into one once `needs_merge` says so.
+
+    Layout of a collection directory:
+        manifest.json: Collection metadata (model, chunking and analyzer parameters,
+            counts), its segments with their deleted counts, and the segment of
+            each document. Replaced atomically on every change
+        segments/<name>/: A Segment with the chunks, embeddings and BM25 postings
+        segments/<name>/deletes.<generation>.npy: Deleted chunk ids of the segment
+
+    Attributes:
+        root (str): Directory holding one subdirectory per collection
+        max_loaded (int): Number of collections kept in memory (default: 8)
+        merge_max_segments (int): Segments above which a collection is merged
+            (default: HEIDA_MERGE_MAX_SEGMENTS)
+        merge_deleted_ratio (float): Fraction of deleted chunks above which a
+            collection is merged (default: HEIDA_MERGE_DELETED_RATIO)
+    """
+
+    def __init__(
+        self,
+        root: str = INDEX_DIR,
+        max_loaded: int = 8,
+        merge_max_segments: int = MERGE_MAX_SEGMENTS,
+        merge_deleted_ratio: float = MERGE_DELETED_RATIO,
+    ):
+        self.root = root
+        self.max_loaded = max_loaded
+        self.merge_max_segments = merge_max_segments
+        self.merge_deleted_ratio = merge_deleted_ratio
+        self._loaded: OrderedDict = OrderedDict()
+        # Collections being merged, and whether another merge was requested meanwhile
+        self._merging: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def collection_id(
+        file_content: bytes,
+        content_type: str,
+        model: str,
+        chunk_size: int,
+        chunk_overlap: int,
+        chunk_unit: str = "chars",
+        analyzer: str = "",
+    ) -> str:
+        """
+        Derive a collection id from the document and the processing settings.
+
+        Uploading the same file with the same settings yields the same id, so
+        repeated ingestion is a no-op.
+
+        Args:
+            file_content: Raw file content bytes
+            content_type: MIME type of the file
+            model: Embedding model name
+            chunk_size: Chunk size used for splitting
+            chunk_overlap: Chunk overlap used for splitting
+            chunk_unit: Unit of chunk_size and chunk_overlap (default: "chars")
+            analyzer: Name of the BM25 analyzer (default: "")
+
+        Returns:
+            str: Hex collection id
+        """
+        digest = hashlib.sha256()
+        digest.update(
+            f"{model}|{chunk_size}|{chunk_overlap}|{chunk_unit}|{analyzer}|"
+            f"{content_type}|".encode()
+        )
+        digest.update(file_content)
+        return digest.hexdigest()[:32]
+
+    def exists(self, collection_id: str) -> bool:
+        """
+        Check whether a collection is stored in the current format.
+
+        Collections written by an older format version are treated as missing so
+        they get re-ingested.
+        """
+        try:
+            self.manifest(collection_id)
+        except (KeyError, ValueError):
+            return False
+        return True
+
+    def save(
+        self,
+        collection_id: str,
+        chunks: Union[ChunkStore, Sequence[Chunk]],
+        embeddings: np.ndarray,
+        bm25: SparseBM25,
+        metadata: Optional[Dict] = None,
+        document_id: str = "document",
+        document: Optional[Dict] = None,
+    ) -> Dict:
+        """
+        Persist a processed collection with one document.
+
+        Files are written to a temporary directory first and moved into place, so a
+        crash never leaves a partially written collection behind.
+
+        Args:
+            collection_id: Id of the collection
+            chunks: ChunkStore of the document, or its Chunks
+            embeddings: Embedding matrix for the chunks
+            bm25: BM25 index for the chunks
+            metadata: Additional manifest fields (e.g. filename, model)
+            document_id: Id of the document within the collection
+            document: Additional fields for the document's manifest entry
+
+        Returns:
+            dict: The collection manifest
+        """
+        os.makedirs(self.root, exist_ok=True)
+        if not isinstance(chunks, ChunkStore):
+            chunks = ChunkStore.from_chunks(chunks)
+        chunks.update_metadata({"document_id": document_id})
+        name = _segment_name(0)
+        now = time.time()
+        manifest = {
+            **(metadata or {}),
+            "collection_id": collection_id,
+            "format_version": FORMAT_VERSION,
+            "chunk_count": len(chunks),
+            "embedding_dim": int(embeddings.shape[1]),
+            "created_at": now,
+            "updated_at": now,
+            "generation": 0,
+            "next_segment": 1,
+            "segments": [_segment_entry(name, len(chunks))],
+            "documents": {
+                document_id: {
+                    **(document or {}),
+                    "segment": name,
+                    "chunk_count": len(chunks),
+                }
+            },
+        }
+
+        tmp_dir = tempfile.mkdtemp(prefix=f".{collection_id}-", dir=self.root)
+        try:
+            Segment.write(
+                os.path.join(tmp_dir, "segments", name),
+                chunks,
+                embeddings,
+                bm25,
+                index=create_vector_index(embeddings),
+            )
+            with open(os.path.join(tmp_dir, "manifest.json"), "w") as f:
+                json.dump(manifest, f)
+
+            target = self._path(collection_id)
+            if os.path.isdir(target):
+                shutil.rmtree(target)
+            os.replace(tmp_dir, target)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        with self._lock:
+            self._loaded.pop(collection_id, None)
+
+        logger.info(
+            "Saved collection", collection_id=collection_id, chunk_count=len(chunks)
+        )
+        return manifest
+
+    def load(
+        self, collection_id: str
+    ) -> Tuple[Sequence[Chunk], VectorIndex, Union[SparseBM25, SegmentedBM25]]:
+        """
+        Load a collection, serving it from memory when recently used.
+
+        A collection with a single segment and no deletes is returned as that
+        segment's ChunkStore, vector index and SparseBM25. Otherwise the segments
+        are combined into SegmentedChunks, a SegmentedIndex and a SegmentedBM25,
+        whose ids run through the segments in order and which skip deleted
+        chunks.
+
+        The manifest is read on every call, so updates made by other processes
+        are picked up; segments that were already open are reused. The files are
+        opened under a shared collection lock, so a concurrent change cannot
+        remove them meanwhile.
+
+        Args:
+            collection_id: Id of the collection
+
+        Returns:
+            tuple: Tuple containing chunks, vector index, and BM25 index
+
+        Raises:
+            KeyError: If the collection does not exist
+            ValueError: If the collection was written by an older format version
+        """
+        path = self._path(collection_id)
+        with self._locked(collection_id, shared=True):
+            manifest = self.manifest(collection_id)
+            with self._lock:
+                cached = self._loaded.get(collection_id)
+                if cached is not None:
+                    self._loaded.move_to_end(collection_id)
+                    if cached[0] == manifest["generation"]:
+                        return cached[2]
+            opened = cached[1] if cached is not None else {}
+
+            with timed("load_index"):
+                segments = {}
+                for entry in manifest["segments"]:
+                    name = entry["name"]
+                    if name not in opened:
+                        segment = Segment.open(os.path.join(path, "segments", name))
+                        index = segment.index or create_vector_index(segment.embeddings)
+                        opened[name] = (segment, index)
+                    segments[name] = opened[name]
+                live = [self._live(path, entry) for entry in manifest["segments"]]
+                parts = [segments[entry["name"]] for entry in manifest["segments"]]
+
+                if len(parts) == 1 and live[0] is None:
+                    ((segment, embeddings),) = parts
+                    chunks, bm25 = segment.chunks, segment.bm25
+                else:
+                    chunks = SegmentedChunks([segment.chunks for segment, _ in parts])
+                    embeddings = SegmentedIndex([index for _, index in parts], live)
+                    bm25 = SegmentedBM25([segment.bm25 for segment, _ in parts], live)
+        logger.info(
+            "Loaded collection",
+            collection_id=collection_id,
+            chunk_count=manifest["chunk_count"],
+            segment_count=len(parts),
+            index=embeddings.kind,
+            memory_bytes=embeddings.memory_bytes,
+        )
+
+        collection = (chunks, embeddings, bm25)
+        with self._lock:
+            self._loaded[collection_id] = (manifest["generation"], segments, collection)
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+        return collection
+
+    def upsert_document(
+        self,
+        collection_id: str,
+        document_id: str,
+        chunks: ChunkStore,
+        embeddings: np.ndarray,
+        bm25: SparseBM25,
+        document: Optional[Dict] = None,
+    ) -> Dict:
+        """
+        Add a document to a collection, or replace the stored version of it.
+
+        The document is written as a new segment, so nothing already stored is
+        rewritten; the chunks of a replaced version are marked deleted.
+
+        Args:
+            collection_id: Id of the collection
+            document_id: Id of the document within the collection
+            chunks: ChunkStore of the document
+            embeddings: Embedding matrix for the chunks
+            bm25: BM25 index for the chunks
+            document: Additional fields for the document's manifest entry
+
+        Returns:
+            dict: The updated collection manifest
+
+        Raises:
+            KeyError: If the collection does not exist
+            ValueError: If the embeddings do not match the collection's dimension, or
+                the collection was written by an older format version
+        """
+        path = self._path(collection_id)
+        with self._locked(collection_id):
+            manifest = self.manifest(collection_id)
+            if embeddings.shape[1] != manifest["embedding_dim"]:
+                raise ValueError(
+                    f"Embedding dimension {embeddings.shape[1]} does not match the "
+                    f"collection's {manifest['embedding_dim']}"
+                )
+            name = self._reserve_segment(manifest)
+            chunks.update_metadata({"document_id": document_id})
+            self._write_segment(path, name, chunks, embeddings, bm25)
+
+            obsolete = []
+            if document_id in manifest["documents"]:
+                obsolete = self._delete_rows(path, manifest, [document_id])
+            manifest["segments"].append(_segment_entry(name, len(chunks)))
+            manifest["documents"][document_id] = {
+                **(document or {}),
+                "segment": name,
+                "chunk_count": len(chunks),
+            }
+            self._commit(collection_id, manifest, obsolete)
+
+        logger.info(
+            "Upserted document",
+            collection_id=collection_id,
+            document_id=document_id,
+            chunk_count=len(chunks),
+            segment=name,
+        )
+        return manifest
+
+    def delete_document(self, collection_id: str, document_id: str) -> Dict:
+        """
+        Remove a document from a collection by marking its chunks deleted.
+
+        Deleted chunks stay in their segment until the next merge; a segment left
+        without live chunks is removed right away.
+
+        Returns:
+            dict: The updated collection manifest
+
+        Raises:
+            KeyError: If the collection or the document does not exist
+            ValueError: If it is the collection's only document, or the collection
+                was written by an older format version
+        """
+        path = self._path(collection_id)
+        with self._locked(collection_id):
+            manifest = self.manifest(collection_id)
+            if document_id not in manifest["documents"]:
+                raise KeyError(document_id)
+            if len(manifest["documents"]) == 1:
+                raise ValueError(
+                    "Cannot delete the only document of a collection; "
+                    "delete the collection instead"
+                )
+            obsolete = self._delete_rows(path, manifest, [document_id])
+            del manifest["documents"][document_id]
+            self._commit(collection_id, manifest, obsolete)
+
+        logger.info(
+            "Deleted document", collection_id=collection_id, document_id=document_id
+        )
+        return manifest
+
+    def document_embeddings(
+        self, collection_id: str, document_id: str
+    ) -> Dict[str, np.ndarray]:
+        """
+        Map the chunk texts of a stored document to their embeddings.
+
+        Passed to DocumentProcessor.process_documents when a changed version of the
+        document is ingested, so only chunks whose text changed are embedded.
+
+        Raises:
+            KeyError: If the collection or the document does not exist
+            ValueError: If the collection was written by an older format version
+        """
+        # Open the segment under the lock, so a merge cannot remove it meanwhile
+        with self._locked(collection_id):
+            manifest = self.manifest(collection_id)
+            entry = manifest["documents"][document_id]
+            segment = Segment.open(
+                os.path.join(self._path(collection_id), "segments", entry["segment"])
+            )
+        rows = _document_rows(segment.chunks, [document_id])
+        return {
+            segment.chunks.text(row): np.array(segment.embeddings[row])
+            for row in rows.tolist()
+        }
+
+    def needs_merge(self, manifest: Dict) -> bool:
+        """Whether a collection has enough segments or deletes to be merged."""
+        total = sum(entry["chunk_count"] for entry in manifest["segments"])
+        deleted = sum(entry["deleted_count"] for entry in manifest["segments"])
+        return len(manifest["segments"]) > self.merge_max_segments or (
+            deleted > self.merge_deleted_ratio * total
+        )
+
+    def merge(self, collection_id: str) -> Dict:
+        """
+        Merge the segments of a collection into one, dropping deleted chunks.
+
+        The segments and their deletes are opened under the collection lock and
+        merged without holding it, so documents can be added and deleted
+        meanwhile: a segment or deletes file removed by such a change stays
+        readable through its open memory map. When the merged segment is
+        committed, documents deleted or replaced since the snapshot are marked
+        deleted in it, and segments added since are kept.
+
+        A merge requested while one is running for the collection in this
+        process is not started in parallel; the running merge merges again once
+        it is done, so changes committed meanwhile are merged too.
+
+        Returns:
+            dict: The updated collection manifest
+
+        Raises:
+            KeyError: If the collection does not exist
+            ValueError: If the collection was written by an older format version
+        """
+        with self._lock:
+            if collection_id in self._merging:
+                self._merging[collection_id] = True
+                return self.manifest(collection_id)
+            self._merging[collection_id] = False
+        try:
+            while True:
+                manifest = self._merge(collection_id)
+                with self._lock:
+                    if not self._merging[collection_id]:
+                        del self._merging[collection_id]
+                        return manifest
+                    self._merging[collection_id] = False
+        finally:
+            with self._lock:
+                self._merging.pop(collection_id, None)
+
+    def _merge(self, collection_id: str) -> Dict:
+        path = self._path(collection_id)
+        with self._locked(collection_id):
+            snapshot = self.manifest(collection_id)
+            if (
+                len(snapshot["segments"]) == 1
+                and not snapshot["segments"][0]["deleted_count"]
+            ):
+                return snapshot
+            # A merged segment gets a unique name instead of a number, so the
+            # manifest is committed only once, when the merge is done
+            name = f"merged-{uuid.uuid4().hex}"
+            parts = [
+                (
+                    Segment.open(os.path.join(path, "segments", entry["name"])),
+                    self._live(path, entry),
+                )
+                for entry in snapshot["segments"]
+            ]
+
+        start = time.perf_counter()
+        stores, embeddings, indexes = [], [], []
+        for segment, live in parts:
+            if live is None:
+                stores.append(segment.chunks)
+                embeddings.append(segment.embeddings)
+                indexes.append(segment.bm25)
+            else:
+                rows = np.flatnonzero(live)
+                stores.append(segment.chunks.take(rows))
+                embeddings.append(segment.embeddings[rows])
+                indexes.append(segment.bm25.take(rows))
+        chunks = ChunkStore.concat(stores)
+        self._write_segment(
+            path, name, chunks, np.concatenate(embeddings), SparseBM25.concat(indexes)
+        )
+
+        merged = {entry["name"] for entry in snapshot["segments"]}
+        with self._locked(collection_id):
+            manifest = self.manifest(collection_id)
+            manifest["segments"] = [_segment_entry(name, len(chunks))] + [
+                entry for entry in manifest["segments"] if entry["name"] not in merged
+            ]
+            stale = [
+                document_id
+                for document_id, entry in snapshot["documents"].items()
+                if manifest["documents"].get(document_id, {}).get("segment")
+                not in merged
+            ]
+            for entry in manifest["documents"].values():
+                if entry["segment"] in merged:
+                    entry["segment"] = name
+            obsolete = [os.path.join(path, "segments", old) for old in merged]
+            obsolete += self._delete_rows(path, manifest, stale, segment_name=name)
+            self._commit(collection_id, manifest, obsolete)
+
+        logger.info(
+            "Merged segments",
+            collection_id=collection_id,
+            segment_count=len(merged),
+            chunk_count=len(chunks),
+            seconds=round(time.perf_counter() - start, 3),
+        )
+        return manifest
+
+    def info(self, collection_id: str) -> Dict:
+        """
+        Read a collection manifest, whatever format version wrote it.
+
+        Raises:
+            KeyError: If the collection does not exist
+        """
+        path = os.path.join(self._path(collection_id), "manifest.json")
+        if not os.path.isfile(path):
+            raise KeyError(collection_id)
+        with open(path) as f:
+            return json.load(f)
+
+    def manifest(self, collection_id: str) -> Dict:
+        """
+        Read the manifest of a collection that can be loaded and updated.
+
+        Collections written by an older format version can still be listed, read
+        and deleted, but must be uploaded again before they are queried or
+        updated.
+
+        Raises:
+            KeyError: If the collection does not exist
+            ValueError: If the collection was written by an older format version
+        """
+        manifest = self.info(collection_id)
+        if manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(
+                f"Collection {collection_id} is stored in format version "
+                f"{manifest.get('format_version')}, not {FORMAT_VERSION}; "
+                "upload it again to rebuild it"
+            )
+        return manifest
+
+    def list(self) -> List[Dict]:
+        """List the manifests of all stored collections, including outdated ones."""
+        if not os.path.isdir(self.root):
+            return []
+        return [
+            self.info(name)
+            for name in sorted(os.listdir(self.root))
+            if not name.startswith(".")
+            and os.path.isfile(os.path.join(self.root, name, "manifest.json"))
+        ]
+
+    def delete(self, collection_id: str) -> None:
+        """
+        Remove a collection from disk and memory, whatever format version wrote it.
+
+        Raises:
+            KeyError: If the collection does not exist
+        """
+        self.info(collection_id)
+        with self._lock:
+            self._loaded.pop(collection_id, None)
+        shutil.rmtree(self._path(collection_id))
+        logger.info("Deleted collection", collection_id=collection_id)
+
+    def _path(self, collection_id: str) -> str:
+        if not collection_id.isalnum():
+            raise KeyError(collection_id)
+        return os.path.join(self.root, collection_id)
+
+    @contextmanager
+    def _locked(self, collection_id: str, shared: bool = False) -> Iterator[None]:
+        """
+        Serialize changes to a collection across threads and worker processes.
+
+        Each acquisition opens its own file description, so flock also excludes
+        other threads of this process. A shared lock is taken by readers: they
+        run together, but never while a change is made.
+        """
+        path = self._path(collection_id)
+        if not os.path.isdir(path):
+            raise KeyError(collection_id)
+        with open(os.path.join(path, ".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _reserve_segment(manifest: Dict) -> str:
+        name = _segment_name(manifest["next_segment"])
+        manifest["next_segment"] += 1
+        return name
+
+    @staticmethod
+    def _write_segment(
+        path: str,
+        name: str,
+        chunks: ChunkStore,
+        embeddings: np.ndarray,
+        bm25: SparseBM25,
+    ) -> None:
+        """Write a segment next to its final path and move it into place."""
+        tmp_path = os.path.join(path, "segments", f".{name}")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        Segment.write(
+            tmp_path, chunks, embeddings, bm25, index=create_vector_index(embeddings)
+        )
+        os.replace(tmp_path, os.path.join(path, "segments", name))
+
+    @staticmethod
+    def _live(path: str, entry: Dict) -> Optional[np.ndarray]:
+        """Boolean mask of a segment's live chunks, or None if none are deleted."""
+        if not entry["deleted_count"]:
+            return None
+        live = np.ones(entry["chunk_count"], dtype=bool)
+        live[
+            np.load(os.path.join(path, "segments", entry["name"], entry["deletes"]))
+        ] = False
+        return live
+
+    def _delete_rows(
+        self,
+        path: str,
+        manifest: Dict,
+        document_ids: Sequence[str],
+        segment_name: Optional[str] = None,
+    ) -> List[str]:
+        """
+        Mark the chunks of documents deleted in the segments holding them.
+
+        A new deletes file is written per segment (the manifest names the current
+        one) and segments left without live chunks are dropped from the manifest.
+
+        Args:
+            path: Collection directory
+            manifest: Manifest to update in place
+            document_ids: Documents whose chunks to delete
+            segment_name: Segment holding all the documents (default: the segment
+                recorded for each document)
+
+        Returns:
+            List[str]: Files and directories to remove once the manifest is committed
+        """
+        by_segment: Dict[str, List[str]] = {}
+        for document_id in document_ids:
+            name = segment_name or manifest["documents"][document_id]["segment"]
+            by_segment.setdefault(name, []).append(document_id)
+
+        obsolete = []
+        for name, ids in by_segment.items():
+            entry = next(e for e in manifest["segments"] if e["name"] == name)
+            segment_path = os.path.join(path, "segments", name)
+            chunks = Segment.open(segment_path).chunks
+            rows = _document_rows(chunks, ids)
+            if entry["deletes"]:
+                previous = os.path.join(segment_path, entry["deletes"])
+                rows = np.union1d(np.load(previous), rows)
+                obsolete.append(previous)
+            if len(rows) == entry["chunk_count"]:
+                manifest["segments"].remove(entry)
+                obsolete.append(segment_path)
+                continue
+            entry["deletes"] = f"deletes.{manifest['generation'] + 1}.npy"
+            entry["deleted_count"] = len(rows)
+            np.save(os.path.join(segment_path, entry["deletes"]), rows.astype(np.int64))
+        return obsolete
+
+    def _commit(
+        self, collection_id: str, manifest: Dict, obsolete: Sequence[str] = ()
+    ) -> None:
+        """
+        Atomically replace the manifest, then remove files it no longer references.
+
+        Readers see either the previous or the new manifest, and the generation
+        bump makes every process reload the collection on its next query.
+        """
+        path = self._path(collection_id)
+        manifest["generation"] += 1
+        manifest["updated_at"] = time.time()
+        manifest["chunk_count"] = sum(
+            entry["chunk_count"] - entry["deleted_count"]
+            for entry in manifest["segments"]
+        )
+        tmp_path = os.path.join(path, ".manifest.json")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, os.path.join(path, "manifest.json"))
+        for obsolete_path in obsolete:
+            if os.path.isdir(obsolete_path):
+                shutil.rmtree(obsolete_path, ignore_errors=True)
+            elif os.path.exists(obsolete_path):
+                os.remove(obsolete_path)
+
+
+def _segment_name(number: int) -> str:
+    return f"{number:06d}"
+
+
+def _segment_entry(name: str, chunk_count: int) -> Dict:
+    return {
+        "name": name,
+        "chunk_count": chunk_count,
+        "deleted_count": 0,
+        "deletes": None,
+    }
+
+
+def _document_rows(chunks: ChunkStore, document_ids: Sequence[str]) -> np.ndarray:
+    """Chunks of a store that belong to the given documents, in order."""
+    document_ids = set(document_ids)
+    doc_ids = [
+        i
+        for i, document in enumerate(chunks.documents)
+        if document.get("document_id") in document_ids
+    ]
+    return np.flatnonzero(np.isin(chunks.doc_ids, doc_ids))
+
+
+index_store = IndexStore()
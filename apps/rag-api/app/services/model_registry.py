@@ -0,0 +1,267 @@
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Tuple
+from app.core import logger
+from app.services.batcher import MicroBatcher
+import copy
+import threading
+import time
+
+if TYPE_CHECKING:
+    from sentence_transformers import CrossEncoder, SentenceTransformer
+
+
+@dataclass
+class ModelStats:
+    name: str
+    kind: str
+    load_seconds: float
+    memory_bytes: int
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of loaded models.
+
+    sentence_transformers (and with it torch) is imported on the first model load
+    rather than at module import, so workers that have not loaded a model yet start
+    quickly.
+
+    Loading a SentenceTransformer or CrossEncoder takes seconds and allocates
+    hundreds of MB, so each model is loaded at most once per worker process and
+    shared by every request. Models are keyed by kind and name, and the load time
+    and parameter memory of each one are recorded for reporting.
+
+    The registry also owns one MicroBatcher per model, so query encoding and
+    reranking calls from concurrent requests share forward passes.
+
+    Attributes:
+        _models: Mapping of (kind, name) to loaded model instances
+        _stats: Mapping of (kind, name) to ModelStats
+        _batchers: Mapping of (kind, name) to MicroBatcher
+    """
+
+    EMBEDDING = "embedding"
+    CROSS_ENCODER = "cross_encoder"
+    TOKENIZER = "tokenizer"
+
+    def __init__(self):
+        self._models: Dict[Tuple[str, str], object] = {}
+        self._stats: Dict[Tuple[str, str], ModelStats] = {}
+        self._batchers: Dict[Tuple[str, str], MicroBatcher] = {}
+        self._lock = threading.Lock()
+
+    def get_embedding_model(self, name: str) -> "SentenceTransformer":
+        """
+        Return the shared SentenceTransformer for a model name, loading it on first use.
+
+        Args:
+            name: Hugging Face model name
+
+        Returns:
+            SentenceTransformer: Loaded embedding model
+        """
+
+        def load():
+            from sentence_transformers import SentenceTransformer
+
+            return SentenceTransformer(name)
+
+        return self._get(self.EMBEDDING, name, load)
+
+    def get_tokenizer(self, name: str):
+        """
+        Return a tokenizer for an embedding model, for counting tokens in text.
+
+        This is a private copy of the model's tokenizer: encoding calls enable
+        truncation on the model's own tokenizer, and Hugging Face fast tokenizers
+        fail when their settings change while another thread is using them.
+
+        Args:
+            name: Hugging Face model name
+
+        Returns:
+            Hugging Face tokenizer of the embedding model
+        """
+        model = self.get_embedding_model(name)
+        return self._get(self.TOKENIZER, name, lambda: copy.deepcopy(model.tokenizer))
+
+    def get_cross_encoder(self, name: str) -> "CrossEncoder":
+        """
+        Return the shared CrossEncoder for a model name, loading it on first use.
+
+        Args:
+            name: Hugging Face model name
+
+        Returns:
+            CrossEncoder: Loaded cross-encoder model
+        """
+
+        def load():
+            from sentence_transformers import CrossEncoder
+
+            return CrossEncoder(
+                name,
+                automodel_args={"torch_dtype": "auto"},
+                trust_remote_code=True,
+            )
+
+        return self._get(self.CROSS_ENCODER, name, load)
+
+    def register(self, kind: str, name: str, model) -> None:
+        """
+        Add an already constructed model under a name, replacing any loaded one.
+
+        Used to serve local stand-in models, e.g. for offline benchmarks.
+
+        Args:
+            kind: EMBEDDING or CROSS_ENCODER
+            name: Name the model is requested by
+            model: Object with the interface of that kind of model
+
+        Raises:
+            ValueError: If the kind is unknown
+        """
+        if kind not in (self.EMBEDDING, self.CROSS_ENCODER):
+            raise ValueError(f"Unknown model kind: {kind}")
+        with self._lock:
+            self._models[(kind, name)] = model
+            self._stats[(kind, name)] = ModelStats(
+                name=name, kind=kind, load_seconds=0.0, memory_bytes=0
+            )
+            self._batchers.pop((kind, name), None)
+
+    def get_encode_batcher(self, name: str) -> MicroBatcher:
+        """
+        Return the shared batcher that encodes query strings with an embedding model.
+
+        Outputs are normalized embedding vectors, one per input text.
+
+        Args:
+            name: Hugging Face model name
+
+        Returns:
+            MicroBatcher: Batcher for this model
+        """
+        model = self.get_embedding_model(name)
+        return self._get_batcher(
+            self.EMBEDDING,
+            name,
+            lambda texts: model.encode(texts, normalize_embeddings=True),
+        )
+
+    def get_rerank_batcher(self, name: str) -> MicroBatcher:
+        """
+        Return the shared batcher that scores (query, text) pairs with a cross-encoder.
+
+        Outputs are float scores, one per input pair.
+
+        Args:
+            name: Hugging Face model name
+
+        Returns:
+            MicroBatcher: Batcher for this model
+        """
+        model = self.get_cross_encoder(name)
+        return self._get_batcher(
+            self.CROSS_ENCODER,
+            name,
+            lambda pairs: model.predict(pairs, convert_to_tensor=True).tolist(),
+        )
+
+    def warm_up(
+        self,
+        embedding_models: Iterable[str] = (),
+        cross_encoders: Iterable[str] = (),
+    ) -> None:
+        """
+        Load models ahead of the first request.
+
+        Args:
+            embedding_models: Embedding model names to load
+            cross_encoders: Cross-encoder model names to load
+        """
+        for name in embedding_models:
+            self.get_embedding_model(name)
+        for name in cross_encoders:
+            self.get_cross_encoder(name)
+
+    def stats(self) -> List[dict]:
+        """
+        Report load time and memory for every loaded model.
+
+        Returns:
+            List[dict]: One entry per model with name, kind, load_seconds and memory_bytes
+        """
+        return [asdict(stats) for stats in self._stats.values()]
+
+    def batch_stats(self) -> List[dict]:
+        """
+        Report how many jobs each batcher merged into shared model calls.
+
+        Returns:
+            List[dict]: One entry per batcher, see MicroBatcher.stats
+        """
+        return [batcher.stats() for batcher in list(self._batchers.values())]
+
+    def clear(self) -> None:
+        """Drop all loaded models."""
+        with self._lock:
+            self._models.clear()
+            self._stats.clear()
+            self._batchers.clear()
+
+    def _get_batcher(self, kind: str, name: str, fn: Callable) -> MicroBatcher:
+        key = (kind, name)
+        with self._lock:
+            if key not in self._batchers:
+                label = "encode" if kind == self.EMBEDDING else "rerank"
+                self._batchers[key] = MicroBatcher(fn, name=f"{label}:{name}")
+            return self._batchers[key]
+
+    def _get(self, kind: str, name: str, loader: Callable[[], object]):
+        key = (kind, name)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            # Another thread may have finished loading while we waited for the lock
+            model = self._models.get(key)
+            if model is not None:
+                return model
+
+            logger.info("Loading model", kind=kind, model=name)
+            start = time.perf_counter()
+            model = loader()
+            load_seconds = time.perf_counter() - start
+            stats = ModelStats(
+                name=name,
+                kind=kind,
+                load_seconds=round(load_seconds, 3),
+                memory_bytes=_model_memory_bytes(model),
+            )
+            self._models[key] = model
+            self._stats[key] = stats
+            logger.info(
+                "Loaded model",
+                kind=kind,
+                model=name,
+                load_seconds=stats.load_seconds,
+                memory_bytes=stats.memory_bytes,
+            )
+            return model
+
+
+def _model_memory_bytes(model) -> int:
+    """Sum parameter and buffer sizes of a torch-backed model."""
+    # CrossEncoder wraps the underlying transformers module in `.model`
+    module = getattr(model, "model", model)
+    if not hasattr(module, "parameters"):
+        return 0
+    total = sum(p.numel() * p.element_size() for p in module.parameters())
+    if hasattr(module, "buffers"):
+        total += sum(b.numel() * b.element_size() for b in module.buffers())
+    return total
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,175 @@
+from collections import deque
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, List, Tuple
+from pypdf import PdfReader
+from app.core import logger
+from app.core.config import PDF_EXTRACT_WORKERS, PDF_PARALLEL_MIN_PAGES
+from app.core.executor import Executor
+import io
+
+
+def pdf_metadata(pdf_reader: PdfReader) -> Dict:
+    """Document information of a PDF as plain strings."""
+    if not pdf_reader.metadata:
+        return {}
+    # Plain strings keep the metadata picklable and JSON serializable
+    return {str(key): str(value) for key, value in pdf_reader.metadata.items()}
+
+
+def _open_pdf(file_content) -> Tuple[PdfReader, Dict, int]:
+    """Open a PDF and read its metadata and page count."""
+    try:
+        pdf_reader = PdfReader(io.BytesIO(file_content))
+        return pdf_reader, pdf_metadata(pdf_reader), len(pdf_reader.pages)
+    except Exception as e:
+        logger.error("Text extraction failed", error=str(e), content_type="pdf")
+        raise ValueError(f"Error processing file: {str(e)}")
+
+
+def _iter_reader_pages(pdf_reader: PdfReader) -> Iterator[Tuple[int, str]]:
+    for number, page in enumerate(pdf_reader.pages, start=1):
+        try:
+            text = page.extract_text()
+        except Exception as e:
+            logger.error("Text extraction failed", error=str(e), page=number)
+            raise ValueError(f"Error processing page {number}: {str(e)}")
+        yield number, text
+
+
+def iter_pdf_pages(file_content) -> Tuple[Dict, Iterator[Tuple[int, str]]]:
+    """
+    Open a PDF and return its metadata and a lazy iterator over its pages.
+
+    Pages are parsed one at a time as the iterator is consumed, so the text of the
+    whole document is never held in memory at once.
+
+    Args:
+        file_content: Raw PDF bytes
+
+    Returns:
+        Tuple[Dict, Iterator[Tuple[int, str]]]: Metadata and (page_number, text)
+            pairs, with 1-based page numbers
+
+    Raises:
+        ValueError: If the PDF cannot be opened or a page cannot be parsed
+    """
+    pdf_reader, metadata, _ = _open_pdf(file_content)
+    return metadata, _iter_reader_pages(pdf_reader)
+
+
+def extract_page_range(shm_name: str, size: int, start: int, stop: int) -> List[str]:
+    """
+    Extract the text of pages [start, stop) from a PDF held in shared memory.
+
+    Runs in a worker process. Only the segment name and page bounds are pickled;
+    the worker reads the file bytes from the shared segment and parses its own copy.
+
+    Args:
+        shm_name: Name of the SharedMemory segment holding the PDF
+        size: Length of the PDF in bytes
+        start: First page, 0-based
+        stop: Page after the last one
+
+    Returns:
+        List[str]: Text of each page in the range
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        file_content = bytes(shm.buf[:size])
+    finally:
+        shm.close()
+    pdf_reader = PdfReader(io.BytesIO(file_content))
+    return [pdf_reader.pages[i].extract_text() for i in range(start, stop)]
+
+
+def iter_pdf_pages_parallel(
+    file_content,
+    executor: Executor,
+    workers: int = PDF_EXTRACT_WORKERS,
+    pages_per_task: int = 8,
+    min_pages: int = PDF_PARALLEL_MIN_PAGES,
+) -> Tuple[Dict, Iterator[Tuple[int, str]]]:
+    """
+    Like `iter_pdf_pages`, but extract page ranges in the executor's process pool.
+
+    pypdf is pure Python, so a single extraction is bound to one core. The PDF is
+    copied once into a shared memory segment, the page range is cut into tasks of
+    `pages_per_task` pages and up to `workers` tasks run at a time. Pages are still
+    yielded in order, as soon as the task holding them finishes, so chunking and
+    embedding overlap with extraction. Documents shorter than `min_pages` are
+    extracted serially, since starting tasks costs more than it saves.
+
+    Args:
+        file_content: Raw PDF bytes
+        executor: Executor whose process pool runs the tasks
+        workers: Tasks in flight at once (default: HEIDA_PDF_EXTRACT_WORKERS)
+        pages_per_task: Pages extracted by each task (default: 8)
+        min_pages: Page count below which extraction stays serial
+            (default: HEIDA_PDF_PARALLEL_MIN_PAGES)
+
+    Returns:
+        Tuple[Dict, Iterator[Tuple[int, str]]]: Metadata and (page_number, text)
+            pairs, with 1-based page numbers
+
+    Raises:
+        ValueError: If the PDF cannot be opened or a page cannot be parsed
+    """
+    pdf_reader, metadata, page_count = _open_pdf(file_content)
+    if workers <= 1 or page_count < min_pages:
+        return metadata, _iter_reader_pages(pdf_reader)
+
+    logger.info(
+        "Extracting PDF pages in parallel", page_count=page_count, workers=workers
+    )
+    return metadata, _iter_pages_in_workers(
+        file_content, page_count, executor, workers, pages_per_task
+    )
+
+
+def _iter_pages_in_workers(
+    file_content,
+    page_count: int,
+    executor: Executor,
+    workers: int,
+    pages_per_task: int,
+) -> Iterator[Tuple[int, str]]:
+    size = len(file_content)
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    shm.buf[:size] = file_content
+    ranges = iter(
+        [
+            (start, min(start + pages_per_task, page_count))
+            for start in range(0, page_count, pages_per_task)
+        ]
+    )
+    pending = deque()
+
+    def submit_next() -> None:
+        page_range = next(ranges, None)
+        if page_range is not None:
+            future = executor.submit_process(
+                extract_page_range, shm.name, size, *page_range
+            )
+            pending.append((page_range, future))
+
+    try:
+        for _ in range(workers):
+            submit_next()
+        while pending:
+            (start, stop), future = pending.popleft()
+            try:
+                texts = future.result()
+            except Exception as e:
+                logger.error(
+                    "Text extraction failed", error=str(e), pages=f"{start + 1}-{stop}"
+                )
+                raise ValueError(f"Error processing pages {start + 1}-{stop}: {str(e)}")
+            # Keep the pool busy while the caller consumes this range
+            submit_next()
+            for offset, text in enumerate(texts):
+                yield start + offset + 1, text
+    finally:
+        for _, future in pending:
+            future.cancel()
+        shm.close()
+        shm.unlink()
@@ -1,10 +1,90 @@
-from typing import List
-from sentence_transformers import CrossEncoder
-import tiktoken
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
 from app.core import logger
+from app.core.config import DEFAULT_RERANKER_MODEL, RERANK_POLICIES
+from app.core.metrics import timed
+from app.services.model_registry import model_registry
 from app.services.document_processor import Chunk
 
 
+@lru_cache(maxsize=1)
+def default_tokenizer():
+    """
+    Return the cl100k_base TikToken encoding.
+
+    Loaded on first use: tiktoken downloads the encoding on a cold cache, which must
+    not happen at import.
+    """
+    import tiktoken
+
+    return tiktoken.get_encoding("cl100k_base")
+
+
+@dataclass(frozen=True)
+class RerankPolicy:
+    """
+    Limits on how much cross-encoder work one query may use.
+
+    Candidates are expected in retrieval order, best first, with their fused
+    retrieval scores.
+
+    Attributes:
+        max_candidates (int): Rerank only the first candidates; the rest are
+            dropped (default: None, no cap)
+        max_tokens (int): Token budget of a (query, chunk) pair; chunk text past
+            it is cut before scoring (default: None, no truncation)
+        skip_margin (float): Skip the cross-encoder when the best retrieval score
+            leads the second by at least this fraction of the best score, and
+            return the candidates in retrieval order with their retrieval scores
+            (default: None, always rerank)
+    """
+
+    max_candidates: Optional[int] = None
+    max_tokens: Optional[int] = None
+    skip_margin: Optional[float] = None
+
+    def __post_init__(self):
+        if self.max_candidates is not None and self.max_candidates < 1:
+            raise ValueError(f"max_candidates must be positive: {self.max_candidates}")
+        if self.max_tokens is not None and self.max_tokens < 2:
+            raise ValueError(f"max_tokens must be at least 2: {self.max_tokens}")
+        if self.skip_margin is not None and not 0 <= self.skip_margin <= 1:
+            raise ValueError(f"skip_margin must be in [0, 1]: {self.skip_margin}")
+
+    @classmethod
+    def for_endpoint(cls, endpoint: str) -> "RerankPolicy":
+        """
+        Build the policy configured for an endpoint in HEIDA_RERANK_POLICIES.
+
+        Args:
+            endpoint: "retrieve", "retrieve_batch", "collections" or "search"
+
+        Returns:
+            RerankPolicy: The endpoint's policy, else the "default" one, else no limits
+        """
+        return cls(**RERANK_POLICIES.get(endpoint, RERANK_POLICIES.get("default", {})))
+
+    def select(
+        self, chunks: List[Chunk], scores: Optional[Sequence[float]]
+    ) -> Tuple[List[Chunk], Optional[List[float]]]:
+        """Apply max_candidates to the chunks and their retrieval scores."""
+        if self.max_candidates is not None:
+            chunks = chunks[: self.max_candidates]
+            if scores is not None:
+                scores = scores[: self.max_candidates]
+        return chunks, list(scores) if scores is not None else None
+
+    def is_decisive(self, scores: Optional[List[float]]) -> bool:
+        """Whether the retrieval scores already settle the ranking."""
+        if self.skip_margin is None or scores is None or not scores:
+            return False
+        if len(scores) == 1:
+            return True
+        best, second = sorted(scores, reverse=True)[:2]
+        return best > 0 and (best - second) >= self.skip_margin * best
+
+
 class Reranker:
     """
     Reranker service for hybrid retrieval system.
@@ -14,49 +94,151 @@ class Reranker:
     Implementation uses a tokenization model from TikToken for encoding.
 
     Attributes:
-        model: SentenceTransformer model for reranking (default: jinaai/jina-reranker-v2-base-multilingual)
-        tokenizer: TikToken tokenizer for encoding (default: cl100k_base)
+        model: CrossEncoder model for reranking (default: jinaai/jina-reranker-v2-base-multilingual),
+            shared across instances through the model registry
+        tokenizer: TikToken tokenizer for encoding (default: cl100k_base, loaded on
+            first access)
+        batcher: Shared MicroBatcher for scoring when `batched` is set, so pairs from
+            concurrent requests are scored in one forward pass
+        policy: RerankPolicy limiting the candidates and tokens scored per query
+            (default: no limits)
     """
 
     def __init__(
         self,
-        model: str = "jinaai/jina-reranker-v2-base-multilingual",
-        tokenizer=tiktoken.get_encoding("cl100k_base"),
+        model: str = DEFAULT_RERANKER_MODEL,
+        tokenizer=None,
+        batched: bool = False,
+        policy: RerankPolicy = RerankPolicy(),
     ):
-        self.model = CrossEncoder(
-            model,
-            automodel_args={"torch_dtype": "auto"},
-            trust_remote_code=True,
-        )
-        self.tokenizer = tokenizer
+        self.model = model_registry.get_cross_encoder(model)
+        self._tokenizer = tokenizer
+        self.batcher = model_registry.get_rerank_batcher(model) if batched else None
+        self.policy = policy
+
+    @property
+    def tokenizer(self):
+        if self._tokenizer is None:
+            self._tokenizer = default_tokenizer()
+        return self._tokenizer
 
-    def rerank(self, query: str, chunks: List[Chunk]) -> List[dict]:
+    def rerank(
+        self,
+        query: str,
+        chunks: List[Chunk],
+        scores: Optional[Sequence[float]] = None,
+    ) -> List[dict]:
         """
         Rerank chunks based on semantic similarity to query.
 
         Args:
             query: The search query string
-            chunks: List of Chunk objects to reranker
+            chunks: List of Chunk objects to reranker, best retrieved first
+            scores: Retrieval scores of the chunks, used by the policy's skip_margin
 
         Returns:
             List[dict]: Reranked chunks with scores
         """
+        return self.rerank_many(
+            [query], [chunks], [scores] if scores is not None else None
+        )[0]
 
-        chunk_texts = [chunk.content for chunk in chunks]
+    def rerank_many(
+        self,
+        queries: List[str],
+        chunk_lists: List[List[Chunk]],
+        score_lists: Optional[List[Sequence[float]]] = None,
+    ) -> List[List[dict]]:
+        """
+        Rerank the chunks of several queries with one cross-encoder call.
+
+        All (query, chunk) pairs are scored in a single batch and split back per
+        query. Queries whose retrieval scores are decisive under the policy are
+        not scored and keep their retrieval order and scores.
+
+        Args:
+            queries: The search query strings
+            chunk_lists: For each query, the list of Chunk objects to rerank
+            score_lists: For each query, the retrieval scores of its chunks
 
-        sentence_pairs = [[query, text] for text in chunk_texts]
-        scores = self.model.predict(sentence_pairs, convert_to_tensor=True).tolist()
-        rankings = [
-            {"chunk": chunk, "score": score} for chunk, score in zip(chunks, scores)
+        Returns:
+            List[List[dict]]: Per query, reranked chunks with scores, in the order of `queries`
+        """
+        selected = [
+            self.policy.select(chunks, score_lists[i] if score_lists else None)
+            for i, chunks in enumerate(chunk_lists)
         ]
+        skipped = [self.policy.is_decisive(scores) for _, scores in selected]
+
+        sentence_pairs = []
+        truncated = 0
+        with timed("rerank_truncate"):
+            for query, (chunks, _), skip in zip(queries, selected, skipped):
+                if skip:
+                    continue
+                texts, query_truncated = self._truncate(
+                    query, [chunk.content for chunk in chunks]
+                )
+                truncated += query_truncated
+                sentence_pairs.extend([query, text] for text in texts)
+        with timed("rerank"):
+            scores = self._score(sentence_pairs)
 
-        rankings.sort(key=lambda x: x["score"], reverse=True)
+        rankings = []
+        offset = 0
+        for (chunks, retrieval_scores), skip in zip(selected, skipped):
+            if skip:
+                query_scores = retrieval_scores
+            else:
+                query_scores = scores[offset : offset + len(chunks)]
+                offset += len(chunks)
+            ranking = [
+                {"chunk": chunk, "score": score}
+                for chunk, score in zip(chunks, query_scores)
+            ]
+            ranking.sort(key=lambda x: x["score"], reverse=True)
+            rankings.append(ranking)
 
         logger.info(
             "Completed reranking",
-            query=query,
-            scores=[result["score"] for result in rankings],
-            chunk_count=len(chunks),
+            query_count=len(queries),
+            pair_count=len(sentence_pairs),
+            truncated=truncated,
+            skipped=sum(skipped),
         )
 
         return rankings
+
+    def _truncate(self, query: str, texts: List[str]) -> Tuple[List[str], int]:
+        """
+        Cut texts so each (query, text) pair fits the policy's token budget.
+
+        Returns:
+            Tuple[List[str], int]: The texts and how many were cut
+        """
+        if self.policy.max_tokens is None:
+            return texts, 0
+        budget = max(
+            self.policy.max_tokens - len(self.tokenizer.encode_ordinary(query)), 1
+        )
+        result = []
+        truncated = 0
+        for text in texts:
+            # Every token covers at least one byte, so short ASCII text always fits
+            if len(text) <= budget and text.isascii():
+                result.append(text)
+                continue
+            tokens = self.tokenizer.encode_ordinary(text)
+            if len(tokens) > budget:
+                text = self.tokenizer.decode(tokens[:budget])
+                truncated += 1
+            result.append(text)
+        return result, truncated
+
+    def _score(self, sentence_pairs: List[List[str]]) -> List[float]:
+        """Score (query, text) pairs, through the shared batcher when configured."""
+        if not sentence_pairs:
+            return []
+        if self.batcher is not None:
+            return self.batcher(sentence_pairs)
+        return self.model.predict(sentence_pairs, convert_to_tensor=True).tolist()
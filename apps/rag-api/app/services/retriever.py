@@ -1,12 +1,16 @@
-from typing import List, Tuple, Dict
+from typing import List, Optional, Sequence, Tuple, Dict
 import numpy as np
-import nltk
-from nltk.tokenize import word_tokenize
-from rank_bm25 import BM25Okapi
 from app.core import logger
+from app.core.config import LEXICAL_CANDIDATES, SEMANTIC_CANDIDATES
+from app.core.metrics import timed
+from app.services.analyzer import Analyzer, default_analyzer
+from app.services.bm25 import SparseBM25
+from app.services.chunk_store import Chunk
+from app.services.fusion import Fusion, Ranking, default_fusion
+from app.services.model_registry import model_registry
+from app.services.vector_index import VectorIndex, top_k_rows
 
-nltk.download("punkt")
-nltk.download("punkt_tab")
+QUERY_INSTRUCTION = "Represent this sentence for searching relevant passages: "
 
 
 class Retriever:
@@ -14,8 +18,9 @@ class Retriever:
     Retriever class for hybrid semantic and BM25 search.
 
     This class implements a hybrid retrieval system that combines semantic search using
-    embeddings with BM25 lexical search. Results are combined using a rank fusion
-    approach with configurable weighting.
+    embeddings with BM25 lexical search. Each retriever contributes its own pool of
+    candidates, at least top_k deep, and the pools are combined by a Fusion
+    strategy (reciprocal rank fusion by default).
 
     Implementation is guided by approaches described in:
     "Contextual Retrieval" (Anthropic, 2024)
@@ -26,11 +31,36 @@ class Retriever:
 
     Attributes:
         model: The embedding model used for semantic search
+        batcher: Shared MicroBatcher for query encoding when `model_name` is given,
+            so concurrent requests encode their queries in one forward pass
+        analyzer: Analyzer producing BM25 query terms; must match the one used to
+            index the chunks (default: the configured analyzer)
+        fusion: Fusion combining the semantic and BM25 candidates, weighted in
+            that order (default: the configured fusion)
+        semantic_candidates (int): Semantic candidates per query
+            (default: HEIDA_SEMANTIC_CANDIDATES)
+        lexical_candidates (int): BM25 candidates per query
+            (default: HEIDA_LEXICAL_CANDIDATES)
     """
 
-    def __init__(self, model):
+    def __init__(
+        self,
+        model,
+        model_name: Optional[str] = None,
+        analyzer: Analyzer = default_analyzer,
+        fusion: Fusion = default_fusion,
+        semantic_candidates: int = SEMANTIC_CANDIDATES,
+        lexical_candidates: int = LEXICAL_CANDIDATES,
+    ):
         logger.info("Initializing Retriever")
         self.model = model
+        self.analyzer = analyzer
+        self.fusion = fusion
+        self.semantic_candidates = semantic_candidates
+        self.lexical_candidates = lexical_candidates
+        self.batcher = (
+            model_registry.get_encode_batcher(model_name) if model_name else None
+        )
 
     # NOTE: For token counting (in development)
     # self.token_counter = TokenCounter()
@@ -43,20 +73,22 @@ class Retriever:
     def retrieve(
         self,
         query: str,
-        chunks: List[int],
+        chunks: Sequence[Chunk],
         embeddings,
-        bm25: BM25Okapi,
+        bm25: SparseBM25,
         top_k: int = 10,
     ) -> List[dict]:
         """
         Retrieve the most relevant documents using hybrid search.
 
-        Performs both semantic and BM25 search and combines results using rank fusion.
+        Performs both semantic and BM25 search and combines their candidates using
+        the configured fusion.
 
         Args:
             query: The search query string
-            chunks: List of text chunks to search through
-            embeddings: Pre-computed embeddings for chunks with shape (n_chunks, dim)
+            chunks: ChunkStore or list of Chunks to search through
+            embeddings: Pre-computed embeddings for chunks with shape (n_chunks, dim),
+                or a VectorIndex built over them
             bm25: Pre-initialized BM25 index for chunks
             top_k: Number of results to return (default: 3)
 
@@ -79,22 +111,32 @@ class Retriever:
         if top_k > len(chunks):
             top_k = len(chunks)
 
-        semantic_results = self._semantic_search(query, embeddings, top_k)
-        bm25_results = self._bm25_search(query, bm25, top_k)
-        final_results = self._rank_fusion(semantic_results, bm25_results)
+        semantic_results = self._semantic_search(
+            query, embeddings, self._depth(self.semantic_candidates, top_k, chunks)
+        )
+        bm25_results = self._bm25_search(
+            query, bm25, self._depth(self.lexical_candidates, top_k, chunks)
+        )
+        final_ids, final_scores = self._rank_fusion(
+            semantic_results, bm25_results, top_k
+        )
 
         # query_tokens = self.token_counter.count_tokens(query)
         # self.token_stats["total_query_tokens"] += query_tokens
 
         retrieved_docs = [
             {"chunk": chunks[chunk_id], "score": score}
-            for chunk_id, score in final_results[:top_k]
+            for chunk_id, score in zip(final_ids.tolist(), final_scores.tolist())
         ]
         logger.info(
             "Completed retrieval",
             retrieved_count=len(retrieved_docs),
-            semantic_score=semantic_results[0][1] if semantic_results else None,
-            bm25_score=bm25_results[0][1] if bm25_results else None,
+            semantic_candidates=len(semantic_results[0]),
+            bm25_candidates=len(bm25_results[0]),
+            semantic_score=(
+                float(semantic_results[1][0]) if len(semantic_results[1]) else None
+            ),
+            bm25_score=float(bm25_results[1][0]) if len(bm25_results[1]) else None,
         )
 
         # retrieved_tokens = sum(self.token_counter.count_tokens(doc) for doc in retrieved_docs)
@@ -112,6 +154,69 @@ class Retriever:
 
         return retrieved_docs
 
+    def retrieve_many(
+        self,
+        queries: List[str],
+        chunks: Sequence[Chunk],
+        embeddings,
+        bm25: SparseBM25,
+        top_k: int = 10,
+    ) -> List[List[dict]]:
+        """
+        Retrieve the most relevant documents for several queries at once.
+
+        All queries are encoded in one encoder batch and scored with a single
+        matrix-matrix product; BM25 scores are computed in bulk as well. Fusion
+        is applied per query.
+
+        Args:
+            queries: The search query strings
+            chunks: ChunkStore or list of Chunks to search through
+            embeddings: Pre-computed embeddings for chunks with shape (n_chunks, dim),
+                or a VectorIndex built over them
+            bm25: Pre-initialized BM25 index for chunks
+            top_k: Number of results to return per query (default: 10)
+
+        Returns:
+            List of per-query result lists, in the order of `queries`
+
+        Raises:
+            ValueError: If chunks, embeddings or bm25 are None
+        """
+        logger.info("Starting batch retrieval", query_count=len(queries), top_k=top_k)
+        if chunks is None or embeddings is None or bm25 is None:
+            logger.error(
+                "Missing required components",
+                chunks_none=chunks is None,
+                embeddings_none=embeddings is None,
+                bm25_none=bm25 is None,
+            )
+            raise ValueError("chunks, embeddings, and bm25 must not be None")
+        if not queries:
+            return []
+
+        if top_k > len(chunks):
+            top_k = len(chunks)
+
+        semantic_results = self._semantic_search_many(
+            queries, embeddings, self._depth(self.semantic_candidates, top_k, chunks)
+        )
+        bm25_results = self._bm25_search_many(
+            queries, bm25, self._depth(self.lexical_candidates, top_k, chunks)
+        )
+
+        retrieved = []
+        for semantic, lexical in zip(semantic_results, bm25_results):
+            ids, scores = self._rank_fusion(semantic, lexical, top_k)
+            retrieved.append(
+                [
+                    {"chunk": chunks[chunk_id], "score": score}
+                    for chunk_id, score in zip(ids.tolist(), scores.tolist())
+                ]
+            )
+        logger.info("Completed batch retrieval", query_count=len(queries))
+        return retrieved
+
     # NOTE: Get token stats later (in development)
     # def get_token_stats(self):
     #     stats = self.token_stats.copy()
@@ -124,92 +229,130 @@ class Retriever:
     #         )
     #     return stats
 
-    def _semantic_search(
-        self, query: str, embeddings, top_k: int
-    ) -> List[Tuple[int, float]]:
+    @staticmethod
+    def _depth(candidates: int, top_k: int, chunks) -> int:
+        """Candidates to take from one retriever: at least top_k, at most every chunk."""
+        return min(max(candidates, top_k), len(chunks))
+
+    def _semantic_search(self, query: str, embeddings, top_k: int) -> Ranking:
         """
         Perform semantic search using embedding similarity.
 
         Args:
             query: Search query
-            embeddings: Document embeddings matrix
+            embeddings: Document embeddings matrix, or a VectorIndex over them
             top_k: Number of results to return
 
         Returns:
-            List of tuples (doc_id, similarity_score) for top k matches
+            Ranking: Arrays (doc_ids, similarity_scores) of the top k matches,
+                sorted by score
         """
+        return self._semantic_search_many([query], embeddings, top_k)[0]
 
-        query_embedding = self.model.encode(
-            f"Represent this sentence for searching relevant passages: {query}",
-            normalize_embeddings=True,
-        )
-        similarities = query_embedding @ embeddings.T
-        top_indices = np.argpartition(similarities, -top_k)[-top_k:]
-        return [(idx, float(similarities[idx])) for idx in top_indices]
+    def _encode_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Encode queries with the retrieval instruction prefix.
 
-    def _bm25_search(
-        self, query: str, bm25: BM25Okapi, top_k: int
-    ) -> List[Tuple[int, float]]:
+        Goes through the shared batcher when one is configured.
+
+        Returns:
+            np.ndarray: Normalized query embeddings with shape (n_queries, dim)
+        """
+        texts = [f"{QUERY_INSTRUCTION}{query}" for query in queries]
+        with timed("encode_query"):
+            if self.batcher is not None:
+                return np.stack(self.batcher(texts))
+            return np.atleast_2d(self.model.encode(texts, normalize_embeddings=True))
+
+    def _bm25_search(self, query: str, bm25: SparseBM25, top_k: int) -> Ranking:
         """
         Perform lexical search using BM25 scoring.
 
+        Chunks sharing no term with the query score zero and are not candidates.
+
         Args:
             query: Search query
             bm25: BM25 index
             top_k: Number of results to return
 
         Returns:
-            List of tuples (doc_id, bm25_score) for top k matches
+            Ranking: Arrays (doc_ids, bm25_scores) of the top k matches, sorted by score
         """
-        tokenized_query = word_tokenize(query.lower())
-        scores = bm25.get_scores(tokenized_query)
-        top_indices = np.argpartition(scores, -top_k)[-top_k:]
-        return [(idx, float(scores[idx])) for idx in top_indices]
-
-    def _rank_fusion(
-        self,
-        semantic_results: List[Tuple[int, float]],
-        bm25_results: List[Tuple[int, float]],
-        alpha: float = 0.5,
-    ) -> List[Tuple[int, float]]:
+        with timed("bm25_search"):
+            scores = bm25.get_scores(self.analyzer.analyze(query))
+            ids, top_scores = top_k_rows(scores[None, :], top_k)
+            return _matching(ids[0], top_scores[0])
+
+    def _semantic_search_many(
+        self, queries: List[str], embeddings, top_k: int
+    ) -> List[Ranking]:
         """
-        Combine semantic and BM25 results using rank fusion.
+        Perform semantic search for a batch of queries.
+
+        Args:
+            queries: Search queries
+            embeddings: Document embeddings matrix, or a VectorIndex over them
+            top_k: Number of results per query
 
-        Normalizes scores from both methods and combines them using weighted sum.
+        Returns:
+            Per query, arrays (doc_ids, similarity_scores) sorted by score
+        """
+        query_embeddings = self._encode_queries(queries)
+        with timed("semantic_search"):
+            if isinstance(embeddings, VectorIndex):
+                return [
+                    (
+                        np.array([i for i, _ in results], dtype=np.int64),
+                        np.array([score for _, score in results], dtype=np.float64),
+                    )
+                    for results in embeddings.search(query_embeddings, top_k)
+                ]
+
+            ids, scores = top_k_rows(query_embeddings @ embeddings.T, top_k)
+            return list(zip(ids, scores))
+
+    def _bm25_search_many(
+        self, queries: List[str], bm25: SparseBM25, top_k: int
+    ) -> List[Ranking]:
+        """
+        Perform BM25 search for a batch of queries with one sparse product.
 
         Args:
-            semantic_results: List of (doc_id, score) from semantic search
-            bm25_results: List of (doc_id, score) from BM25
-            k: Smoothing parameter for CombSUM fusion (default: 60)
-            alpha: Weight for semantic scores, 1-alpha for BM25 (default: 0.5)
+            queries: Search queries
+            bm25: BM25 index
+            top_k: Number of results per query
 
         Returns:
-            List of (doc_id, combined_score) tuples, sorted by score
-        """
-
-        def normalize_scores(
-            results: List[Tuple[int, float]],
-        ) -> List[Tuple[int, float]]:
-            if not results:
-                return []
-            scores = [score for _, score in results]
-            min_score = min(scores)
-            max_score = max(scores)
-            if max_score == min_score:
-                return [(id_, 1.0) for id_, _ in results]
+            Per query, arrays (doc_ids, bm25_scores) sorted by score
+        """
+        with timed("bm25_search"):
+            tokenized_queries = self.analyzer.analyze_many(queries)
+            ids, scores = top_k_rows(bm25.get_scores_many(tokenized_queries), top_k)
             return [
-                (id_, (score - min_score) / (max_score - min_score))
-                for id_, score in results
+                _matching(row_ids, row_scores)
+                for row_ids, row_scores in zip(ids, scores)
             ]
 
-        semantic_normalized = dict(normalize_scores(semantic_results))
-        bm25_normalized = dict(normalize_scores(bm25_results))
+    def _rank_fusion(
+        self, semantic_results: Ranking, bm25_results: Ranking, top_k: int = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Combine semantic and BM25 candidates with the configured fusion.
+
+        Args:
+            semantic_results: Arrays (doc_ids, scores) from semantic search
+            bm25_results: Arrays (doc_ids, scores) from BM25
+            top_k: Number of results to keep (default: all candidates)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Doc ids and fused scores, sorted by score
+        """
+        with timed("fusion"):
+            return self.fusion.fuse([semantic_results, bm25_results], top_k)
 
-        scores = {}
-        all_ids = set(semantic_normalized.keys()) | set(bm25_normalized.keys())
-        for chunk_id in all_ids:
-            semantic_score = semantic_normalized.get(chunk_id, 0.0)
-            bm25_score = bm25_normalized.get(chunk_id, 0.0)
-            scores[chunk_id] = alpha * semantic_score + (1 - alpha) * bm25_score
 
-        return sorted(scores.items(), key=lambda x: x[1], reverse=True)
+def _matching(ids: np.ndarray, scores: np.ndarray) -> Ranking:
+    # Chunks sharing no term with the query score exactly zero; with Okapi's idf
+    # floor a matching chunk of a tiny corpus can score below zero
+    matched = scores != 0
+    return ids[matched], scores[matched]
@@ -0,0 +1,86 @@
+from typing import Dict, List, Optional
+from aiohttp import ClientTimeout
+from app.core import logger
+from app.core.http import HttpClient, http_client
+
+BRAVE_SEARCH_URL = "https://api.search.brave.com/res/v1/web/search"
+
+
+class SearchClient:
+    """
+    Base class for asynchronous web search clients.
+
+    `search` returns results as dicts with "title" and "link" keys, the same shape
+    the search result cache stores.
+    """
+
+    async def search(self, query: str, count: int) -> List[Dict]:
+        """
+        Search the web.
+
+        Args:
+            query: Search query
+            count: Maximum number of results
+
+        Returns:
+            List[Dict]: Results with "title" and "link" keys
+        """
+        raise NotImplementedError
+
+
+class BraveSearchClient(SearchClient):
+    """
+    Brave Search API client built on aiohttp, so searching never blocks the event loop.
+
+    Requests reuse the worker's shared HttpClient session, so the connection to
+    the API stays open between searches.
+
+    Args:
+        api_key (str): Brave Search API subscription token
+        timeout (int): Request timeout in seconds (default: 10)
+        http (HttpClient): Shared HTTP client (default: the worker's client)
+    """
+
+    def __init__(self, api_key: str, timeout: int = 10, http: HttpClient = http_client):
+        self.api_key = api_key
+        self.timeout = ClientTimeout(total=timeout)
+        self.http = http
+
+    async def search(self, query: str, count: int) -> List[Dict]:
+        headers = {
+            "Accept": "application/json",
+            "X-Subscription-Token": self.api_key,
+        }
+        async with self.http.session().get(
+            BRAVE_SEARCH_URL,
+            params={"q": query, "count": count},
+            headers=headers,
+            timeout=self.timeout,
+        ) as response:
+            response.raise_for_status()
+            payload = await response.json()
+
+        results = [
+            {"title": result.get("title", ""), "link": result["url"]}
+            for result in payload.get("web", {}).get("results", [])
+            if "url" in result
+        ]
+        logger.info("Brave search completed", query=query, count=len(results))
+        return results[:count]
+
+
+class StubSearchClient(SearchClient):
+    """
+    Search client returning canned results, for tests and offline development.
+
+    Args:
+        results (List[Dict]): Results returned for every query (default: none)
+    """
+
+    def __init__(self, results: Optional[List[Dict]] = None):
+        self.results = results or []
+        self.queries: List[str] = []
+
+    async def search(self, query: str, count: int) -> List[Dict]:
+        self.queries.append(query)
+        return [dict(result) for result in self.results[:count]]
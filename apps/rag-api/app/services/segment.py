@@ -0,0 +1,189 @@
+from typing import Dict, Optional
+from app.core import logger
+from app.services.bm25 import SparseBM25
+from app.services.chunk_store import ChunkStore
+from app.services.vector_index import VectorIndex, load_vector_index, resident_bytes
+import numpy as np
+import json
+import os
+import time
+
+SEGMENT_VERSION = 1
+
+
+class Segment:
+    """
+    Immutable on-disk unit holding processed chunks, embeddings, BM25 postings
+    and the state of the vector index built over the embeddings.
+
+    Every array is stored as its own .npy file, so a segment opens with
+    `np.load(mmap_mode="r")` for each file: nothing is parsed or copied, loading
+    takes milliseconds regardless of size, and worker processes that open the
+    same segment share its pages through the OS page cache instead of holding
+    private copies.
+
+    Layout of a segment directory:
+        segment.json: Segment version, chunk count, embedding dimension, BM25
+            parameters, the dtype and shape of every array, and document metadata
+        embeddings.npy: float32 embedding matrix with shape (n_chunks, dim)
+        chunks.<name>.npy: ChunkStore text buffer, offsets and per-chunk columns
+        bm25.<name>.npy: SparseBM25 term frequencies and weights in CSR form,
+            IDF, document lengths and sorted vocabulary
+        vector_index.<name>.npy: Arrays of the vector index, such as quantized
+            codes or IVF centroids and lists; none for exact flat search
+
+    Attributes:
+        path (str): Segment directory
+        chunks (ChunkStore): Chunks of the segment
+        embeddings (np.ndarray): Embedding matrix, memory-mapped when opened
+        bm25 (SparseBM25): BM25 index over the chunks
+        index (Optional[VectorIndex]): Vector index over the embeddings, or None
+            if the segment was written without one
+        manifest (Dict): Contents of segment.json
+    """
+
+    def __init__(
+        self,
+        path: str,
+        chunks: ChunkStore,
+        embeddings: np.ndarray,
+        bm25: SparseBM25,
+        manifest: Dict,
+        index: Optional[VectorIndex] = None,
+    ):
+        self.path = path
+        self.chunks = chunks
+        self.embeddings = embeddings
+        self.bm25 = bm25
+        self.index = index
+        self.manifest = manifest
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    @classmethod
+    def write(
+        cls,
+        path: str,
+        chunks: ChunkStore,
+        embeddings: np.ndarray,
+        bm25: SparseBM25,
+        metadata: Optional[Dict] = None,
+        index: Optional[VectorIndex] = None,
+    ) -> Dict:
+        """
+        Write a segment to a new directory.
+
+        Args:
+            path: Directory to create; must not exist yet
+            chunks: Chunks of the segment
+            embeddings: Embedding matrix for the chunks
+            bm25: BM25 index for the chunks
+            metadata: Additional fields for segment.json
+            index: Vector index built over the embeddings, stored so that `open`
+                does not rebuild it
+
+        Returns:
+            dict: The segment manifest
+
+        Raises:
+            ValueError: If chunks, embeddings and bm25 differ in length
+        """
+        if not len(chunks) == len(embeddings) == bm25.corpus_size:
+            raise ValueError(
+                f"Segment parts differ in length: {len(chunks)} chunks, "
+                f"{len(embeddings)} embeddings, {bm25.corpus_size} BM25 documents"
+            )
+        os.makedirs(path)
+        arrays = {"embeddings": np.asarray(embeddings, dtype=np.float32)}
+        arrays.update(
+            (f"chunks.{name}", array) for name, array in chunks.arrays().items()
+        )
+        arrays.update((f"bm25.{name}", array) for name, array in bm25.arrays().items())
+        if index is not None:
+            arrays.update(
+                (f"vector_index.{name}", array)
+                for name, array in index.arrays().items()
+            )
+        for name, array in arrays.items():
+            np.save(os.path.join(path, f"{name}.npy"), array)
+
+        manifest = {
+            **(metadata or {}),
+            "segment_version": SEGMENT_VERSION,
+            "chunk_count": len(chunks),
+            "embedding_dim": int(arrays["embeddings"].shape[1]),
+            "bm25": bm25.params(),
+            "vector_index": (
+                {"kind": index.kind, "params": index.params()}
+                if index is not None
+                else None
+            ),
+            "arrays": {
+                name: {"dtype": str(array.dtype), "shape": list(array.shape)}
+                for name, array in arrays.items()
+            },
+            "documents": chunks.documents,
+        }
+        with open(os.path.join(path, "segment.json"), "w") as f:
+            json.dump(manifest, f, default=str)
+        return manifest
+
+    @classmethod
+    def open(cls, path: str, mmap_mode: Optional[str] = "r") -> "Segment":
+        """
+        Open a segment written by `write`.
+
+        Args:
+            path: Segment directory
+            mmap_mode: Passed to np.load; None reads the arrays into memory
+                (default: "r", read-only memory maps)
+
+        Returns:
+            Segment: The opened segment
+
+        Raises:
+            ValueError: If the segment was written by another format version
+        """
+        start = time.perf_counter()
+        with open(os.path.join(path, "segment.json")) as f:
+            manifest = json.load(f)
+        if manifest.get("segment_version") != SEGMENT_VERSION:
+            raise ValueError(
+                f"Unsupported segment version {manifest.get('segment_version')} "
+                f"in {path}"
+            )
+
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in manifest["arrays"]
+        }
+        chunks = ChunkStore.from_arrays(
+            _with_prefix(arrays, "chunks."), manifest["documents"]
+        )
+        bm25 = SparseBM25.from_arrays(_with_prefix(arrays, "bm25."), manifest["bm25"])
+        index = None
+        if manifest.get("vector_index") is not None:
+            index = load_vector_index(
+                manifest["vector_index"]["kind"],
+                arrays["embeddings"],
+                _with_prefix(arrays, "vector_index."),
+                manifest["vector_index"]["params"],
+            )
+        segment = cls(path, chunks, arrays["embeddings"], bm25, manifest, index)
+        logger.info(
+            "Opened segment",
+            path=path,
+            chunk_count=len(segment),
+            resident_bytes=sum(resident_bytes(array) for array in arrays.values()),
+            seconds=round(time.perf_counter() - start, 4),
+        )
+        return segment
+
+
+def _with_prefix(arrays: Dict[str, np.ndarray], prefix: str) -> Dict[str, np.ndarray]:
+    return {
+        name[len(prefix) :]: array
+        for name, array in arrays.items()
+        if name.startswith(prefix)
+    }
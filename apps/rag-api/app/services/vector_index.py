@@ -0,0 +1,654 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from scipy import sparse
+from app.core import logger
+from app.core.config import VECTOR_INDEX, VECTOR_INDEX_MIN_SIZE, VECTOR_INDEX_PARAMS
+import mmap
+import numpy as np
+import pickle
+import time
+
+
+def top_k_rows(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Select the k highest scores of every row, sorted in descending order.
+
+    Args:
+        scores: Score matrix with shape (n_queries, n_candidates)
+        k: Number of results per row
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Column ids and scores, each with shape (n_queries, k)
+    """
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        empty = np.zeros((scores.shape[0], 0))
+        return empty.astype(np.int64), empty
+    top = np.argpartition(scores, -k, axis=1)[:, -k:]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(
+        top_scores, order, axis=1
+    )
+
+
+def resident_bytes(array: np.ndarray) -> int:
+    """Bytes an array holds in process memory; memory-mapped arrays count as zero."""
+    base = array
+    while base is not None:
+        if isinstance(base, (np.memmap, mmap.mmap)):
+            return 0
+        base = getattr(base, "base", None)
+    return array.nbytes
+
+
+class VectorIndex:
+    """
+    Base class for inner-product vector indexes over normalized embeddings.
+
+    Subclasses implement `search`, which returns the best matching rows for a batch
+    of query vectors. Backends with trained or derived state also implement
+    `arrays`, `params` and `from_arrays`, so a Segment can store that state next
+    to the embeddings and reopen the index without rebuilding it.
+
+    Attributes:
+        embeddings: Indexed embedding matrix with shape (n_vectors, dim)
+    """
+
+    kind = "base"
+
+    def __init__(self, embeddings: np.ndarray):
+        self.embeddings = np.asarray(embeddings, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.embeddings)
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.embeddings.shape
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes of vector data held in memory, excluding memory-mapped files."""
+        return resident_bytes(self.embeddings)
+
+    def search(self, queries: np.ndarray, k: int) -> List[List[Tuple[int, float]]]:
+        """
+        Find the k most similar vectors for each query.
+
+        Args:
+            queries: Query embeddings with shape (n_queries, dim) or (dim,)
+            k: Number of results per query
+
+        Returns:
+            List[List[Tuple[int, float]]]: Per query, (vector_id, score) pairs sorted by score
+        """
+        raise NotImplementedError
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Arrays of the index besides the embeddings, for storing it in a segment."""
+        return {}
+
+    def params(self) -> Dict:
+        """Parameters that, with `arrays`, rebuild the index in `from_arrays`."""
+        return {}
+
+    @classmethod
+    def from_arrays(
+        cls, embeddings: np.ndarray, arrays: Dict[str, np.ndarray], params: Dict
+    ) -> "VectorIndex":
+        """
+        Rebuild an index from `arrays` and `params` without copying the arrays.
+
+        Memory-mapped arrays stay memory-mapped, so processes that open the same
+        files share their pages.
+        """
+        return cls(embeddings, **params)
+
+
+class FlatIndex(VectorIndex):
+    """
+    Exact search with a brute-force matrix product. This is the default backend.
+    """
+
+    kind = "flat"
+
+    def search(self, queries: np.ndarray, k: int) -> List[List[Tuple[int, float]]]:
+        queries = np.atleast_2d(queries).astype(np.float32, copy=False)
+        ids, scores = top_k_rows(queries @ self.embeddings.T, k)
+        return [
+            [(int(i), float(s)) for i, s in zip(row_ids, row_scores)]
+            for row_ids, row_scores in zip(ids, scores)
+        ]
+
+
+class IVFIndex(VectorIndex):
+    """
+    Inverted file index built with spherical k-means in NumPy.
+
+    Vectors are clustered into `n_lists` partitions. A query is compared against the
+    centroids first and only the vectors in the `n_probe` closest partitions are
+    scored exactly. Raising `n_probe` trades latency for recall; with
+    n_probe == n_lists the search is exact. Candidate rows are read from the
+    embeddings in place, so over memory-mapped embeddings only the centroids and
+    list ids stay resident.
+
+    Attributes:
+        n_lists (int): Number of partitions (default: 4 * sqrt(n_vectors))
+        n_probe (int): Partitions scanned per query (default: 8)
+        n_iter (int): k-means iterations (default: 10)
+        centroids: Normalized partition centroids with shape (n_lists, dim)
+    """
+
+    kind = "ivf"
+
+    # Rows scored per block during assignment, to bound the (rows, n_lists) buffer
+    _BLOCK = 65536
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        n_lists: int = None,
+        n_probe: int = 8,
+        n_iter: int = 10,
+        seed: int = 0,
+    ):
+        super().__init__(embeddings)
+        n_vectors = len(self.embeddings)
+        if n_vectors == 0:
+            raise ValueError("Cannot build an IVF index over no vectors")
+        self.n_lists = min(n_lists or max(1, int(4 * np.sqrt(n_vectors))), n_vectors)
+        self.n_probe = min(n_probe, self.n_lists)
+        self.n_iter = n_iter
+
+        self.centroids = self._train(seed)
+        assignments = self._assign(self.embeddings)
+        # Group vector ids by partition so each list is a contiguous slice
+        self.list_ids = np.argsort(assignments, kind="stable")
+        self.list_offsets = np.concatenate(
+            [[0], np.cumsum(np.bincount(assignments, minlength=self.n_lists))]
+        )
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            "centroids": self.centroids,
+            "list_ids": self.list_ids,
+            "list_offsets": self.list_offsets,
+        }
+
+    def params(self) -> Dict:
+        return {"n_lists": self.n_lists, "n_probe": self.n_probe, "n_iter": self.n_iter}
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(
+            resident_bytes(array)
+            for array in (self.embeddings, *self.arrays().values())
+        )
+
+    @classmethod
+    def from_arrays(
+        cls, embeddings: np.ndarray, arrays: Dict[str, np.ndarray], params: Dict
+    ) -> "IVFIndex":
+        index = cls.__new__(cls)
+        VectorIndex.__init__(index, embeddings)
+        for name, value in params.items():
+            setattr(index, name, value)
+        index.centroids = arrays["centroids"]
+        index.list_ids = arrays["list_ids"]
+        index.list_offsets = arrays["list_offsets"]
+        return index
+
+    def _train(self, seed: int) -> np.ndarray:
+        rng = np.random.default_rng(seed)
+        sample_size = min(len(self.embeddings), 256 * self.n_lists)
+        sample = self.embeddings[
+            rng.choice(len(self.embeddings), sample_size, replace=False)
+        ]
+        centroids = sample[rng.choice(sample_size, self.n_lists, replace=False)].copy()
+
+        for _ in range(self.n_iter):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            membership = sparse.csr_matrix(
+                (
+                    np.ones(sample_size, dtype=np.float32),
+                    (assignments, np.arange(sample_size)),
+                ),
+                shape=(self.n_lists, sample_size),
+            )
+            sums = np.asarray(membership @ sample)
+            counts = np.bincount(assignments, minlength=self.n_lists)
+            empty = counts == 0
+            if empty.any():
+                # Re-seed empty partitions with random sample points
+                sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = (sums / np.maximum(norms, 1e-12)).astype(np.float32)
+        return centroids
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        return np.concatenate(
+            [
+                np.argmax(vectors[start : start + self._BLOCK] @ self.centroids.T, axis=1)
+                for start in range(0, len(vectors), self._BLOCK)
+            ]
+        )
+
+    def search(self, queries: np.ndarray, k: int) -> List[List[Tuple[int, float]]]:
+        queries = np.atleast_2d(queries).astype(np.float32, copy=False)
+        probes, _ = top_k_rows(queries @ self.centroids.T, self.n_probe)
+
+        results = []
+        for query, lists in zip(queries, probes):
+            # Sorted ids read the memory-mapped rows in file order
+            candidate_ids = np.sort(
+                np.concatenate(
+                    [
+                        self.list_ids[self.list_offsets[i] : self.list_offsets[i + 1]]
+                        for i in lists
+                    ]
+                )
+            )
+            candidate_vectors = np.asarray(self.embeddings[candidate_ids])
+            ids, scores = top_k_rows((candidate_vectors @ query)[None, :], k)
+            results.append(
+                [
+                    (int(candidate_ids[i]), float(s))
+                    for i, s in zip(ids[0], scores[0])
+                ]
+            )
+        return results
+
+
+class QuantizedIndex(VectorIndex):
+    """
+    Two-stage search over compressed vectors with exact rescoring.
+
+    Subclasses keep a compact code per vector. A query is first scored against
+    all codes, then the best `oversample * k` candidates are rescored exactly
+    against the float embeddings. When the embeddings are memory-mapped (as
+    IndexStore loads them), only the codes stay resident and rescoring reads a
+    few rows from disk per query.
+
+    Attributes:
+        oversample (int): Candidates rescored per requested result
+    """
+
+    # Rows scored per block, to bound the temporary buffers of the coarse stage
+    _BLOCK = 8192
+
+    def __init__(self, embeddings: np.ndarray, oversample: int = 4):
+        super().__init__(embeddings)
+        if oversample < 1:
+            raise ValueError(f"oversample must be at least 1, got {oversample}")
+        self.oversample = oversample
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(
+            resident_bytes(array)
+            for array in (self.embeddings, *self.arrays().values())
+        )
+
+    def params(self) -> Dict:
+        return {"oversample": self.oversample}
+
+    @classmethod
+    def from_arrays(
+        cls, embeddings: np.ndarray, arrays: Dict[str, np.ndarray], params: Dict
+    ) -> "QuantizedIndex":
+        # Skip the subclass constructor, which would quantize the embeddings again
+        index = cls.__new__(cls)
+        QuantizedIndex.__init__(index, embeddings, **params)
+        for name, array in arrays.items():
+            setattr(index, name, array)
+        return index
+
+    def search(self, queries: np.ndarray, k: int) -> List[List[Tuple[int, float]]]:
+        queries = np.atleast_2d(queries).astype(np.float32, copy=False)
+        k = min(k, len(self))
+        if k <= 0:
+            return [[] for _ in queries]
+
+        coarse = np.empty((len(queries), len(self)), dtype=np.float32)
+        for start in range(0, len(self), self._BLOCK):
+            stop = min(start + self._BLOCK, len(self))
+            coarse[:, start:stop] = self._coarse_scores(queries, start, stop)
+        shortlists, _ = top_k_rows(coarse, k * self.oversample)
+
+        results = []
+        for query, shortlist in zip(queries, shortlists):
+            # Sorted ids read the memory-mapped rows in file order
+            candidate_ids = np.sort(shortlist)
+            exact = np.asarray(self.embeddings[candidate_ids]) @ query
+            ids, scores = top_k_rows(exact[None, :], k)
+            results.append(
+                [
+                    (int(candidate_ids[i]), float(s))
+                    for i, s in zip(ids[0], scores[0])
+                ]
+            )
+        return results
+
+    def _coarse_scores(self, queries: np.ndarray, start: int, stop: int) -> np.ndarray:
+        """Approximate scores of rows [start, stop) for each query."""
+        raise NotImplementedError
+
+
+class Int8Index(QuantizedIndex):
+    """
+    Scalar int8 quantization, a quarter of the float32 memory.
+
+    Each dimension is scaled symmetrically by its largest absolute value, so
+    coarse scores are close to the exact inner products and a small oversample
+    recovers nearly all exact results.
+
+    Attributes:
+        codes: int8 codes with shape (n_vectors, dim)
+        scales: Per-dimension scales with shape (dim,)
+    """
+
+    kind = "int8"
+
+    def __init__(self, embeddings: np.ndarray, oversample: int = 4):
+        super().__init__(embeddings, oversample)
+        self.codes, self.scales = quantize_int8(self.embeddings, self._BLOCK)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {"codes": self.codes, "scales": self.scales}
+
+    def _coarse_scores(self, queries: np.ndarray, start: int, stop: int) -> np.ndarray:
+        block = self.codes[start:stop].astype(np.float32)
+        return (block @ (queries * self.scales).T).T
+
+
+class BinaryIndex(QuantizedIndex):
+    """
+    Sign-bit quantization, one thirty-second of the float32 memory.
+
+    Vectors keep one bit per dimension and are compared by Hamming distance
+    with XOR and popcount. Coarse scores are rough, so more candidates are
+    rescored than with int8.
+
+    Attributes:
+        codes: Packed sign bits with shape (n_vectors, ceil(dim / 8))
+    """
+
+    kind = "binary"
+
+    def __init__(self, embeddings: np.ndarray, oversample: int = 10):
+        super().__init__(embeddings, oversample)
+        self.codes = np.concatenate(
+            [
+                quantize_binary(self.embeddings[start : start + self._BLOCK])
+                for start in range(0, len(self.embeddings), self._BLOCK)
+            ]
+        )
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {"codes": self.codes}
+
+    def _coarse_scores(self, queries: np.ndarray, start: int, stop: int) -> np.ndarray:
+        query_codes = quantize_binary(queries)
+        distances = np.bitwise_count(
+            self.codes[None, start:stop, :] ^ query_codes[:, None, :]
+        ).sum(axis=2, dtype=np.int32)
+        return -distances.astype(np.float32)
+
+
+def quantize_int8(
+    embeddings: np.ndarray, block: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize vectors to int8 with one symmetric scale per dimension.
+
+    Args:
+        embeddings: Float matrix with shape (n_vectors, dim)
+        block: Rows converted at a time, to bound temporary memory (default: all)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: int8 codes and float32 scales, such that
+            codes * scales approximates the embeddings
+    """
+    block = block or max(len(embeddings), 1)
+    scales = np.zeros(embeddings.shape[1], dtype=np.float32)
+    for start in range(0, len(embeddings), block):
+        np.maximum(
+            scales, np.abs(embeddings[start : start + block]).max(axis=0), out=scales
+        )
+    scales = np.where(scales > 0, scales / 127, 1).astype(np.float32)
+
+    codes = np.empty(embeddings.shape, dtype=np.int8)
+    for start in range(0, len(embeddings), block):
+        codes[start : start + block] = np.clip(
+            np.rint(embeddings[start : start + block] / scales), -127, 127
+        )
+    return codes, scales
+
+
+def quantize_binary(embeddings: np.ndarray) -> np.ndarray:
+    """
+    Quantize vectors to packed sign bits.
+
+    Args:
+        embeddings: Float matrix with shape (n_vectors, dim)
+
+    Returns:
+        np.ndarray: uint8 matrix with shape (n_vectors, ceil(dim / 8))
+    """
+    return np.packbits(np.asarray(embeddings) > 0, axis=1)
+
+
+class HNSWIndex(VectorIndex):
+    """
+    Hierarchical navigable small world graph backed by hnswlib.
+
+    Requires the optional `hnswlib` package. `ef_search` controls the size of the
+    candidate list at query time and is the main recall/latency knob.
+
+    Attributes:
+        m (int): Graph out-degree (default: 16)
+        ef_construction (int): Candidate list size while building (default: 200)
+        ef_search (int): Candidate list size while searching (default: 64)
+    """
+
+    kind = "hnsw"
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        m: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+    ):
+        super().__init__(embeddings)
+        try:
+            import hnswlib
+        except ImportError as e:
+            raise ImportError(
+                "The hnsw vector index requires hnswlib (pip install hnswlib)"
+            ) from e
+
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        n_vectors, dim = self.embeddings.shape
+        self.index = hnswlib.Index(space="ip", dim=dim)
+        self.index.init_index(
+            max_elements=max(n_vectors, 1), ef_construction=ef_construction, M=m
+        )
+        self.index.add_items(self.embeddings, np.arange(n_vectors))
+        self.index.set_ef(ef_search)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        # hnswlib indexes pickle to their serialized graph
+        return {"graph": np.frombuffer(pickle.dumps(self.index), dtype=np.uint8)}
+
+    def params(self) -> Dict:
+        return {
+            "m": self.m,
+            "ef_construction": self.ef_construction,
+            "ef_search": self.ef_search,
+        }
+
+    @classmethod
+    def from_arrays(
+        cls, embeddings: np.ndarray, arrays: Dict[str, np.ndarray], params: Dict
+    ) -> "HNSWIndex":
+        # hnswlib keeps the graph in its own memory, so it is read, not mapped
+        index = cls.__new__(cls)
+        VectorIndex.__init__(index, embeddings)
+        for name, value in params.items():
+            setattr(index, name, value)
+        index.index = pickle.loads(arrays["graph"].tobytes())
+        index.index.set_ef(index.ef_search)
+        return index
+
+    def search(self, queries: np.ndarray, k: int) -> List[List[Tuple[int, float]]]:
+        queries = np.atleast_2d(queries).astype(np.float32, copy=False)
+        k = min(k, len(self))
+        if k <= 0:
+            return [[] for _ in queries]
+        # hnswlib needs ef >= k to return k results
+        self.index.set_ef(max(self.ef_search, k))
+        labels, distances = self.index.knn_query(queries, k=k)
+        # hnswlib's inner product space reports 1 - similarity
+        return [
+            [(int(i), float(1 - d)) for i, d in zip(row_labels, row_distances)]
+            for row_labels, row_distances in zip(labels, distances)
+        ]
+
+
+VECTOR_INDEXES = {
+    FlatIndex.kind: FlatIndex,
+    IVFIndex.kind: IVFIndex,
+    Int8Index.kind: Int8Index,
+    BinaryIndex.kind: BinaryIndex,
+    HNSWIndex.kind: HNSWIndex,
+}
+
+
+def create_vector_index(
+    embeddings: np.ndarray,
+    kind: str = VECTOR_INDEX,
+    min_size: int = VECTOR_INDEX_MIN_SIZE,
+    **params,
+) -> VectorIndex:
+    """
+    Build a vector index over embeddings.
+
+    Collections smaller than `min_size` always use exact flat search, since
+    approximate indexes only pay off on large collections.
+
+    Args:
+        embeddings: Embedding matrix with shape (n_vectors, dim)
+        kind: Backend name, one of "flat", "ivf", "int8", "binary" or "hnsw"
+            (default: HEIDA_VECTOR_INDEX)
+        min_size: Minimum collection size for approximate backends
+        **params: Backend parameters; defaults to HEIDA_VECTOR_INDEX_PARAMS
+
+    Returns:
+        VectorIndex: The built index
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if kind not in VECTOR_INDEXES:
+        raise ValueError(
+            f"Unknown vector index: {kind}. Supported: {', '.join(VECTOR_INDEXES)}"
+        )
+    if kind == FlatIndex.kind or len(embeddings) < min_size:
+        return FlatIndex(embeddings)
+
+    params = params or VECTOR_INDEX_PARAMS
+    start = time.perf_counter()
+    index = VECTOR_INDEXES[kind](embeddings, **params)
+    logger.info(
+        "Built vector index",
+        kind=kind,
+        vector_count=len(embeddings),
+        build_seconds=round(time.perf_counter() - start, 3),
+    )
+    return index
+
+
+def load_vector_index(
+    kind: str, embeddings: np.ndarray, arrays: Dict[str, np.ndarray], params: Dict
+) -> VectorIndex:
+    """
+    Rebuild a vector index stored with its `arrays` and `params`.
+
+    Args:
+        kind: Backend name the index was built with
+        embeddings: Embedding matrix the index was built over
+        arrays: The index's `arrays`, typically memory-mapped
+        params: The index's `params`
+
+    Returns:
+        VectorIndex: The index, ready to search without rebuilding
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if kind not in VECTOR_INDEXES:
+        raise ValueError(
+            f"Unknown vector index: {kind}. Supported: {', '.join(VECTOR_INDEXES)}"
+        )
+    return VECTOR_INDEXES[kind].from_arrays(embeddings, arrays, params)
+
+
+class SegmentedIndex(VectorIndex):
+    """
+    Searches the vector indexes of several segments as one.
+
+    Each segment is searched for k vectors plus as many as it has deleted, so k
+    live candidates remain per segment once deleted vectors are dropped, and the
+    candidates of all segments are merged by score. Vector ids run through the
+    segments in order, deleted vectors included.
+
+    Attributes:
+        indexes (List[VectorIndex]): Index of each segment
+        live: Per segment, a boolean mask of its live vectors, or None if all are
+        offsets (np.ndarray): First vector id of each segment, plus the total
+    """
+
+    kind = "segmented"
+
+    def __init__(
+        self,
+        indexes: Sequence[VectorIndex],
+        live: Optional[Sequence[Optional[np.ndarray]]] = None,
+    ):
+        # Vectors stay with the segment indexes; there is no combined matrix
+        self.indexes = list(indexes)
+        self.live = list(live) if live is not None else [None] * len(self.indexes)
+        self.offsets = np.cumsum([0] + [len(index) for index in self.indexes])
+        self._deleted_counts = [
+            0 if mask is None else int(len(mask) - np.count_nonzero(mask))
+            for mask in self.live
+        ]
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return (len(self), self.indexes[0].shape[1])
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(index.memory_bytes for index in self.indexes)
+
+    def search(self, queries: np.ndarray, k: int) -> List[List[Tuple[int, float]]]:
+        queries = np.atleast_2d(queries).astype(np.float32, copy=False)
+        merged: List[List[Tuple[int, float]]] = [[] for _ in range(len(queries))]
+        for index, mask, offset, deleted in zip(
+            self.indexes, self.live, self.offsets.tolist(), self._deleted_counts
+        ):
+            results = index.search(queries, min(k + deleted, len(index)))
+            for hits, segment_hits in zip(merged, results):
+                hits.extend(
+                    (i + offset, score)
+                    for i, score in segment_hits
+                    if mask is None or mask[i]
+                )
+        return [sorted(hits, key=lambda hit: -hit[1])[:k] for hits in merged]
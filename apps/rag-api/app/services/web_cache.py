@@ -0,0 +1,147 @@
+from typing import Dict, List, Optional
+from app.core.config import (
+    PAGE_CACHE_FRESH_SECONDS,
+    PAGE_CACHE_TTL,
+    SEARCH_CACHE_TTL,
+    WEB_CACHE_MAX_DISK_ITEMS,
+    WEB_CACHE_MAX_MEMORY_ITEMS,
+    WEB_CACHE_PATH,
+)
+from app.services.cache import TieredCache
+import hashlib
+import time
+import unicodedata
+
+
+def normalize_query(query: str) -> str:
+    """Casefold, NFKC-normalize and whitespace-collapse a search query."""
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+class WebCache:
+    """
+    Caches for the web search pipeline.
+
+    Search results are keyed by normalized query and expire after
+    `search_ttl` seconds, so repeated and trending queries skip the search API.
+    Fetched pages are keyed by URL and store the extracted title and text along
+    with the response's ETag and Last-Modified headers. A page younger than
+    `page_fresh_seconds` is served without touching the network; an older one is
+    revalidated with a conditional request and reused on 304 Not Modified.
+
+    Both caches keep a bounded in-memory LRU tier and a bounded SQLite tier.
+
+    Attributes:
+        search_results: TieredCache of search results
+        pages: TieredCache of fetched pages
+        page_fresh_seconds (float): Age below which pages are not revalidated
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = WEB_CACHE_PATH,
+        search_ttl: float = SEARCH_CACHE_TTL,
+        page_ttl: float = PAGE_CACHE_TTL,
+        page_fresh_seconds: float = PAGE_CACHE_FRESH_SECONDS,
+        max_memory_items: int = WEB_CACHE_MAX_MEMORY_ITEMS,
+        max_disk_items: int = WEB_CACHE_MAX_DISK_ITEMS,
+    ):
+        self.search_results = TieredCache(
+            path,
+            table="search_results",
+            max_memory_items=max_memory_items,
+            max_disk_items=max_disk_items,
+            ttl=search_ttl,
+        )
+        self.pages = TieredCache(
+            path,
+            table="pages",
+            max_memory_items=max_memory_items,
+            max_disk_items=max_disk_items,
+            ttl=page_ttl,
+        )
+        self.page_fresh_seconds = page_fresh_seconds
+
+    @staticmethod
+    def search_key(query: str, count: int) -> str:
+        return hashlib.sha256(f"{count}\0{normalize_query(query)}".encode()).hexdigest()
+
+    def get_search_results(self, query: str, count: int) -> Optional[List[Dict]]:
+        """
+        Return cached search results for a query, or None on a miss.
+
+        Args:
+            query: Search query
+            count: Number of results requested from the search API
+
+        Returns:
+            Optional[List[Dict]]: Results with "title" and "link" keys
+        """
+        return self.search_results.get(self.search_key(query, count))
+
+    def set_search_results(self, query: str, count: int, results: List[Dict]) -> None:
+        self.search_results.set(self.search_key(query, count), results)
+
+    def get_page(self, url: str) -> Optional[Dict]:
+        """
+        Return the cached entry for a URL, or None on a miss.
+
+        Returns:
+            Optional[Dict]: title, text, etag, last_modified and fetched_at
+        """
+        return self.pages.get(url)
+
+    def set_page(
+        self,
+        url: str,
+        title: str,
+        text: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        self.pages.set(
+            url,
+            {
+                "title": title,
+                "text": text,
+                "etag": etag,
+                "last_modified": last_modified,
+                "fetched_at": time.time(),
+            },
+        )
+
+    def touch_page(self, url: str, entry: Dict) -> None:
+        """Mark a page as freshly revalidated after a 304 response."""
+        self.pages.set(url, {**entry, "fetched_at": time.time()})
+
+    def is_fresh(self, entry: Dict) -> bool:
+        return time.time() - entry["fetched_at"] < self.page_fresh_seconds
+
+    @staticmethod
+    def conditional_headers(entry: Dict) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers for revalidation."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def stats(self) -> Dict:
+        """
+        Report hit/miss counters for both caches.
+
+        Returns:
+            dict: Counters for search results and pages
+        """
+        return {
+            "search_results": self.search_results.stats(),
+            "pages": self.pages.stats(),
+        }
+
+    def clear(self) -> None:
+        self.search_results.clear()
+        self.pages.clear()
+
+
+web_cache = WebCache()
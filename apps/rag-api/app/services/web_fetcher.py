@@ -1,8 +1,34 @@
-from typing import Dict, List, Tuple
-from aiohttp import ClientSession, ClientTimeout
-from bs4 import BeautifulSoup
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from aiohttp import ClientResponse, ClientTimeout
 from app.core import logger
+from app.core.config import FETCH_MAX_BYTES
+from app.core.http import HttpClient, http_client
+from app.core.metrics import FETCH_BYTES, record_stage, timed
+from app.services.html_extractor import extract_html
+from app.services.web_cache import WebCache
 import asyncio
+import time
+
+HTML_TYPES = {"text/html", "application/xhtml+xml"}
+
+# Leading bytes of common binary formats served without a useful content type
+BINARY_SIGNATURES = (
+    b"%PDF",
+    b"PK\x03\x04",
+    b"\x89PNG",
+    b"GIF8",
+    b"\xff\xd8\xff",
+    b"\x1f\x8b",
+    b"RIFF",
+    b"\x00\x00\x00",
+)
+
+
+def looks_like_text(prefix: bytes) -> bool:
+    """Guess whether the first bytes of a body are text rather than binary data."""
+    if prefix.startswith(BINARY_SIGNATURES):
+        return False
+    return b"\x00" not in prefix[:1024]
 
 
 class WebFetcher:
@@ -12,41 +38,87 @@ class WebFetcher:
     This class provides methods to fetch content from URLs using aiohttp.
     It also extracts URLs from search results.
 
+    Requests go through the worker's shared HttpClient, which pools connections
+    and limits concurrent requests globally and per host. Bodies are streamed and
+    cut off at `max_bytes`. Only HTML and text are read: other declared content
+    types are rejected before the body is downloaded, and untyped bodies are
+    sniffed from their first bytes.
+
+    With a cache, extracted pages are stored per URL. Fresh entries are served
+    without a request, and stale ones are revalidated with If-None-Match /
+    If-Modified-Since so unchanged pages are not downloaded or parsed again.
+
     Args:
         timeout (int): Request timeout in seconds (default: 10)
         user_agent (str): Custom user agent string (default: "")
+        cache (WebCache): Optional page cache (default: None)
+        http (HttpClient): Shared HTTP client (default: the worker's client)
+        max_bytes (int): Maximum body size read per page (default: HEIDA_FETCH_MAX_BYTES)
     """
 
-    def __init__(self, timeout: int = 10, user_agent: str = ""):
+    def __init__(
+        self,
+        timeout: int = 10,
+        user_agent: str = "",
+        cache: Optional[WebCache] = None,
+        http: HttpClient = http_client,
+        max_bytes: int = FETCH_MAX_BYTES,
+    ):
         self.timeout = ClientTimeout(total=timeout)
         self.headers = {"User-Agent": user_agent or "Custom Web Fetcher Bot 1.0"}
+        self.cache = cache
+        self.http = http
+        self.max_bytes = max_bytes
 
-    async def fetch_url(self, session: ClientSession, url: str) -> Tuple[str, str]:
+    async def fetch_url(self, url: str) -> Tuple[str, str]:
         """
         Fetch content from a URL using aiohttp.
 
+        The time until the body is read is recorded as the "fetch" stage, and
+        parsing as "extract_html".
+
         Args:
-            session: aiohttp ClientSession
             url: URL to fetch
 
         Returns:
             Tuple[str, str]: (title, text content)
         """
+        cached = self.cache.get_page(url) if self.cache else None
+        headers = self.headers
+        if cached is not None:
+            if self.cache.is_fresh(cached):
+                logger.info("Serving cached page", url=url)
+                return cached["title"], cached["text"]
+            headers = {**headers, **self.cache.conditional_headers(cached)}
+
+        start = time.perf_counter()
         try:
-            async with session.get(
-                url, timeout=self.timeout, headers=self.headers
+            async with self.http.limit(url), self.http.session().get(
+                url, timeout=self.timeout, headers=headers
             ) as response:
-                if response.status == 200:
-                    html = await response.text()
-                    soup = BeautifulSoup(html, "html.parser")
-
-                    for script in soup(["script", "style"]):
-                        script.decompose()
-
-                    text = soup.get_text(separator="\n", strip=True)
-                    title = soup.title.string if soup.title else ""
-                    logger.info("Fetched URL", url=url, title=title)
-                    return (title or "", text or "")
+                if response.status == 304 and cached is not None:
+                    record_stage("fetch", time.perf_counter() - start)
+                    logger.info("Page not modified", url=url)
+                    self.cache.touch_page(url, cached)
+                    return cached["title"], cached["text"]
+                elif response.status == 200:
+                    body = await self._read_body(url, response)
+                    record_stage("fetch", time.perf_counter() - start)
+                    if body is None:
+                        return "", ""
+                    FETCH_BYTES.observe(len(body))
+                    with timed("extract_html"):
+                        title, text = self._extract(response, body)
+                    logger.info("Fetched URL", url=url, title=title, bytes=len(body))
+                    if self.cache and text:
+                        self.cache.set_page(
+                            url,
+                            title,
+                            text,
+                            etag=response.headers.get("ETag"),
+                            last_modified=response.headers.get("Last-Modified"),
+                        )
+                    return title, text
                 else:
                     logger.warning(
                         "Failed to fetch URL", url=url, status=response.status
@@ -58,6 +130,48 @@ class WebFetcher:
             )
             return "", ""
 
+    async def _read_body(self, url: str, response: ClientResponse) -> Optional[bytes]:
+        """
+        Stream a response body up to `max_bytes`, or None if it is not text.
+        """
+        content_type = response.content_type
+        declared_text = content_type in HTML_TYPES or content_type.startswith("text/")
+        if not declared_text and content_type != "application/octet-stream":
+            logger.warning("Skipping non-text URL", url=url, content_type=content_type)
+            return None
+
+        blocks = []
+        size = 0
+        async for block in response.content.iter_chunked(64 * 1024):
+            if not blocks and not declared_text and not looks_like_text(block):
+                logger.warning("Skipping binary URL", url=url)
+                return None
+            blocks.append(block)
+            size += len(block)
+            if size >= self.max_bytes:
+                logger.warning(
+                    "Truncated large response", url=url, max_bytes=self.max_bytes
+                )
+                break
+        return b"".join(blocks)[: self.max_bytes]
+
+    def _extract(self, response: ClientResponse, body: bytes) -> Tuple[str, str]:
+        """Decode a body and extract (title, text), parsing HTML when needed."""
+        try:
+            content = body.decode(response.charset or "utf-8", errors="replace")
+        except LookupError:
+            content = body.decode("utf-8", errors="replace")
+
+        is_html = response.content_type in HTML_TYPES or (
+            response.content_type == "application/octet-stream"
+            and content.lstrip()[:15].lower().startswith(("<!doctype", "<html"))
+        )
+        if not is_html:
+            return "", content.strip()
+
+        page = extract_html(content, separator="\n")
+        return page.title or "", page.text
+
     async def fetch_all(self, urls: List[str]) -> Dict[str, Tuple[str, str]]:
         """
         Fetch content from multiple URLs concurrently.
@@ -66,11 +180,44 @@ class WebFetcher:
         Returns:
             Dict[str, Tuple[str, str]]: Mapping of URL to (title, text content)
         """
-        async with ClientSession() as session:
-            tasks = [self.fetch_url(session, url) for url in urls]
-            results = await asyncio.gather(*tasks)
-            logger.info("Fetched content from all URLs", count=len(results))
-            return dict(zip(urls, results))
+        tasks = [self.fetch_url(url) for url in urls]
+        results = await asyncio.gather(*tasks)
+        logger.info("Fetched content from all URLs", count=len(results))
+        return dict(zip(urls, results))
+
+    async def iter_fetched(
+        self, urls: List[str], timeout: Optional[float] = None
+    ) -> AsyncIterator[Tuple[str, str, str]]:
+        """
+        Fetch URLs concurrently and yield each page as soon as it arrives.
+
+        Pages that have not arrived within `timeout` seconds are cancelled and
+        dropped instead of holding back the others.
+
+        Args:
+            urls: List of URLs to fetch
+            timeout: Seconds to wait for all pages (default: no limit)
+
+        Yields:
+            Tuple[str, str, str]: (url, title, text content) in completion order
+        """
+
+        async def fetch(url: str):
+            return url, await self.fetch_url(url)
+
+        tasks = [asyncio.ensure_future(fetch(url)) for url in urls]
+        try:
+            for next_page in asyncio.as_completed(tasks, timeout=timeout):
+                url, (title, text) = await next_page
+                yield url, title, text
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Fetch deadline reached, dropping pending URLs",
+                dropped=sum(not task.done() for task in tasks),
+            )
+        finally:
+            for task in tasks:
+                task.cancel()
 
     def extract_urls(self, search_results: List[Dict]) -> List[str]:
         """
@@ -0,0 +1,219 @@
+from typing import AsyncIterator, Callable, Dict, List, Optional
+from app.core import logger
+from app.core.config import SEARCH_DEADLINE_SECONDS
+from app.core.executor import Executor
+from app.core.metrics import request_timings
+from app.services.bm25 import SparseBM25
+from app.services.chunk_store import ChunkStore
+from app.services.document_processor import DocumentProcessor
+from app.services.retriever import Retriever
+from app.services.search_client import SearchClient
+from app.services.web_cache import WebCache
+from app.services.web_fetcher import WebFetcher
+import numpy as np
+import time
+
+
+def format_results(reranked_results: List[dict]) -> List[dict]:
+    """
+    Convert reranked chunks into response entries.
+    """
+    return [
+        {
+            "content": result["chunk"].content,
+            "metadata": result["chunk"].metadata,
+            "score": result.get("score", 0),
+        }
+        for result in reranked_results
+    ]
+
+
+class WebSearch:
+    """
+    Streaming web search pipeline behind /api/v1/search.
+
+    The query is sent to the search client, and every result URL is fetched
+    concurrently. Pages are processed in the order they arrive: each page is
+    chunked, embedded, retrieved from and reranked on its own, and its best chunks
+    are merged into the running top results by reranker score, so every page costs
+    the same however many arrived before it. Every step yields an event, so clients
+    see partial results after the first page instead of waiting for the slowest
+    one. A page that fails to process is logged and skipped. Pages still missing
+    when `deadline` seconds have passed since the request started are dropped.
+
+    Attributes:
+        client: SearchClient used for the query
+        fetcher: WebFetcher used for the result pages
+        processor: DocumentProcessor chunking and embedding each page
+        reranker: Reranker applied to the retrieved chunks
+        cache: Optional WebCache for search results
+        executor: Optional Executor running processing and ranking off the event loop
+        deadline (float): Seconds allowed for searching and fetching
+            (default: HEIDA_SEARCH_DEADLINE_SECONDS)
+        count (int): Search results requested per query (default: 3)
+        top_k (int): Results returned per event (default: 3)
+    """
+
+    def __init__(
+        self,
+        client: SearchClient,
+        fetcher: WebFetcher,
+        processor: DocumentProcessor,
+        reranker,
+        cache: Optional[WebCache] = None,
+        executor: Optional[Executor] = None,
+        deadline: float = SEARCH_DEADLINE_SECONDS,
+        count: int = 3,
+        top_k: int = 3,
+    ):
+        self.client = client
+        self.fetcher = fetcher
+        self.processor = processor
+        self.reranker = reranker
+        self.cache = cache
+        self.executor = executor
+        self.deadline = deadline
+        self.count = count
+        self.top_k = top_k
+
+    async def stream(self, query: str) -> AsyncIterator[Dict]:
+        """
+        Run the search and yield status, partial and final result events.
+
+        Args:
+            query: Search query
+
+        Yields:
+            dict: Events with a "status" of searching, found_results, indexing,
+                partial (one per processed page), fetched and completed. The
+                completed event carries the search's stage timings.
+        """
+        with request_timings() as timings:
+            async for event in self._stream(query):
+                if event["status"] == "completed":
+                    event["timings"] = timings.as_dict()
+                yield event
+
+    async def _stream(self, query: str) -> AsyncIterator[Dict]:
+        started = time.monotonic()
+        yield {"status": "searching"}
+
+        search_results = await self._search(query)
+        yield {"status": "found_results"}
+        logger.info("Search results loaded", count=len(search_results))
+
+        url_metadata = {
+            result["link"]: {"title": result["title"], "result_index": i}
+            for i, result in enumerate(search_results)
+        }
+
+        yield {"status": "indexing"}
+
+        retriever = Retriever(
+            self.processor.model,
+            model_name=self.processor.model_name,
+            analyzer=self.processor.analyzer,
+        )
+        search_results: List[dict] = []
+        pages = 0
+
+        remaining = max(0.0, self.deadline - (time.monotonic() - started))
+        async for url, title, content in self.fetcher.iter_fetched(
+            list(url_metadata), timeout=remaining
+        ):
+            if not content:
+                continue
+            try:
+                page_chunks, page_embeddings, page_bm25 = await self._run(
+                    self.processor.process_documents,
+                    content.encode("utf-8"),
+                    "text/plain",
+                )
+                page_chunks.update_metadata(
+                    {
+                        "title": title or url_metadata[url]["title"],
+                        "url": url,
+                        "source": "web",
+                        "result_index": url_metadata[url]["result_index"],
+                    }
+                )
+                page_results = await self._rank(
+                    retriever, query, page_chunks, page_embeddings, page_bm25
+                )
+            except Exception as e:
+                logger.warning(
+                    "Skipping page",
+                    url=url,
+                    error=str(e),
+                    error_type=type(e).__name__,
+                )
+                continue
+            pages += 1
+
+            # Earlier pages win ties, so results stay stable as pages arrive
+            search_results = sorted(
+                search_results + page_results,
+                key=lambda result: result["score"],
+                reverse=True,
+            )[: self.top_k]
+            yield {
+                "status": "partial",
+                "results": search_results,
+                "count": len(search_results),
+                "pages": pages,
+            }
+
+        yield {"status": "fetched"}
+        logger.info(
+            "Web search completed",
+            pages=pages,
+            dropped=len(url_metadata) - pages,
+            seconds=round(time.monotonic() - started, 3),
+        )
+
+        yield {
+            "query": query,
+            "results": search_results,
+            "count": len(search_results),
+            "status": "completed",
+        }
+
+    async def _search(self, query: str) -> List[Dict]:
+        if self.cache is not None:
+            cached = self.cache.get_search_results(query, self.count)
+            if cached is not None:
+                return cached
+        results = await self.client.search(query, self.count)
+        if self.cache is not None:
+            self.cache.set_search_results(query, self.count, results)
+        return results
+
+    async def _rank(
+        self,
+        retriever: Retriever,
+        query: str,
+        chunks: ChunkStore,
+        embeddings: np.ndarray,
+        bm25: SparseBM25,
+    ) -> List[dict]:
+        results = await self._run(
+            retriever.retrieve,
+            query=query,
+            chunks=chunks,
+            embeddings=embeddings,
+            bm25=bm25,
+            top_k=self.top_k,
+        )
+        # Without retrieval scores the cross-encoder always runs, so the scores
+        # of chunks from different pages are comparable
+        reranked_results = await self._run(
+            self.reranker.rerank,
+            query,
+            [result["chunk"] for result in results],
+        )
+        return format_results(reranked_results)
+
+    async def _run(self, fn: Callable, *args, **kwargs):
+        if self.executor is None:
+            return fn(*args, **kwargs)
+        return await self.executor.run_in_thread(fn, *args, **kwargs)
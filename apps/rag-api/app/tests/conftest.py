@@ -1,14 +1,14 @@
 import pytest
-from app.services import DocumentProcessor, Retriever
+from app.services import DocumentProcessor, EmbeddingCache, Retriever
 from sentence_transformers import SentenceTransformer
 import numpy as np
-from rank_bm25 import BM25Okapi
-from nltk.tokenize import word_tokenize
+from app.services.analyzer import default_analyzer
+from app.services.bm25 import SparseBM25
 
 
 @pytest.fixture
 def document_processor():
-    return DocumentProcessor()
+    return DocumentProcessor(embedding_cache=EmbeddingCache(path=None))
 
 
 @pytest.fixture
@@ -88,5 +88,5 @@ def sample_embeddings():
 
 @pytest.fixture
 def sample_bm25(sample_chunks):
-    tokenized_corpus = [word_tokenize(doc.lower()) for doc in sample_chunks]
-    return BM25Okapi(tokenized_corpus)
+    tokenized_corpus = default_analyzer.analyze_many(sample_chunks)
+    return SparseBM25(tokenized_corpus)
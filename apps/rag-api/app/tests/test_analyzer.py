@@ -0,0 +1,41 @@
+from app.services.analyzer import Analyzer
+import pytest
+
+
+def test_lowercases_and_splits_words():
+    assert Analyzer().analyze("Hello, World! It's 2024.") == [
+        "hello",
+        "world",
+        "it",
+        "s",
+        "2024",
+    ]
+
+
+def test_analyze_many_matches_analyze():
+    analyzer = Analyzer(stemmer="porter", stopwords="english")
+    texts = ["The Runners were running.", "", "A text\0with NUL", "ÉCOLE Straße"]
+    assert analyzer.analyze_many(texts) == [analyzer.analyze(text) for text in texts]
+
+
+def test_stopwords_and_stemming():
+    analyzer = Analyzer(stemmer="porter", stopwords="english")
+    assert analyzer.analyze("The cats are running to the houses") == [
+        "cat",
+        "run",
+        "hous",
+    ]
+
+
+def test_config_round_trip():
+    analyzer = Analyzer(lowercase=False, stopwords="english")
+    rebuilt = Analyzer(**analyzer.config())
+    assert rebuilt.name == analyzer.name
+    assert rebuilt.analyze("The Cat") == ["The", "Cat"]
+
+
+def test_unknown_options():
+    with pytest.raises(ValueError):
+        Analyzer(stemmer="lancaster")
+    with pytest.raises(ValueError):
+        Analyzer(stopwords="klingon")
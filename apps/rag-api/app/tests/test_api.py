@@ -2,7 +2,17 @@ from fastapi.testclient import TestClient
 from unittest.mock import patch
 from io import BytesIO
 from app.main import app
+from app.services.chunk_store import ChunkStore
 from app.services.document_processor import Chunk
+from app.services.index_store import IndexStore
+from app.services.analyzer import Analyzer
+from app.services.bm25 import SparseBM25
+import json
+import numpy as np
+import subprocess
+import sys
+import threading
+import time
 
 client = TestClient(app)
 
@@ -66,6 +76,7 @@ def test_retrieve_endpoint_returns_results(sample_pdf_content):
                 },
             ],
             "count": 2,
+            "timings": {},
         }
 
 
@@ -116,3 +127,361 @@ def test_retrieve_endpoint_handles_processing_error(sample_pdf_content):
         )
         assert response.status_code == 500
         assert "An error occurred during retrieval" in response.json()["detail"]
+
+
+def test_collection_ingest_and_query(tmp_path, sample_pdf_content):
+    mock_chunks = [
+        Chunk(content="chunk1", metadata={"chunk_index": 0, "total_chunks": 1}, index=0)
+    ]
+
+    with patch("app.main.index_store", IndexStore(str(tmp_path))), patch(
+        "app.main.DocumentProcessor"
+    ) as mock_processor, patch("app.main.Retriever") as mock_retriever, patch(
+        "app.main.Reranker"
+    ) as mock_reranker, patch("app.main.model_registry"):
+        mock_processor_instance = mock_processor.return_value
+        mock_processor_instance.model_name = "test-model"
+        mock_processor_instance.chunk_size = 500
+        mock_processor_instance.chunk_overlap = 50
+        mock_processor_instance.chunk_unit = "tokens"
+        mock_processor_instance.analyzer = Analyzer(stemmer="porter")
+        mock_processor_instance.process_documents.return_value = (
+            mock_chunks,
+            np.zeros((1, 4), dtype=np.float32),
+            SparseBM25([["chunk1"]]),
+        )
+        mock_retriever.return_value.retrieve.return_value = [
+            {"chunk": mock_chunks[0], "score": 0.9}
+        ]
+        mock_reranker.return_value.rerank.return_value = [
+            {"chunk": mock_chunks[0], "score": 0.95}
+        ]
+
+        response = client.post(
+            "/api/v1/collections",
+            files={"file": ("test.pdf", BytesIO(sample_pdf_content), "application/pdf")},
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert body["created"] is True
+        assert body["chunk_count"] == 1
+        collection_id = body["collection_id"]
+
+        response = client.post(
+            "/api/v1/collections",
+            files={"file": ("test.pdf", BytesIO(sample_pdf_content), "application/pdf")},
+        )
+        assert response.json()["created"] is False
+        assert mock_processor_instance.process_documents.call_count == 1
+
+        response = client.post(
+            f"/api/v1/collections/{collection_id}/query",
+            json={"query": "test query", "top_k": 5},
+        )
+        assert response.status_code == 200
+        # The query is analyzed the same way the collection was indexed
+        assert mock_retriever.call_args.kwargs["analyzer"].config() == (
+            mock_processor_instance.analyzer.config()
+        )
+        assert response.json()["results"] == [
+            {
+                "content": "chunk1",
+                "metadata": {"chunk_index": 0, "total_chunks": 1},
+                "score": 0.95,
+            }
+        ]
+        # Stages timed in executor threads count towards the request
+        assert "load_index" in response.json()["timings"]
+        assert "load_index;dur=" in response.headers["Server-Timing"]
+
+        response = client.delete(f"/api/v1/collections/{collection_id}")
+        assert response.status_code == 200
+
+
+def test_collection_ingest_restores_replaced_document(tmp_path):
+    def processed(text):
+        return (
+            ChunkStore.from_chunks([Chunk(content=text, metadata={}, index=0)]),
+            np.eye(1, 4, dtype=np.float32),
+            SparseBM25([text.split()]),
+        )
+
+    def ingest(content):
+        return client.post(
+            "/api/v1/collections",
+            files={"file": ("doc.txt", BytesIO(content), "text/plain")},
+        )
+
+    store = IndexStore(str(tmp_path))
+    with patch("app.main.index_store", store), patch(
+        "app.main.DocumentProcessor"
+    ) as mock_processor:
+        processor = mock_processor.return_value
+        processor.model_name = "test-model"
+        processor.chunk_size = 500
+        processor.chunk_overlap = 50
+        processor.chunk_unit = "tokens"
+        processor.analyzer = Analyzer()
+        processor.process_documents.return_value = processed("original text")
+        collection_id = ingest(b"original").json()["collection_id"]
+
+        processor.process_documents.return_value = processed("replaced text")
+        response = client.put(
+            f"/api/v1/collections/{collection_id}/documents/doc.txt",
+            files={"file": ("doc.txt", BytesIO(b"replaced"), "text/plain")},
+        )
+        assert response.status_code == 200
+
+        # The collection no longer holds the original file, so it is added back
+        processor.process_documents.return_value = processed("original text")
+        response = ingest(b"original")
+        assert response.status_code == 200
+        assert response.json()["created"] is False
+        assert processor.process_documents.call_count == 3
+        chunks, _, _ = store.load(collection_id)
+        assert [chunk.content for chunk in chunks] == ["original text"]
+
+        assert ingest(b"original").json()["created"] is False
+        assert processor.process_documents.call_count == 3
+
+
+def test_collection_query_not_found(tmp_path):
+    with patch("app.main.index_store", IndexStore(str(tmp_path))):
+        response = client.post(
+            "/api/v1/collections/missing/query", json={"query": "test query"}
+        )
+    assert response.status_code == 404
+
+
+def test_outdated_collection_is_rejected_but_deletable(tmp_path):
+    store = IndexStore(str(tmp_path))
+    store.save(
+        "abc",
+        ChunkStore.from_chunks([Chunk(content="chunk1", metadata={}, index=0)]),
+        np.zeros((1, 4), dtype=np.float32),
+        SparseBM25([["chunk1"]]),
+    )
+    manifest_path = tmp_path / "abc" / "manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    manifest["format_version"] = 1
+    manifest_path.write_text(json.dumps(manifest))
+
+    with patch("app.main.index_store", store):
+        assert client.get("/api/v1/collections/abc").status_code == 200
+        response = client.post(
+            "/api/v1/collections/abc/query", json={"query": "chunk1"}
+        )
+        assert response.status_code == 409
+        assert "upload it again" in response.json()["detail"]
+        assert client.delete("/api/v1/collections/abc").status_code == 200
+        assert client.get("/api/v1/collections/abc").status_code == 404
+
+
+def test_collection_document_upsert_and_delete(tmp_path):
+    def processed(texts):
+        embeddings = np.eye(len(texts), 4, dtype=np.float32)
+        return (
+            ChunkStore.from_chunks(
+                Chunk(content=text, metadata={}, index=i)
+                for i, text in enumerate(texts)
+            ),
+            embeddings,
+            SparseBM25([text.split() for text in texts]),
+        )
+
+    store = IndexStore(str(tmp_path), merge_max_segments=1)
+    store.save(
+        "abc",
+        *processed(["first document"]),
+        metadata={
+            "model": "test-model",
+            "chunk_size": 500,
+            "chunk_overlap": 50,
+            "chunk_unit": "chars",
+            "analyzer": Analyzer().config(),
+        },
+        document_id="a",
+    )
+
+    def upload(document_id, content, collection_id="abc"):
+        return client.put(
+            f"/api/v1/collections/{collection_id}/documents/{document_id}",
+            files={"file": (f"{document_id}.txt", BytesIO(content), "text/plain")},
+        )
+
+    with patch("app.main.index_store", store), patch(
+        "app.main.DocumentProcessor"
+    ) as mock_processor:
+        process = mock_processor.return_value.process_documents
+        process.return_value = processed(["second document", "kept chunk"])
+        response = upload("b", b"version 1")
+        assert response.status_code == 200
+        assert response.json()["created"] is True
+        assert process.call_args.args[2] is None
+        # The collection's settings are used, not the server defaults
+        assert mock_processor.call_args.kwargs["chunk_unit"] == "chars"
+
+        response = upload("b", b"version 1")
+        assert response.json()["updated"] is False
+        assert process.call_count == 1
+
+        process.return_value = processed(["changed document", "kept chunk"])
+        response = upload("b", b"version 2")
+        assert response.json()["reused_embeddings"] == 1
+        assert set(process.call_args.args[2]) == {"second document", "kept chunk"}
+
+        # More than merge_max_segments segments get merged in the background
+        for _ in range(100):
+            manifest = store.info("abc")
+            if len(manifest["segments"]) == 1 and not store._merging:
+                break
+            time.sleep(0.05)
+        assert [entry["deleted_count"] for entry in manifest["segments"]] == [0]
+        assert manifest["chunk_count"] == 3
+
+        assert client.delete("/api/v1/collections/abc/documents/b").status_code == 200
+        assert client.delete("/api/v1/collections/abc/documents/b").status_code == 404
+        assert client.delete("/api/v1/collections/abc/documents/a").status_code == 409
+        assert upload("b", b"version 3", collection_id="missing").status_code == 404
+
+
+def test_retrieve_batch_endpoint_returns_results_in_order(sample_pdf_content):
+    mock_chunks = [
+        Chunk(content="chunk1", metadata={"chunk_index": 0}, index=0),
+        Chunk(content="chunk2", metadata={"chunk_index": 1}, index=1),
+    ]
+
+    with patch("app.main.DocumentProcessor") as mock_processor, patch(
+        "app.main.Retriever"
+    ) as mock_retriever, patch("app.main.Reranker") as mock_reranker:
+        mock_processor.return_value.process_documents.return_value = (
+            mock_chunks,
+            "mock_embeddings",
+            "mock_bm25",
+        )
+        mock_retriever.return_value.retrieve_many.return_value = [
+            [{"chunk": mock_chunks[0], "score": 0.9}],
+            [{"chunk": mock_chunks[1], "score": 0.8}],
+        ]
+        mock_reranker.return_value.rerank_many.return_value = [
+            [{"chunk": mock_chunks[0], "score": 0.95}],
+            [{"chunk": mock_chunks[1], "score": 0.85}],
+        ]
+
+        response = client.post(
+            "/api/v1/retrieve/batch",
+            data={"queries": ["first query", "second query"], "top_k": "1"},
+            files={"file": ("test.pdf", BytesIO(sample_pdf_content), "application/pdf")},
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["count"] == 2
+        assert [r["query"] for r in body["results"]] == ["first query", "second query"]
+        assert body["results"][1]["results"][0]["content"] == "chunk2"
+        mock_reranker.return_value.rerank_many.assert_called_once_with(
+            ["first query", "second query"],
+            [[mock_chunks[0]], [mock_chunks[1]]],
+            [[0.9], [0.8]],
+        )
+
+
+def test_retrieve_batch_endpoint_rejects_empty_query(sample_pdf_content):
+    response = client.post(
+        "/api/v1/retrieve/batch",
+        data={"queries": ["valid", " "]},
+        files={"file": ("test.pdf", BytesIO(sample_pdf_content), "application/pdf")},
+    )
+    assert response.status_code == 400
+
+
+def test_metrics_endpoint():
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE heida_stage_seconds histogram" in response.text
+    assert "# TYPE heida_batch_size histogram" in response.text
+
+
+def test_health_and_ready_during_warm_up():
+    loaded = threading.Event()
+    with patch("app.main.model_registry") as mock_registry:
+        mock_registry.warm_up.side_effect = lambda **kwargs: loaded.wait(5)
+        mock_registry.stats.return_value = []
+        with TestClient(app) as lifespan_client:
+            assert lifespan_client.get("/health").json() == {"status": "ok"}
+            assert lifespan_client.get("/ready").status_code == 503
+
+            loaded.set()
+            for _ in range(100):
+                response = lifespan_client.get("/ready")
+                if response.status_code == 200:
+                    break
+                time.sleep(0.01)
+            assert response.json() == {"status": "ready", "models": []}
+
+
+def test_health_answers_while_model_loads(sample_pdf_content):
+    loading = threading.Event()
+    loaded = threading.Event()
+
+    def load_model(**kwargs):
+        loading.set()
+        loaded.wait(5)
+        raise OSError("model not found")
+
+    with patch("app.main.WARM_UP", False), patch(
+        "app.main.DocumentProcessor", side_effect=load_model
+    ), TestClient(app) as lifespan_client:
+        request = threading.Thread(
+            target=lifespan_client.post,
+            args=("/api/v1/retrieve",),
+            kwargs={
+                "data": {"query": "test query"},
+                "files": {
+                    "file": ("test.pdf", BytesIO(sample_pdf_content), "application/pdf")
+                },
+            },
+        )
+        request.start()
+        assert loading.wait(5)
+
+        started = time.perf_counter()
+        response = lifespan_client.get("/health")
+        elapsed = time.perf_counter() - started
+        loaded.set()
+        request.join(5)
+
+    assert response.json() == {"status": "ok"}
+    assert elapsed < 2
+
+
+def test_ready_without_warm_up():
+    with patch("app.main.WARM_UP", False), patch("app.main.model_registry") as mock:
+        mock.stats.return_value = []
+        with TestClient(app) as lifespan_client:
+            assert lifespan_client.get("/ready").status_code == 200
+        mock.warm_up.assert_not_called()
+
+
+def test_ready_reports_failed_warm_up():
+    with patch("app.main.model_registry") as mock_registry:
+        mock_registry.warm_up.side_effect = OSError("model not found")
+        with TestClient(app) as lifespan_client:
+            for _ in range(100):
+                response = lifespan_client.get("/ready")
+                if response.json()["detail"] != "Warming up":
+                    break
+                time.sleep(0.01)
+            assert response.status_code == 503
+            assert response.json()["detail"] == "Warm-up failed"
+
+
+def test_import_does_not_load_models():
+    heavy = ["torch", "sentence_transformers", "tiktoken", "nltk"]
+    check = f"import app.main, sys; print([m for m in {heavy!r} if m in sys.modules])"
+    result = subprocess.run(
+        [sys.executable, "-c", check], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor
+from app.services.batcher import MicroBatcher
+import pytest
+import threading
+
+
+class RecordingModel:
+    """Doubles its inputs and records every batch it receives."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        return [item * 2 for item in items]
+
+
+def test_concurrent_jobs_share_one_call():
+    model = RecordingModel()
+    batcher = MicroBatcher(model, window_ms=200, max_batch_size=100)
+    barrier = threading.Barrier(4)
+
+    def job(i):
+        barrier.wait()
+        return batcher([i, i + 10])
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(job, range(4)))
+
+    assert results == [[2 * i, 2 * (i + 10)] for i in range(4)]
+    assert sum(len(batch) for batch in model.batches) == 8
+    assert len(model.batches) < 4
+    assert batcher.stats()["jobs"] == 4
+
+
+def test_max_batch_size_closes_batch():
+    model = RecordingModel()
+    batcher = MicroBatcher(model, window_ms=200, max_batch_size=3)
+    futures = [batcher.submit([i, i]) for i in range(3)]
+
+    assert [future.result() for future in futures] == [[0, 0], [2, 2], [4, 4]]
+    assert all(len(batch) <= 3 for batch in model.batches)
+    assert batcher.stats()["max_items"] <= 3
+
+
+def test_oversized_job_runs_alone():
+    model = RecordingModel()
+    batcher = MicroBatcher(model, window_ms=0, max_batch_size=2)
+
+    assert batcher(list(range(5))) == [0, 2, 4, 6, 8]
+    assert model.batches == [[0, 1, 2, 3, 4]]
+
+
+def test_empty_job_skips_model():
+    model = RecordingModel()
+    batcher = MicroBatcher(model)
+
+    assert batcher([]) == []
+    assert model.batches == []
+
+
+def test_errors_reach_every_job_in_the_batch():
+    def fail(items):
+        raise RuntimeError("model failed")
+
+    batcher = MicroBatcher(fail, window_ms=0)
+    with pytest.raises(RuntimeError, match="model failed"):
+        batcher(["query"])
+
+    # The worker keeps serving after a failed batch
+    batcher.fn = RecordingModel()
+    assert batcher([1]) == [2]
@@ -0,0 +1,163 @@
+import pytest
+import numpy as np
+from rank_bm25 import BM25Okapi
+from app.services.bm25 import SparseBM25, Vocabulary
+
+
+@pytest.fixture
+def corpus():
+    texts = [
+        "the quick brown fox jumps over the lazy dog",
+        "the lazy cat sleeps all day",
+        "a quick brown dog outpaces a quick red fox",
+        "hello world",
+        "the the the end",
+    ]
+    return [text.split() for text in texts]
+
+
+def reference_scores(corpus, query, variant, k1=1.5, b=0.75, delta=None):
+    """Term-at-a-time BM25+/BM25L scores from Lv & Zhai (2011)."""
+    n_docs = len(corpus)
+    avgdl = sum(len(doc) for doc in corpus) / n_docs
+    scores = np.zeros(n_docs)
+    for term in query:
+        df = sum(term in doc for doc in corpus)
+        if not df:
+            continue
+        for i, doc in enumerate(corpus):
+            tf = doc.count(term)
+            if not tf:
+                continue
+            norm = 1 - b + b * len(doc) / avgdl
+            if variant == "plus":
+                idf = np.log((n_docs + 1) / df)
+                scores[i] += idf * (tf * (k1 + 1) / (tf + k1 * norm) + (delta or 1.0))
+            else:
+                idf = np.log(n_docs + 1) - np.log(df + 0.5)
+                ctd = tf / norm
+                d = delta or 0.5
+                scores[i] += idf * (k1 + 1) * (ctd + d) / (k1 + ctd + d)
+    return scores
+
+
+QUERIES = [["quick", "fox"], ["the", "lazy", "lazy"], ["missing"], []]
+
+
+def test_okapi_scores_match_rank_bm25(corpus):
+    index = SparseBM25(corpus)
+    expected = BM25Okapi(corpus)
+    for query in QUERIES:
+        np.testing.assert_allclose(
+            index.get_scores(query), expected.get_scores(query), rtol=1e-5, atol=1e-6
+        )
+
+
+@pytest.mark.parametrize("variant", ["plus", "l"])
+def test_variant_scores(corpus, variant):
+    index = SparseBM25(corpus, variant=variant)
+    for query in QUERIES:
+        np.testing.assert_allclose(
+            index.get_scores(query),
+            reference_scores(corpus, query, variant),
+            rtol=1e-5,
+            atol=1e-6,
+        )
+
+
+def test_top_k_sorted(corpus):
+    index = SparseBM25(corpus)
+    results = index.top_k(["quick", "fox"], 2)
+    scores = index.get_scores(["quick", "fox"])
+    assert [doc_id for doc_id, _ in results] == list(np.argsort(-scores)[:2])
+    assert results[0][1] >= results[1][1]
+
+
+def test_unknown_variant(corpus):
+    with pytest.raises(ValueError):
+        SparseBM25(corpus, variant="unknown")
+
+
+def test_empty_corpus():
+    with pytest.raises(ValueError):
+        SparseBM25([])
+
+
+def test_save_and_load(tmp_path, corpus):
+    index = SparseBM25(corpus, variant="plus", k1=1.2)
+    path = str(tmp_path / "bm25.npz")
+    index.save(path)
+    loaded = SparseBM25.load(path)
+    assert loaded.params() == index.params()
+    np.testing.assert_array_equal(
+        loaded.get_scores(["lazy", "dog"]), index.get_scores(["lazy", "dog"])
+    )
+
+
+def test_get_scores_many_matches_get_scores(corpus):
+    index = SparseBM25(corpus)
+    scores = index.get_scores_many(QUERIES)
+    assert scores.shape == (len(QUERIES), len(corpus))
+    for query, row in zip(QUERIES, scores):
+        np.testing.assert_allclose(row, index.get_scores(query), rtol=1e-6)
+
+
+@pytest.mark.parametrize("variant", ["okapi", "plus", "l"])
+def test_concat_matches_single_index(variant):
+    first = [["red", "apple"], ["green", "apple", "pie"]]
+    second = [["blue", "sky"], ["red", "sky", "sky"]]
+    combined = SparseBM25.concat(
+        [SparseBM25(first, variant=variant), SparseBM25(second, variant=variant)]
+    )
+    expected = SparseBM25(first + second, variant=variant)
+
+    for query in (["red"], ["sky", "apple"], ["missing"]):
+        np.testing.assert_allclose(
+            combined.get_scores(query), expected.get_scores(query), rtol=1e-6
+        )
+
+
+def test_vocabulary_lookup():
+    vocab = Vocabulary.from_terms(["fox", "über", "ab", "a"])
+    assert vocab.lookup(["a", "über", "missing", "abc", "fox"]).tolist() == [
+        3,
+        1,
+        -1,
+        -1,
+        0,
+    ]
+    # Keys longer than every stored term do not match a stored prefix
+    assert "aboveground" not in vocab
+    assert vocab["ab"] == 2
+    assert list(vocab) == ["fox", "über", "ab", "a"]
+    assert Vocabulary.from_terms([]).lookup(["a"]).tolist() == [-1]
+
+
+def test_from_arrays_searches_vocabulary_in_place(tmp_path, corpus):
+    index = SparseBM25(corpus)
+    arrays = {}
+    for name, array in index.arrays().items():
+        np.save(tmp_path / f"{name}.npy", array)
+        arrays[name] = np.load(tmp_path / f"{name}.npy", mmap_mode="r")
+
+    loaded = SparseBM25.from_arrays(arrays, index.params())
+    assert isinstance(loaded.vocab.blob, np.memmap)
+    for query in QUERIES:
+        np.testing.assert_array_equal(loaded.get_scores(query), index.get_scores(query))
+
+
+def test_long_token_does_not_pad_vocabulary(corpus):
+    long_token = "x" * 20_000
+    index = SparseBM25(corpus + [[long_token, "fox"]])
+
+    # Each term takes its own length, not that of the longest term
+    vocab_bytes = sum(
+        index.arrays()[name].nbytes for name in ("vocab_blob", "vocab_offsets")
+    )
+    assert vocab_bytes < 21_000
+    assert index.vocab[long_token] == len(index.vocab) - 1
+    assert "x" * 19_999 not in index.vocab
+    assert index.get_scores([long_token])[-1] > 0
+
+    merged = SparseBM25.concat([index, SparseBM25(corpus)])
+    assert merged.vocab.blob.nbytes == index.vocab.blob.nbytes
@@ -0,0 +1,67 @@
+from app.services.chunk_store import Chunk, ChunkStore, ChunkStoreBuilder
+import pickle
+import pytest
+
+
+@pytest.fixture
+def store():
+    builder = ChunkStoreBuilder()
+    report = builder.add_document({"title": "Report", "/Producer": "pypdf"})
+    builder.add("First page", report, page=1)
+    builder.add("Still the first page ünïcode", report, page=1)
+    builder.add("Second page", report, page=2)
+    notes = builder.add_document({"title": "Notes"})
+    builder.add("A note", notes)
+    return builder.build()
+
+
+def test_chunks_are_materialized_with_document_metadata(store):
+    assert len(store) == 4
+    assert store[1] == Chunk(
+        content="Still the first page ünïcode",
+        metadata={
+            "title": "Report",
+            "/Producer": "pypdf",
+            "chunk_index": 1,
+            "total_chunks": 3,
+            "page": 1,
+        },
+        index=1,
+    )
+    assert store[3].metadata == {"title": "Notes", "chunk_index": 0, "total_chunks": 1}
+    assert list(store.texts())[1] == "Still the first page ünïcode"
+    with pytest.raises(IndexError):
+        store[4]
+
+
+def test_document_metadata_is_stored_once(store):
+    assert len(store.documents) == 2
+    store.update_metadata({"source": "web"})
+    assert all(chunk.metadata["source"] == "web" for chunk in store)
+
+
+def test_from_chunks_groups_documents(store):
+    rebuilt = ChunkStore.from_chunks(list(store))
+
+    assert len(rebuilt.documents) == 2
+    assert list(rebuilt) == list(store)
+
+
+def test_concat_renumbers_documents(store):
+    combined = ChunkStore.concat([store, store])
+
+    assert len(combined) == 8
+    assert len(combined.documents) == 4
+    assert combined[5].content == "Still the first page ünïcode"
+    assert combined[5].index == 5
+    assert combined[5].metadata["total_chunks"] == 3
+    combined.update_metadata({"title": "Changed"})
+    assert store[0].metadata["title"] == "Report"
+
+
+def test_arrays_and_pickle_round_trip(store):
+    rebuilt = ChunkStore.from_arrays(store.arrays(), store.documents)
+
+    assert list(rebuilt) == list(store)
+    assert rebuilt.buffer is store.buffer
+    assert list(pickle.loads(pickle.dumps(store))) == list(store)
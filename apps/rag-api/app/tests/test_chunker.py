@@ -0,0 +1,67 @@
+from app.services.chunker import Chunker
+import pytest
+import re
+
+
+class WordTokenizer:
+    """Tokenizer splitting on words and punctuation, with character offsets."""
+
+    def __call__(
+        self, text, add_special_tokens=False, return_offsets_mapping=False, **kwargs
+    ):
+        spans = [match.span() for match in re.finditer(r"\w+|[^\w\s]", text)]
+        return {"input_ids": list(range(len(spans))), "offset_mapping": spans}
+
+
+def test_offsets_map_back_to_source():
+    text = "First paragraph here.\n\nSecond one, a bit longer. It has two sentences."
+    chunker = Chunker(chunk_size=30, chunk_overlap=0)
+
+    spans = chunker.split(text)
+
+    assert [text[start:end] for start, end in spans] == chunker.split_text(text)
+    assert chunker.split_text(text) == [
+        "First paragraph here.",
+        "Second one, a bit longer.",
+        "It has two sentences.",
+    ]
+
+
+def test_prefers_coarsest_separator_that_fits():
+    text = "one two three\nfour five six seven eight"
+    assert (
+        Chunker(chunk_size=20, chunk_overlap=0).split_text(text)[0] == "one two three"
+    )
+
+
+def test_overlap_starts_on_a_separator():
+    text = " ".join(f"w{i}" for i in range(40))
+    chunks = Chunker(chunk_size=30, chunk_overlap=10).split_text(text)
+
+    assert all(len(chunk) <= 30 for chunk in chunks)
+    for first, second in zip(chunks, chunks[1:]):
+        assert first.split()[-1] in second.split()
+    assert {w for chunk in chunks for w in chunk.split()} == set(text.split())
+
+
+def test_hard_cut_without_separators():
+    chunks = Chunker(chunk_size=10, chunk_overlap=0).split_text("x" * 25)
+    assert chunks == ["x" * 10, "x" * 10, "x" * 5]
+
+
+def test_token_sizing():
+    tokenizer = WordTokenizer()
+    text = "Alpha beta, gamma delta. " * 30
+    chunks = Chunker(chunk_size=16, chunk_overlap=4, tokenizer=tokenizer).split_text(
+        text
+    )
+
+    assert len(chunks) > 1
+    assert all(len(tokenizer(chunk)["input_ids"]) <= 16 for chunk in chunks)
+    assert all(chunk.endswith(".") for chunk in chunks[:-1])
+
+
+def test_empty_and_invalid():
+    assert Chunker().split("   \n\n  ") == []
+    with pytest.raises(ValueError):
+        Chunker(chunk_size=10, chunk_overlap=10)
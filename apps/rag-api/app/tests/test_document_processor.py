@@ -1,6 +1,9 @@
 import pytest
 import numpy as np
-from rank_bm25 import BM25Okapi
+from unittest.mock import MagicMock, patch
+from app.services.bm25 import SparseBM25
+from app.services.chunker import Chunker
+from app.services.document_processor import DocumentProcessor, extract_text
 
 
 def test_extract_text_pdf(document_processor, sample_pdf_content):
@@ -52,10 +55,141 @@ def test_process_documents(document_processor, sample_pdf_content):
     assert isinstance(chunks[0].metadata, dict)
     assert isinstance(chunks[0].index, int)
     assert isinstance(embeddings, np.ndarray)
-    assert isinstance(bm25, BM25Okapi)
+    assert isinstance(bm25, SparseBM25)
     assert len(chunks) == embeddings.shape[0]
 
 
 def test_process_documents_no_chunks(document_processor):
     with pytest.raises(ValueError):
         document_processor.process_documents(b"", "application/pdf")
+
+
+def test_extract_text_pdf_joins_pages():
+    pages = [(1, "first page"), (2, "second page")]
+    with patch(
+        "app.services.document_processor.iter_pdf_pages",
+        return_value=({"/Title": "Spec"}, iter(pages)),
+    ):
+        text, metadata = extract_text(b"%PDF", "application/pdf")
+    assert text == "first page\nsecond page\n"
+    assert metadata == {"/Title": "Spec"}
+
+
+def test_iter_chunks_records_pages_and_overlap():
+    processor = DocumentProcessor.__new__(DocumentProcessor)
+    processor.chunker = Chunker(chunk_size=40, chunk_overlap=15, separators=[" "])
+    pages = [(n, " ".join(f"p{n}w{i}" for i in range(12))) for n in range(1, 4)]
+
+    chunks = list(processor.iter_chunks(iter(pages)))
+
+    assert {page for _, page in chunks} == {1, 2, 3}
+    assert all(len(content) <= 40 for content, _ in chunks)
+    # Every word survives and a chunk spans the page 1 / page 2 boundary
+    words = {word for content, _ in chunks for word in content.split()}
+    assert words == {word for _, text in pages for word in text.split()}
+    assert any("p1w11" in content and "p2w0" in content for content, _ in chunks)
+    # Consecutive chunks share their overlap
+    for (first, _), (second, _) in zip(chunks, chunks[1:]):
+        assert set(first.split()) & set(second.split())
+
+
+def test_process_documents_streams_pdf_pages(document_processor):
+    document_processor.embed_batch_size = 2
+    pages = [(n, f"Page {n} talks about topic {n}. " * 40) for n in range(1, 4)]
+    with patch(
+        "app.services.document_processor.iter_pdf_pages",
+        return_value=({"/Title": "Topics"}, iter(pages)),
+    ), patch.object(
+        document_processor.embedding_cache,
+        "encode",
+        wraps=document_processor.embedding_cache.encode,
+    ) as encode:
+        chunks, embeddings, bm25 = document_processor.process_documents(
+            b"%PDF", "application/pdf"
+        )
+
+    assert [chunk.metadata["page"] for chunk in chunks] == sorted(
+        chunk.metadata["page"] for chunk in chunks
+    )
+    assert {chunk.metadata["page"] for chunk in chunks} == {1, 2, 3}
+    assert all(chunk.metadata["total_chunks"] == len(chunks) for chunk in chunks)
+    # Document metadata is kept once, not copied into each chunk
+    assert chunks.documents == [{"/Title": "Topics"}]
+    assert chunks[len(chunks) - 1].metadata["/Title"] == "Topics"
+    assert all(len(call.args[2]) <= 2 for call in encode.call_args_list)
+    assert embeddings.shape[0] == len(chunks) == bm25.corpus_size
+
+
+def test_chunks_sized_in_model_tokens(document_processor):
+    tokenizer = document_processor.chunker.tokenizer
+    text = "Token aware chunking keeps every chunk within the model limit. " * 200
+
+    chunks = [content for content, _ in document_processor.iter_chunks([(None, text)])]
+
+    assert document_processor.chunk_unit == "tokens"
+    assert len(chunks) > 1
+    assert all(
+        len(tokenizer(chunk, add_special_tokens=False)["input_ids"])
+        <= document_processor.chunk_size
+        for chunk in chunks
+    )
+
+
+def test_chunk_size_capped_at_model_limit():
+    processor = DocumentProcessor(chunk_size=4096, chunk_overlap=64)
+    assert processor.chunk_size == processor.model.max_seq_length - 2
+
+
+def test_unknown_chunk_unit():
+    with pytest.raises(ValueError):
+        DocumentProcessor(chunk_unit="words")
+
+
+def test_process_documents_reuses_known_embeddings(document_processor):
+    def process(pages, reuse=None):
+        with patch(
+            "app.services.document_processor.iter_pdf_pages",
+            return_value=({}, iter(pages)),
+        ):
+            return document_processor.process_documents(
+                b"%PDF", "application/pdf", reuse
+            )
+
+    old_pages = [(n, f"Page {n} talks about topic {n}. " * 40) for n in range(1, 4)]
+    old_chunks, old_embeddings, _ = process(old_pages)
+    reuse = dict(zip(old_chunks.texts(), old_embeddings))
+    new_pages = old_pages[:2] + [(3, "An entirely rewritten last page. " * 40)]
+
+    with patch.object(
+        document_processor.embedding_cache,
+        "encode",
+        wraps=document_processor.embedding_cache.encode,
+    ) as encode:
+        chunks, embeddings, _ = process(new_pages, reuse)
+
+    encoded = [text for call in encode.call_args_list for text in call.args[2]]
+    assert encoded and all(text not in reuse for text in encoded)
+    assert len(encoded) < len(chunks)
+    for text, vector in zip(chunks.texts(), embeddings):
+        if text in reuse:
+            np.testing.assert_array_equal(vector, reuse[text])
+
+
+def test_only_html_is_extracted_in_process_pool(document_processor):
+    executor = MagicMock(process_workers=2)
+    executor.submit_process.return_value.result.return_value = (
+        "Parsed page text. " * 20,
+        {"title": "Page"},
+    )
+    document_processor.executor = executor
+    text = "Plain text is decoded inline. " * 20
+
+    chunks, _, _ = document_processor.process_documents(text.encode(), "text/plain")
+    assert chunks[0].content.startswith("Plain text")
+    executor.submit_process.assert_not_called()
+
+    chunks, _, _ = document_processor.process_documents(b"<html>", "text/html")
+    assert chunks.documents == [{"title": "Page"}]
+    executor.submit_process.assert_called_once_with(
+        extract_text, b"<html>", "text/html"
+    )
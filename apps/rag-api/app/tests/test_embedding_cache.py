@@ -0,0 +1,70 @@
+import pytest
+import numpy as np
+from app.services.cache import LRUCache, SQLiteCache
+from app.services.embedding_cache import EmbeddingCache
+
+
+class CountingModel:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, normalize_embeddings=False):
+        self.encoded.extend(texts)
+        return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def model():
+    return CountingModel()
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_items=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+
+def test_sqlite_cache_roundtrip(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    cache.set_many([("a", b"1"), ("b", b"2")])
+    assert cache.get_many(["a", "b", "c"]) == {"a": b"1", "b": b"2"}
+    cache.clear()
+    assert cache.get("a") is None
+
+
+def test_key_normalizes_whitespace_and_includes_model():
+    assert EmbeddingCache.key("m", "hello  world\n") == EmbeddingCache.key(
+        "m", "hello world"
+    )
+    assert EmbeddingCache.key("m", "hello") != EmbeddingCache.key("other", "hello")
+
+
+def test_only_misses_reach_encoder(model):
+    cache = EmbeddingCache(path=None)
+    first = cache.encode(model, "m", ["alpha", "beta", "alpha"])
+    second = cache.encode(model, "m", ["beta", "gamma"])
+
+    assert model.encoded == ["alpha", "beta", "gamma"]
+    assert first.shape == (3, 2)
+    np.testing.assert_array_equal(first[1], second[0])
+    stats = cache.stats()
+    assert stats["misses"] == 3
+    assert stats["memory_hits"] == 1
+
+
+def test_disk_tier_survives_new_cache(tmp_path, model):
+    path = str(tmp_path / "embeddings.sqlite3")
+    EmbeddingCache(path=path).encode(model, "m", ["alpha", "beta"])
+
+    cache = EmbeddingCache(path=path)
+    embeddings = cache.encode(model, "m", ["alpha", "beta"])
+
+    assert model.encoded == ["alpha", "beta"]
+    assert embeddings.shape == (2, 2)
+    assert cache.stats()["disk_hits"] == 2
+    assert cache.stats()["hit_rate"] == 1.0
@@ -0,0 +1,52 @@
+from app.core.executor import Executor
+import asyncio
+import contextvars
+import pytest
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+def _square(x):
+    return x * x
+
+
+def _fail():
+    raise ValueError("boom")
+
+
+@pytest.fixture
+def executor():
+    executor = Executor(thread_workers=2, process_workers=0)
+    yield executor
+    executor.shutdown()
+
+
+def test_run_in_thread_returns_result(executor):
+    assert asyncio.run(executor.run_in_thread(_square, 7)) == 49
+
+
+def test_thread_tasks_see_caller_context(executor):
+    async def run():
+        request_id.set("abc")
+        return await executor.run_in_thread(request_id.get)
+
+    assert asyncio.run(run()) == "abc"
+
+
+def test_exceptions_propagate_and_are_counted(executor):
+    with pytest.raises(ValueError, match="boom"):
+        executor.submit_thread(_fail).result()
+
+    stats = executor.stats()["threads"]
+    assert stats["submitted"] == 1
+    assert stats["completed"] == 1
+    assert stats["failed"] == 1
+    assert stats["in_flight"] == 0
+
+
+def test_process_work_falls_back_to_threads(executor):
+    assert executor.submit_process(_square, 3).result() == 9
+
+    stats = executor.stats()
+    assert stats["threads"]["completed"] == 1
+    assert stats["processes"]["submitted"] == 0
@@ -0,0 +1,66 @@
+from app.services.fusion import Fusion, min_max, reciprocal_ranks
+import numpy as np
+import pytest
+
+SEMANTIC = (np.array([3, 1, 2]), np.array([0.9, 0.5, 0.1]))
+LEXICAL = (np.array([2, 3, 7]), np.array([12.0, 4.0, 1.0]))
+
+
+def test_min_max():
+    assert min_max(np.array([2.0, 4.0, 3.0])).tolist() == [0.0, 1.0, 0.5]
+    assert min_max(np.array([5.0, 5.0])).tolist() == [1.0, 1.0]
+    assert len(min_max(np.array([]))) == 0
+
+
+def test_reciprocal_ranks_follow_scores_not_input_order():
+    ranks = reciprocal_ranks(np.array([0.1, 0.9, 0.5]), k=60)
+    assert ranks.tolist() == pytest.approx([1 / 63, 1 / 61, 1 / 62])
+
+
+def test_rrf():
+    ids, scores = Fusion("rrf", rrf_k=60).fuse([SEMANTIC, LEXICAL])
+    expected = {
+        3: 1 / 61 + 1 / 62,
+        2: 1 / 63 + 1 / 61,
+        1: 1 / 62,
+        7: 1 / 63,
+    }
+    assert ids.tolist() == [3, 2, 1, 7]
+    assert scores.tolist() == pytest.approx([expected[i] for i in ids.tolist()])
+
+
+def test_combsum_and_combmnz():
+    # Normalized: semantic 3 -> 1.0, 1 -> 0.5, 2 -> 0.0; lexical 2 -> 1.0, 3 -> 3/11, 7 -> 0.0
+    ids, scores = Fusion("combsum").fuse([SEMANTIC, LEXICAL])
+    assert dict(zip(ids.tolist(), scores.tolist())) == pytest.approx(
+        {3: 1 + 3 / 11, 2: 1.0, 1: 0.5, 7: 0.0}
+    )
+
+    ids, scores = Fusion("combmnz").fuse([SEMANTIC, LEXICAL])
+    assert dict(zip(ids.tolist(), scores.tolist())) == pytest.approx(
+        {3: 2 * (1 + 3 / 11), 2: 2.0, 1: 0.5, 7: 0.0}
+    )
+
+
+def test_weighted_min_max():
+    ids, scores = Fusion("minmax", weights=(0.8, 0.2)).fuse([SEMANTIC, LEXICAL])
+    assert ids[0] == 3
+    assert dict(zip(ids.tolist(), scores.tolist()))[2] == pytest.approx(0.2)
+    assert scores.max() <= 1.0
+
+
+def test_top_k_and_empty_lists():
+    ids, scores = Fusion().fuse([SEMANTIC, LEXICAL], top_k=2)
+    assert len(ids) == len(scores) == 2
+
+    empty = (np.array([], dtype=np.int64), np.array([]))
+    ids, _ = Fusion().fuse([SEMANTIC, empty])
+    assert ids.tolist() == [3, 1, 2]
+    assert len(Fusion().fuse([empty, empty])[0]) == 0
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        Fusion("borda")
+    with pytest.raises(ValueError):
+        Fusion(weights=(1.0,)).fuse([SEMANTIC, LEXICAL])
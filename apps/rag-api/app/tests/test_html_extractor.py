@@ -0,0 +1,51 @@
+from app.services.html_extractor import HtmlContent, extract_html
+from benchmarks.data import synthetic_html
+import pytest
+
+PAGE = """<!DOCTYPE html>
+<html>
+  <head>
+    <title> Guide </title>
+    <meta name="description" content="How to guide">
+    <style>p { color: red }</style>
+  </head>
+  <body>
+    <nav><a href="/">Home</a></nav>
+    <!-- tracking -->
+    <p>First &amp; second</p>
+    <p>Third<script>var x = 1;</script> tail</p>
+    <footer>Copyright</footer>
+  </body>
+</html>
+"""
+
+
+@pytest.mark.parametrize("backend", ["lxml", "soup"])
+def test_extracts_title_description_and_text(backend):
+    page = extract_html(PAGE, backend=backend)
+    assert page == HtmlContent(
+        title="Guide",
+        description="How to guide",
+        text="Guide\nFirst & second\nThird\ntail",
+    )
+
+
+def test_backends_agree_on_synthetic_pages():
+    for seed in range(5):
+        html = synthetic_html(20, seed=seed)
+        assert extract_html(html, separator=" ") == extract_html(
+            html, separator=" ", backend="soup"
+        )
+
+
+def test_bytes_and_empty_documents():
+    assert extract_html(PAGE.encode()).text == extract_html(PAGE).text
+    assert extract_html("") == HtmlContent(title=None, description=None, text="")
+    page = extract_html("<p>No head</p>")
+    assert page.title is None and page.description is None
+    assert page.text == "No head"
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        extract_html(PAGE, backend="regex")
@@ -0,0 +1,327 @@
+import json
+import os
+import pytest
+import threading
+import numpy as np
+from app.services.bm25 import SparseBM25
+from app.services.chunk_store import ChunkStoreBuilder
+from app.services.document_processor import Chunk
+from app.services.index_store import IndexStore
+
+
+@pytest.fixture
+def collection():
+    texts = ["the quick brown fox", "jumps over the lazy dog", "hello world"]
+    chunks = [
+        Chunk(content=text, metadata={"chunk_index": i, "total_chunks": 3}, index=i)
+        for i, text in enumerate(texts)
+    ]
+    embeddings = np.random.rand(3, 8).astype(np.float32)
+    bm25 = SparseBM25([text.split() for text in texts])
+    return chunks, embeddings, bm25
+
+
+def test_collection_id_is_deterministic():
+    first = IndexStore.collection_id(b"content", "text/plain", "model", 500, 50)
+    second = IndexStore.collection_id(b"content", "text/plain", "model", 500, 50)
+    other = IndexStore.collection_id(b"content", "text/plain", "model", 400, 50)
+    assert first == second
+    assert first != other
+
+
+def test_save_and_load_roundtrip(tmp_path, collection):
+    chunks, embeddings, bm25 = collection
+    IndexStore(str(tmp_path)).save("abc123", chunks, embeddings, bm25, {"model": "m"})
+
+    # A fresh store simulates a process restart
+    loaded_chunks, loaded_embeddings, loaded_bm25 = IndexStore(str(tmp_path)).load(
+        "abc123"
+    )
+    assert [c.content for c in loaded_chunks] == [c.content for c in chunks]
+    # Chunks are tagged with the id of their document within the collection
+    assert loaded_chunks[1].metadata == {
+        **chunks[1].metadata,
+        "document_id": "document",
+    }
+    np.testing.assert_array_equal(loaded_embeddings.embeddings, embeddings)
+    assert loaded_embeddings.memory_bytes == 0
+    query = ["lazy", "dog"]
+    np.testing.assert_allclose(loaded_bm25.get_scores(query), bm25.get_scores(query))
+
+
+def test_info_and_list(tmp_path, collection):
+    store = IndexStore(str(tmp_path))
+    store.save("abc123", *collection, metadata={"filename": "doc.txt"})
+    info = store.info("abc123")
+    assert info["chunk_count"] == 3
+    assert info["embedding_dim"] == 8
+    assert info["filename"] == "doc.txt"
+    assert [c["collection_id"] for c in store.list()] == ["abc123"]
+
+
+def test_delete(tmp_path, collection):
+    store = IndexStore(str(tmp_path))
+    store.save("abc123", *collection)
+    store.load("abc123")
+    store.delete("abc123")
+    assert not store.exists("abc123")
+    with pytest.raises(KeyError):
+        store.load("abc123")
+
+
+def test_outdated_collections_can_be_read_and_deleted(tmp_path, collection):
+    store = IndexStore(str(tmp_path))
+    store.save("abc123", *collection)
+    manifest_path = os.path.join(str(tmp_path), "abc123", "manifest.json")
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    manifest["format_version"] = 1
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f)
+
+    assert not store.exists("abc123")
+    assert store.info("abc123")["format_version"] == 1
+    assert [c["collection_id"] for c in store.list()] == ["abc123"]
+    with pytest.raises(ValueError, match="format version 1"):
+        store.load("abc123")
+    with pytest.raises(ValueError, match="format version 1"):
+        store.upsert_document("abc123", "b", *document(["two fish"]))
+    store.delete("abc123")
+    assert not os.path.exists(os.path.join(str(tmp_path), "abc123"))
+
+
+def test_missing_collection(tmp_path):
+    store = IndexStore(str(tmp_path))
+    with pytest.raises(KeyError):
+        store.load("missing")
+    with pytest.raises(KeyError):
+        store.info("../escape")
+
+
+def test_loaded_collections_are_bounded(tmp_path, collection):
+    store = IndexStore(str(tmp_path), max_loaded=1)
+    store.save("first", *collection)
+    store.save("second", *collection)
+    store.load("first")
+    store.load("second")
+    assert list(store._loaded) == ["second"]
+
+
+def document(texts, dim=8, seed=0):
+    builder = ChunkStoreBuilder()
+    doc_id = builder.add_document({})
+    for text in texts:
+        builder.add(text, doc_id)
+    rng = np.random.default_rng(seed)
+    embeddings = rng.random((len(texts), dim)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return builder.build(), embeddings, SparseBM25([text.split() for text in texts])
+
+
+def live_contents(chunks, bm25, query):
+    scores = bm25.get_scores(query)
+    return {chunks[i].content: scores[i] for i in np.flatnonzero(scores)}
+
+
+def test_upsert_and_delete_documents_without_rebuilding(tmp_path):
+    store = IndexStore(str(tmp_path))
+    store.save(
+        "abc", *document(["the quick brown fox", "lazy dogs sleep"]), document_id="a"
+    )
+    store.upsert_document("abc", "b", *document(["a quick red fox"], seed=1))
+    # Merge so that one segment holds both documents
+    merged = store.merge("abc")["segments"][0]["name"]
+    first = os.path.join(str(tmp_path), "abc", "segments", merged, "embeddings.npy")
+    mtime = os.path.getmtime(first)
+
+    manifest = store.upsert_document(
+        "abc", "a", *document(["the quick brown fox", "cats sleep"], seed=2)
+    )
+    # Stored segments are never rewritten; the old version of "a" is deleted
+    assert os.path.getmtime(first) == mtime
+    assert manifest["segments"] == [
+        {
+            "name": merged,
+            "chunk_count": 3,
+            "deleted_count": 2,
+            "deletes": manifest["segments"][0]["deletes"],
+        },
+        {"name": "000002", "chunk_count": 2, "deleted_count": 0, "deletes": None},
+    ]
+    assert manifest["chunk_count"] == 3
+    assert manifest["documents"]["a"]["segment"] == "000002"
+
+    chunks, embeddings, bm25 = store.load("abc")
+    assert len(chunks) == 5
+    assert sorted(live_contents(chunks, bm25, ["quick", "sleep"])) == [
+        "a quick red fox",
+        "cats sleep",
+        "the quick brown fox",
+    ]
+    deleted = {i for i in range(3) if chunks[i].metadata["document_id"] == "a"}
+    hits = embeddings.search(np.asarray(embeddings.indexes[0].embeddings), 5)
+    assert all(len(row) == 3 for row in hits)
+    assert not {i for row in hits for i, _ in row} & deleted
+
+    manifest = store.delete_document("abc", "b")
+    assert "b" not in manifest["documents"]
+    # A segment left without live chunks is removed right away
+    assert [entry["name"] for entry in manifest["segments"]] == ["000002"]
+    assert not os.path.exists(os.path.join(str(tmp_path), "abc", "segments", merged))
+    chunks, _, _ = store.load("abc")
+    assert [chunk.content for chunk in chunks] == ["the quick brown fox", "cats sleep"]
+    assert {chunk.metadata["document_id"] for chunk in chunks} == {"a"}
+
+    with pytest.raises(KeyError):
+        store.delete_document("abc", "b")
+    with pytest.raises(ValueError):
+        store.delete_document("abc", "a")
+
+
+def test_segmented_bm25_uses_collection_statistics(tmp_path):
+    texts = ["apple banana", "banana cherry", "cherry apple apple", "durian"]
+    store = IndexStore(str(tmp_path))
+    store.save("abc", *document(texts[:2]), document_id="a")
+    store.upsert_document("abc", "b", *document(texts[2:]))
+    store.upsert_document("abc", "c", *document(["banana banana split"]))
+    store.delete_document("abc", "c")
+
+    chunks, _, bm25 = store.load("abc")
+    expected = SparseBM25([text.split() for text in texts])
+    for query in (["apple"], ["banana", "durian"], ["split"]):
+        np.testing.assert_allclose(
+            bm25.get_scores(query), expected.get_scores(query), rtol=1e-6
+        )
+
+
+def test_merge_compacts_segments(tmp_path):
+    store = IndexStore(str(tmp_path), merge_max_segments=2)
+    store.save("abc", *document(["one fish", "two fish"]), document_id="a")
+    store.upsert_document("abc", "b", *document(["red fish"], seed=1))
+    manifest = store.upsert_document("abc", "a", *document(["blue fish"], seed=2))
+    assert not store.needs_merge(manifest)
+    before = store.load("abc")
+    manifest = store.upsert_document("abc", "c", *document(["old fish"], seed=3))
+    assert store.needs_merge(manifest)
+    generation = manifest["generation"]
+
+    manifest = store.merge("abc")
+    # The merge is committed once, so loaded collections are reloaded only once
+    assert manifest["generation"] == generation + 1
+    assert [entry["deleted_count"] for entry in manifest["segments"]] == [0]
+    assert manifest["chunk_count"] == 3
+    assert {entry["segment"] for entry in manifest["documents"].values()} == {
+        manifest["segments"][0]["name"]
+    }
+    segments = os.listdir(os.path.join(str(tmp_path), "abc", "segments"))
+    assert segments == [manifest["segments"][0]["name"]]
+
+    chunks, embeddings, bm25 = store.load("abc")
+    assert sorted(chunk.content for chunk in chunks) == [
+        "blue fish",
+        "old fish",
+        "red fish",
+    ]
+    assert isinstance(bm25, SparseBM25)
+    np.testing.assert_allclose(
+        bm25.get_scores(["fish", "red"]),
+        SparseBM25([chunk.content.split() for chunk in chunks]).get_scores(
+            ["fish", "red"]
+        ),
+        rtol=1e-6,
+    )
+    # Queries return the same chunks as before the merge
+    old_chunks, _, old_bm25 = before
+    assert live_contents(chunks, bm25, ["fish"]).keys() - {"old fish"} == (
+        live_contents(old_chunks, old_bm25, ["fish"]).keys()
+    )
+
+
+def test_merge_keeps_changes_made_while_merging(tmp_path):
+    store = IndexStore(str(tmp_path))
+    store.save("abc", *document(["one fish"]), document_id="a")
+    store.upsert_document("abc", "b", *document(["two fish"]))
+    write_segment = store._write_segment
+
+    def write_during_merge(*args):
+        write_segment(*args)
+        # Replace "b" after the merge read it but before the merge is committed
+        store._write_segment = write_segment
+        store.upsert_document("abc", "b", *document(["new fish"]))
+
+    store._write_segment = write_during_merge
+    manifest = store.merge("abc")
+
+    chunks, _, bm25 = store.load("abc")
+    assert sorted(live_contents(chunks, bm25, ["fish"])) == ["new fish", "one fish"]
+    assert manifest["chunk_count"] == 2
+
+
+def test_merge_requested_while_merging_runs_again(tmp_path):
+    store = IndexStore(str(tmp_path))
+    store.save("abc", *document(["one fish"]), document_id="a")
+    store.upsert_document("abc", "b", *document(["two fish"]))
+    write_segment = store._write_segment
+
+    def write_during_merge(*args):
+        write_segment(*args)
+        store._write_segment = write_segment
+        store.upsert_document("abc", "c", *document(["red fish"]))
+        # Returns at once without merging; the running merge picks it up
+        assert len(store.merge("abc")["segments"]) == 3
+
+    store._write_segment = write_during_merge
+    manifest = store.merge("abc")
+
+    assert [entry["deleted_count"] for entry in manifest["segments"]] == [0]
+    assert manifest["chunk_count"] == 3
+    assert store._merging == {}
+
+
+def test_document_embeddings(tmp_path):
+    chunks, embeddings, bm25 = document(["alpha", "beta"])
+    store = IndexStore(str(tmp_path))
+    store.save("abc", chunks, embeddings, bm25, document_id="a")
+
+    reuse = store.document_embeddings("abc", "a")
+    assert list(reuse) == ["alpha", "beta"]
+    np.testing.assert_array_equal(reuse["beta"], embeddings[1])
+    with pytest.raises(KeyError):
+        store.document_embeddings("abc", "missing")
+
+
+def test_load_picks_up_updates_from_other_processes(tmp_path):
+    reader = IndexStore(str(tmp_path))
+    writer = IndexStore(str(tmp_path))
+    writer.save("abc", *document(["one fish"]), document_id="a")
+    assert len(reader.load("abc")[0]) == 1
+
+    writer.upsert_document("abc", "b", *document(["two fish"]))
+    assert len(reader.load("abc")[0]) == 2
+
+
+def test_load_while_another_process_merges(tmp_path):
+    reader = IndexStore(str(tmp_path))
+    writer = IndexStore(str(tmp_path))
+    writer.save("abc", *document(["one fish"]), document_id="a")
+    writer.upsert_document("abc", "b", *document(["two fish"], seed=1))
+    read_manifest = reader.manifest
+    merge = threading.Thread(target=writer.merge, args=("abc",))
+
+    def merge_after_reading(collection_id):
+        manifest = read_manifest(collection_id)
+        # The merge removes the segments this manifest names once it commits;
+        # it has to wait until the reader has opened them
+        merge.start()
+        merge.join(0.5)
+        return manifest
+
+    reader.manifest = merge_after_reading
+    chunks, _, bm25 = reader.load("abc")
+    merge.join()
+    assert sorted(live_contents(chunks, bm25, ["fish"])) == ["one fish", "two fish"]
+
+    reader.manifest = read_manifest
+    chunks, _, bm25 = reader.load("abc")
+    assert len(reader._loaded["abc"][1]) == 1
+    assert sorted(live_contents(chunks, bm25, ["fish"])) == ["one fish", "two fish"]
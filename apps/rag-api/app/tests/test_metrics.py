@@ -0,0 +1,90 @@
+from app.core.executor import Executor
+from app.core.metrics import (
+    Histogram,
+    MetricsRegistry,
+    StageTimer,
+    current_timings,
+    record_stage,
+    request_timings,
+)
+import asyncio
+import pytest
+import time
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_seconds", "Test latency", buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    assert histogram.render() == [
+        "# HELP test_seconds Test latency",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{le="0.1"} 1',
+        'test_seconds_bucket{le="1"} 2',
+        'test_seconds_bucket{le="+Inf"} 3',
+        "test_seconds_sum 5.55",
+        "test_seconds_count 3",
+    ]
+
+
+def test_histogram_keeps_one_series_per_label_set():
+    histogram = Histogram("test_size", "Batch size", (1, 8), labelnames=("batch",))
+    histogram.observe(4, batch="encode")
+    histogram.observe(1, batch='say "hi"')
+
+    lines = histogram.render()
+
+    assert 'test_size_bucket{batch="encode",le="8"} 1' in lines
+    assert 'test_size_count{batch="say \\"hi\\""} 1' in lines
+    with pytest.raises(ValueError):
+        histogram.observe(1)
+
+
+def test_registry_returns_registered_histogram():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("test_seconds", "Test latency")
+
+    assert registry.histogram("test_seconds", "Test latency") is histogram
+    assert registry.render().endswith("test_seconds histogram\n")
+
+
+def test_stage_timer_charges_nested_stages_exclusively():
+    timer = StageTimer()
+
+    def pages():
+        time.sleep(0.02)
+        yield "page"
+
+    with timer.stage("outer"):
+        for _ in timer.iterate("extract", pages()):
+            with timer.stage("embed"):
+                time.sleep(0.02)
+
+    assert set(timer.seconds) == {"outer", "extract", "embed"}
+    assert timer.seconds["extract"] >= 0.02
+    assert timer.seconds["embed"] >= 0.02
+    assert timer.seconds["outer"] < 0.02
+
+
+def test_request_timings_follow_executor_threads():
+    executor = Executor(thread_workers=2, process_workers=0)
+
+    async def run():
+        with request_timings() as timings:
+            await executor.run_in_thread(record_stage, "embed", 0.5)
+            await executor.run_in_thread(record_stage, "embed", 0.25)
+            record_stage("fusion", 0.1)
+        return timings.as_dict()
+
+    try:
+        assert asyncio.run(run()) == {"embed": 0.75, "fusion": 0.1}
+    finally:
+        executor.shutdown()
+
+
+def test_stages_outside_a_request_are_not_collected():
+    record_stage("embed", 0.5)
+
+    assert current_timings().as_dict() == {}
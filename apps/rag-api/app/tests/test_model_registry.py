@@ -0,0 +1,73 @@
+from unittest.mock import patch
+from app.services.model_registry import ModelRegistry
+
+
+def test_embedding_model_loaded_once():
+    registry = ModelRegistry()
+    with patch("sentence_transformers.SentenceTransformer") as mock_model:
+        first = registry.get_embedding_model("test-model")
+        second = registry.get_embedding_model("test-model")
+
+    assert first is second
+    mock_model.assert_called_once_with("test-model")
+
+
+def test_cross_encoder_loaded_once():
+    registry = ModelRegistry()
+    with patch("sentence_transformers.CrossEncoder") as mock_model:
+        first = registry.get_cross_encoder("test-reranker")
+        second = registry.get_cross_encoder("test-reranker")
+
+    assert first is second
+    assert mock_model.call_count == 1
+
+
+def test_stats_reports_each_model():
+    registry = ModelRegistry()
+    with patch("sentence_transformers.SentenceTransformer"), patch(
+        "sentence_transformers.CrossEncoder"
+    ):
+        registry.warm_up(embedding_models=["embed"], cross_encoders=["rerank"])
+
+    stats = registry.stats()
+    assert {(s["kind"], s["name"]) for s in stats} == {
+        ("embedding", "embed"),
+        ("cross_encoder", "rerank"),
+    }
+    assert all(s["load_seconds"] >= 0 for s in stats)
+    assert all(isinstance(s["memory_bytes"], int) for s in stats)
+
+
+def test_clear_forces_reload():
+    registry = ModelRegistry()
+    with patch("sentence_transformers.SentenceTransformer") as mock_model:
+        registry.get_embedding_model("test-model")
+        registry.clear()
+        registry.get_embedding_model("test-model")
+
+    assert mock_model.call_count == 2
+
+
+def test_batchers_shared_per_model():
+    registry = ModelRegistry()
+    with patch("sentence_transformers.SentenceTransformer") as mock_model:
+        mock_model.return_value.encode.side_effect = lambda texts, **kwargs: [
+            [len(text)] for text in texts
+        ]
+        first = registry.get_encode_batcher("embed")
+        second = registry.get_encode_batcher("embed")
+        assert first is second
+        assert first(["a", "abc"]) == [[1], [3]]
+
+    assert [s["name"] for s in registry.batch_stats()] == ["encode:embed"]
+
+
+def test_registered_model_is_served_without_loading():
+    registry = ModelRegistry()
+    model = object()
+    with patch("sentence_transformers.SentenceTransformer") as mock_model:
+        registry.register(ModelRegistry.EMBEDDING, "local", model)
+        assert registry.get_embedding_model("local") is model
+
+    mock_model.assert_not_called()
+    assert registry.stats()[0]["name"] == "local"
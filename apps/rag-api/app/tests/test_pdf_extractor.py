@@ -0,0 +1,59 @@
+import pytest
+from app.core.executor import Executor
+from app.services.pdf_extractor import (
+    extract_page_range,
+    iter_pdf_pages,
+    iter_pdf_pages_parallel,
+)
+from benchmarks.data import synthetic_pdf
+
+
+@pytest.fixture
+def executor():
+    # Threads exercise the shared memory path without spawning processes
+    executor = Executor(thread_workers=2, process_workers=0)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.fixture
+def pdf_content():
+    return synthetic_pdf(7, lines_per_page=3)
+
+
+def test_iter_pdf_pages_numbers_pages(pdf_content):
+    _, pages = iter_pdf_pages(pdf_content)
+    pages = list(pages)
+    assert [number for number, _ in pages] == list(range(1, 8))
+    assert all(text.strip() for _, text in pages)
+
+
+def test_parallel_matches_serial(pdf_content, executor):
+    _, serial = iter_pdf_pages(pdf_content)
+    _, parallel = iter_pdf_pages_parallel(
+        pdf_content, executor, workers=2, pages_per_task=3, min_pages=0
+    )
+    assert list(parallel) == list(serial)
+    assert executor.stats()["threads"]["submitted"] == 3
+
+
+def test_small_documents_stay_serial(pdf_content, executor):
+    _, pages = iter_pdf_pages_parallel(pdf_content, executor, workers=2, min_pages=100)
+    assert len(list(pages)) == 7
+    assert executor.stats()["threads"]["submitted"] == 0
+
+
+def test_shared_memory_released(pdf_content, executor):
+    _, pages = iter_pdf_pages_parallel(
+        pdf_content, executor, workers=2, pages_per_task=1, min_pages=0
+    )
+    next(pages)
+    shm_name = pages.gi_frame.f_locals["shm"].name
+    pages.close()
+    with pytest.raises(FileNotFoundError):
+        extract_page_range(shm_name, len(pdf_content), 0, 1)
+
+
+def test_invalid_pdf_raises_value_error(executor):
+    with pytest.raises(ValueError):
+        iter_pdf_pages_parallel(b"not a pdf", executor, min_pages=0)
@@ -0,0 +1,140 @@
+import pytest
+import torch
+from unittest.mock import patch
+from app.services.document_processor import Chunk
+from app.services.batcher import MicroBatcher
+from app.services.reranker import Reranker, RerankPolicy
+
+
+class OverlapModel:
+    """Scores a pair by the number of shared words."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, pairs, convert_to_tensor=False):
+        self.calls += 1
+        scores = [
+            float(len(set(query.split()) & set(text.split()))) for query, text in pairs
+        ]
+        return torch.tensor(scores)
+
+
+@pytest.fixture
+def reranker():
+    with patch("app.services.reranker.model_registry") as registry:
+        registry.get_cross_encoder.return_value = OverlapModel()
+        yield Reranker(tokenizer=None)
+
+
+class WordTokenizer:
+    """Splits on whitespace, one token per word."""
+
+    def encode_ordinary(self, text):
+        return text.split()
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+def make_reranker(policy, model=None):
+    with patch("app.services.reranker.model_registry") as registry:
+        registry.get_cross_encoder.return_value = model or OverlapModel()
+        return Reranker(tokenizer=WordTokenizer(), policy=policy)
+
+
+@pytest.fixture
+def chunks():
+    texts = ["red apple pie", "green apple", "blue sky"]
+    return [Chunk(content=text, metadata={}, index=i) for i, text in enumerate(texts)]
+
+
+def test_rerank_sorts_by_score(reranker, chunks):
+    results = reranker.rerank("red apple", chunks)
+    assert [r["chunk"].index for r in results] == [0, 1, 2]
+    assert results[0]["score"] == 2.0
+
+
+def test_rerank_many_single_model_call(reranker, chunks):
+    results = reranker.rerank_many(["blue sky", "green apple"], [chunks, chunks[:2]])
+    assert reranker.model.calls == 1
+    assert [r["chunk"].index for r in results[0]][0] == 2
+    assert [r["chunk"].index for r in results[1]] == [1, 0]
+
+
+def test_rerank_many_matches_rerank(reranker, chunks):
+    queries = ["red apple", "sky"]
+    batch = reranker.rerank_many(queries, [chunks, chunks])
+    for query, results in zip(queries, batch):
+        assert results == reranker.rerank(query, chunks)
+
+
+def test_batched_rerank_matches_direct(chunks):
+    model = OverlapModel()
+    batcher = MicroBatcher(
+        lambda pairs: model.predict(pairs, convert_to_tensor=True).tolist()
+    )
+    with patch("app.services.reranker.model_registry") as registry:
+        registry.get_cross_encoder.return_value = model
+        registry.get_rerank_batcher.return_value = batcher
+        batched = Reranker(tokenizer=None, batched=True)
+        direct = Reranker(tokenizer=None)
+
+    assert batched.rerank("red apple", chunks) == direct.rerank("red apple", chunks)
+    assert batcher.stats()["batches"] == 1
+
+
+def test_max_candidates_caps_scored_pairs(chunks):
+    reranker = make_reranker(RerankPolicy(max_candidates=2))
+    results = reranker.rerank("blue sky", chunks, [0.3, 0.2, 0.1])
+    assert [r["chunk"].index for r in results] == [0, 1]
+
+
+def test_max_tokens_truncates_chunk_text(chunks):
+    seen = []
+
+    class RecordingModel(OverlapModel):
+        def predict(self, pairs, convert_to_tensor=False):
+            seen.extend(pairs)
+            return super().predict(pairs, convert_to_tensor)
+
+    reranker = make_reranker(RerankPolicy(max_tokens=4), RecordingModel())
+    results = reranker.rerank("red apple", chunks)
+    assert seen[0] == ["red apple", "red apple"]
+    assert results[0]["score"] == 2.0
+
+
+def test_decisive_margin_skips_cross_encoder(chunks):
+    reranker = make_reranker(RerankPolicy(skip_margin=0.5))
+    results = reranker.rerank("blue sky", chunks, [0.9, 0.3, 0.2])
+    assert reranker.model.calls == 0
+    assert [r["chunk"].index for r in results] == [0, 1, 2]
+    assert results[0]["score"] == 0.9
+
+    results = reranker.rerank("blue sky", chunks, [0.9, 0.8, 0.2])
+    assert reranker.model.calls == 1
+    assert results[0]["chunk"].index == 2
+
+
+def test_rerank_many_scores_only_undecided_queries(chunks):
+    reranker = make_reranker(RerankPolicy(skip_margin=0.5))
+    results = reranker.rerank_many(
+        ["blue sky", "blue sky"], [chunks, chunks], [[0.9, 0.1, 0.1], [0.5, 0.5, 0.5]]
+    )
+    assert reranker.model.calls == 1
+    assert results[0][0]["chunk"].index == 0
+    assert results[1][0]["chunk"].index == 2
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        RerankPolicy(max_candidates=0)
+    with pytest.raises(ValueError):
+        RerankPolicy(skip_margin=1.5)
+
+
+def test_policy_for_endpoint():
+    policies = {"default": {"max_candidates": 5}, "search": {"skip_margin": 0.2}}
+    with patch("app.services.reranker.RERANK_POLICIES", policies):
+        assert RerankPolicy.for_endpoint("search") == RerankPolicy(skip_margin=0.2)
+        assert RerankPolicy.for_endpoint("retrieve") == RerankPolicy(max_candidates=5)
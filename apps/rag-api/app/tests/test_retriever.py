@@ -1,3 +1,8 @@
+from unittest.mock import MagicMock, patch
+from app.services.analyzer import default_analyzer
+from app.services.bm25 import SparseBM25
+from app.services.retriever import Retriever
+import numpy as np
 import pytest
 
 
@@ -27,26 +32,68 @@ def test_retrieve_missing_args(
 
 def test_semantic_search(retriever, sample_embeddings):
     query = "sample query"
-    results = retriever._semantic_search(query, sample_embeddings, top_k=2)
-    assert isinstance(results, list)
-    assert all(isinstance(result, tuple) and len(result) == 2 for result in results)
-    assert len(results) <= 2
+    ids, scores = retriever._semantic_search(query, sample_embeddings, top_k=2)
+    assert isinstance(ids, np.ndarray) and isinstance(scores, np.ndarray)
+    assert len(ids) == len(scores) <= 2
+    assert list(scores) == sorted(scores, reverse=True)
 
 
 def test_bm25_search(retriever, sample_bm25):
     query = "sample query"
-    results = retriever._bm25_search(query, sample_bm25, top_k=2)
-    assert isinstance(results, list)
-    assert all(isinstance(result, tuple) and len(result) == 2 for result in results)
-    assert len(results) <= 2
+    ids, scores = retriever._bm25_search(query, sample_bm25, top_k=2)
+    assert isinstance(ids, np.ndarray) and isinstance(scores, np.ndarray)
+    assert len(ids) == len(scores) <= 2
+    assert list(scores) == sorted(scores, reverse=True)
+
+
+def test_bm25_search_skips_chunks_without_query_terms(retriever, sample_bm25):
+    ids, scores = retriever._bm25_search("zzzz", sample_bm25, top_k=2)
+    assert len(ids) == 0 and len(scores) == 0
 
 
 def test_rank_fusion(retriever):
-    semantic_results = [(0, 0.9), (1, 0.8)]
-    bm25_results = [(0, 0.7), (1, 0.6)]
-    fused_results = retriever._rank_fusion(semantic_results, bm25_results)
-    assert isinstance(fused_results, list)
-    assert all(
-        isinstance(result, tuple) and len(result) == 2 for result in fused_results
+    semantic_results = (np.array([0, 1]), np.array([0.9, 0.8]))
+    bm25_results = (np.array([1, 2]), np.array([0.7, 0.6]))
+    ids, scores = retriever._rank_fusion(semantic_results, bm25_results)
+    assert sorted(ids.tolist()) == [0, 1, 2]
+    assert ids[0] == 1
+    assert list(scores) == sorted(scores, reverse=True)
+
+
+def test_candidate_depth_reaches_past_top_k():
+    chunks = [f"chunk number {i}" for i in range(5)]
+    embeddings = np.eye(5)
+    bm25 = SparseBM25(default_analyzer.analyze_many(chunks))
+    retriever = Retriever(MagicMock(), semantic_candidates=3, lexical_candidates=10)
+    retriever.model.encode.return_value = embeddings[:1]
+
+    with patch.object(retriever.fusion, "fuse", wraps=retriever.fusion.fuse) as fuse:
+        results = retriever.retrieve("chunk", chunks, embeddings, bm25, top_k=1)
+
+    semantic, lexical = fuse.call_args.args[0]
+    assert len(semantic[0]) == 3
+    assert len(lexical[0]) == 5
+    assert results[0]["chunk"] == "chunk number 0"
+
+
+def test_retrieve_many_matches_retrieve(
+    retriever, sample_chunks, sample_embeddings, sample_bm25
+):
+    queries = ["sample query", "another chunk", "unrelated"]
+    batch = retriever.retrieve_many(
+        queries, sample_chunks, sample_embeddings, sample_bm25, top_k=2
     )
-    assert fused_results == sorted(fused_results, key=lambda x: x[1], reverse=True)
+    assert len(batch) == len(queries)
+    for query, results in zip(queries, batch):
+        single = retriever.retrieve(
+            query, sample_chunks, sample_embeddings, sample_bm25, top_k=2
+        )
+        assert sorted(r["chunk"] for r in results) == sorted(r["chunk"] for r in single)
+        assert sorted(r["score"] for r in results) == pytest.approx(
+            sorted(r["score"] for r in single)
+        )
+
+
+def test_retrieve_many_empty(retriever, sample_chunks, sample_embeddings, sample_bm25):
+    results = retriever.retrieve_many([], sample_chunks, sample_embeddings, sample_bm25)
+    assert results == []
@@ -0,0 +1,106 @@
+import json
+import os
+import pytest
+import numpy as np
+from unittest.mock import patch
+from app.services.bm25 import SparseBM25
+from app.services.chunk_store import ChunkStoreBuilder
+from app.services.segment import Segment
+from app.services.vector_index import create_vector_index, resident_bytes
+
+
+@pytest.fixture
+def parts():
+    texts = ["the quick brown fox", "jumps over the lazy dog", "hello world"]
+    builder = ChunkStoreBuilder()
+    doc_id = builder.add_document({"title": "Report"})
+    for page, text in enumerate(texts, start=1):
+        builder.add(text, doc_id, page=page)
+    embeddings = np.random.rand(3, 8).astype(np.float32)
+    bm25 = SparseBM25([text.split() for text in texts], variant="plus", k1=1.2)
+    return builder.build(), embeddings, bm25
+
+
+def test_write_and_open_round_trip(tmp_path, parts):
+    chunks, embeddings, bm25 = parts
+    path = str(tmp_path / "segment")
+    manifest = Segment.write(path, chunks, embeddings, bm25, {"name": "000000"})
+
+    segment = Segment.open(path)
+    assert manifest["chunk_count"] == len(segment) == 3
+    assert segment.manifest["name"] == "000000"
+    assert list(segment.chunks) == list(chunks)
+    np.testing.assert_array_equal(segment.embeddings, embeddings)
+    for query in (["lazy", "dog"], ["quick", "missing"], []):
+        np.testing.assert_allclose(
+            segment.bm25.get_scores(query), bm25.get_scores(query)
+        )
+
+
+def test_open_memory_maps_arrays(tmp_path, parts):
+    path = str(tmp_path / "segment")
+    Segment.write(path, *parts)
+
+    segment = Segment.open(path)
+    assert isinstance(segment.embeddings, np.memmap)
+    assert isinstance(segment.chunks.buffer, np.memmap)
+    assert resident_bytes(segment.embeddings) == 0
+    # Weights are read from disk, not recomputed into private memory
+    assert resident_bytes(segment.bm25.weights.data) == 0
+
+    copied = Segment.open(path, mmap_mode=None)
+    assert not isinstance(copied.embeddings, np.memmap)
+    assert list(copied.chunks) == list(segment.chunks)
+
+
+@pytest.mark.parametrize(
+    "kind, params",
+    [("ivf", {"n_lists": 2, "n_probe": 1}), ("int8", {}), ("binary", {})],
+)
+def test_open_restores_stored_vector_index(tmp_path, parts, kind, params):
+    chunks, embeddings, bm25 = parts
+    index = create_vector_index(embeddings, kind=kind, min_size=0, **params)
+    path = str(tmp_path / "segment")
+    Segment.write(path, chunks, embeddings, bm25, index=index)
+
+    with patch(
+        "app.services.vector_index.quantize_int8", side_effect=AssertionError
+    ), patch(
+        "app.services.vector_index.quantize_binary", side_effect=AssertionError
+    ), patch(
+        "app.services.vector_index.IVFIndex._train", side_effect=AssertionError
+    ):
+        segment = Segment.open(path)
+    assert segment.index.kind == kind
+    assert segment.index.params() == index.params()
+    for name, array in segment.index.arrays().items():
+        assert isinstance(array, np.memmap)
+        np.testing.assert_array_equal(array, index.arrays()[name])
+    query = embeddings[1:2]
+    assert segment.index.search(query, 2) == index.search(query, 2)
+
+
+def test_open_without_stored_vector_index(tmp_path, parts):
+    path = str(tmp_path / "segment")
+    Segment.write(path, *parts)
+    assert Segment.open(path).index is None
+
+
+def test_write_rejects_mismatched_parts(tmp_path, parts):
+    chunks, embeddings, bm25 = parts
+    with pytest.raises(ValueError, match="differ in length"):
+        Segment.write(str(tmp_path / "segment"), chunks, embeddings[:2], bm25)
+
+
+def test_open_rejects_other_versions(tmp_path, parts):
+    path = str(tmp_path / "segment")
+    Segment.write(path, *parts)
+    manifest_path = os.path.join(path, "segment.json")
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    manifest["segment_version"] = 0
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f)
+
+    with pytest.raises(ValueError, match="Unsupported segment version"):
+        Segment.open(path)
@@ -0,0 +1,144 @@
+import pytest
+import numpy as np
+from app.services.vector_index import (
+    BinaryIndex,
+    FlatIndex,
+    Int8Index,
+    IVFIndex,
+    create_vector_index,
+    quantize_binary,
+    quantize_int8,
+    top_k_rows,
+)
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(20, 32))
+    points = centers[rng.integers(0, 20, 2000)] + 0.3 * rng.normal(size=(2000, 32))
+    points /= np.linalg.norm(points, axis=1, keepdims=True)
+    return points.astype(np.float32)
+
+
+def exact_ids(vectors, queries, k):
+    return [
+        set(np.argsort(-(vectors @ query))[:k].tolist()) for query in queries
+    ]
+
+
+def test_top_k_rows_sorted():
+    scores = np.array([[0.1, 0.9, 0.5], [0.3, 0.2, 0.8]])
+    ids, top_scores = top_k_rows(scores, 2)
+    assert ids.tolist() == [[1, 2], [2, 0]]
+    np.testing.assert_allclose(top_scores, [[0.9, 0.5], [0.8, 0.3]])
+
+
+def test_flat_index_is_exact(vectors):
+    queries = vectors[:5]
+    results = FlatIndex(vectors).search(queries, 10)
+    assert [set(i for i, _ in r) for r in results] == exact_ids(vectors, queries, 10)
+    assert all(r[0][0] == q for q, r in enumerate(results))
+
+
+def test_ivf_full_probe_is_exact(vectors):
+    index = IVFIndex(vectors, n_lists=16, n_probe=16)
+    queries = vectors[100:105]
+    results = index.search(queries, 10)
+    assert [set(i for i, _ in r) for r in results] == exact_ids(vectors, queries, 10)
+
+
+def test_ivf_recall(vectors):
+    index = IVFIndex(vectors, n_lists=32, n_probe=4)
+    queries = vectors[:50]
+    results = index.search(queries, 10)
+    expected = exact_ids(vectors, queries, 10)
+    recall = np.mean(
+        [len(set(i for i, _ in r) & e) / 10 for r, e in zip(results, expected)]
+    )
+    assert recall > 0.8
+
+
+def test_quantize_int8_roundtrip(vectors):
+    codes, scales = quantize_int8(vectors, block=300)
+    assert codes.dtype == np.int8 and scales.shape == (vectors.shape[1],)
+    np.testing.assert_allclose(codes * scales, vectors, atol=scales.max())
+
+
+def test_quantize_binary_packs_sign_bits():
+    codes = quantize_binary(np.array([[0.5, -0.1, 0.2] + [-1.0] * 6]))
+    assert codes.tolist() == [[0b10100000, 0]]
+
+
+@pytest.mark.parametrize(
+    "index_class, min_recall", [(Int8Index, 0.95), (BinaryIndex, 0.8)]
+)
+def test_quantized_index_recall_and_exact_scores(vectors, index_class, min_recall):
+    index = index_class(vectors)
+    queries = vectors[:50]
+    results = index.search(queries, 10)
+    expected = exact_ids(vectors, queries, 10)
+    recall = np.mean(
+        [len(set(i for i, _ in r) & e) / 10 for r, e in zip(results, expected)]
+    )
+    assert recall >= min_recall
+    # Shortlisted candidates are rescored against the float vectors
+    i, score = results[3][0]
+    assert score == pytest.approx(float(vectors[i] @ queries[3]), abs=1e-5)
+
+
+def test_quantized_index_full_oversample_is_exact(vectors):
+    index = BinaryIndex(vectors, oversample=len(vectors))
+    queries = vectors[:5]
+    results = index.search(queries, 10)
+    assert [set(i for i, _ in r) for r in results] == exact_ids(vectors, queries, 10)
+
+
+def test_quantized_index_memory(vectors, tmp_path):
+    path = tmp_path / "embeddings.npy"
+    np.save(path, vectors)
+    mapped = np.load(path, mmap_mode="r")
+
+    assert FlatIndex(vectors).memory_bytes == vectors.nbytes
+    assert FlatIndex(mapped).memory_bytes == 0
+    assert Int8Index(mapped).memory_bytes < vectors.nbytes / 3
+    assert BinaryIndex(mapped).memory_bytes == vectors.nbytes / 32
+    assert (
+        create_vector_index(mapped, kind="int8", min_size=0).search(vectors[:1], 1)[0][
+            0
+        ][0]
+        == 0
+    )
+
+
+def test_hnsw_index(vectors):
+    pytest.importorskip("hnswlib")
+    index = create_vector_index(vectors, kind="hnsw", min_size=0)
+    results = index.search(vectors[:3], 5)
+    assert [r[0][0] for r in results] == [0, 1, 2]
+
+
+def test_create_vector_index_small_collections_use_flat(vectors):
+    assert isinstance(create_vector_index(vectors, kind="ivf", min_size=10000), FlatIndex)
+    assert isinstance(
+        create_vector_index(vectors, kind="ivf", min_size=0, n_lists=8), IVFIndex
+    )
+
+
+def test_create_vector_index_unknown_kind(vectors):
+    with pytest.raises(ValueError):
+        create_vector_index(vectors, kind="unknown")
+
+
+def test_ivf_index_reads_memory_mapped_vectors(vectors, tmp_path):
+    path = tmp_path / "embeddings.npy"
+    np.save(path, vectors)
+    mapped = np.load(path, mmap_mode="r")
+
+    index = IVFIndex(mapped, n_lists=16, n_probe=16)
+    # Only the centroids and list ids are held, not a copy of the vectors
+    assert index.memory_bytes < vectors.nbytes / 10
+    queries = vectors[100:105]
+    assert index.search(queries, 10) == IVFIndex(
+        vectors, n_lists=16, n_probe=16
+    ).search(queries, 10)
@@ -0,0 +1,91 @@
+from unittest.mock import patch
+from app.services.cache import LRUCache, SQLiteCache, TieredCache
+from app.services.web_cache import WebCache, normalize_query
+
+
+def test_lru_cache_expires_entries():
+    cache = LRUCache(max_items=10, ttl=60)
+    with patch("app.services.cache.time.time", return_value=1000.0):
+        cache.set("a", 1)
+    with patch("app.services.cache.time.time", return_value=1059.0):
+        assert cache.get("a") == 1
+    with patch("app.services.cache.time.time", return_value=1061.0):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_sqlite_cache_evicts_least_recently_used(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "web.sqlite3"), table="pages", max_items=2)
+    with patch("app.services.cache.time.time", return_value=1.0):
+        cache.set("a", b"1")
+    with patch("app.services.cache.time.time", return_value=2.0):
+        cache.set("b", b"2")
+    with patch("app.services.cache.time.time", return_value=3.0):
+        assert cache.get("a") == b"1"
+    with patch("app.services.cache.time.time", return_value=4.0):
+        cache.set("c", b"3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert len(cache) == 2
+
+
+def test_sqlite_cache_ignores_expired_rows(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "web.sqlite3"), ttl=10)
+    with patch("app.services.cache.time.time", return_value=100.0):
+        cache.set("a", b"1")
+    with patch("app.services.cache.time.time", return_value=105.0):
+        assert cache.get("a") == b"1"
+    with patch("app.services.cache.time.time", return_value=111.0):
+        assert cache.get("a") is None
+
+
+def test_sqlite_cache_upgrades_old_tables(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    old = SQLiteCache(path)
+    conn = old._connect()
+    conn.execute("DROP TABLE cache")
+    conn.execute("CREATE TABLE cache (key TEXT PRIMARY KEY, value BLOB)")
+    conn.execute("INSERT INTO cache VALUES ('a', x'01')")
+    conn.commit()
+    old.close()
+
+    cache = SQLiteCache(path, max_items=10)
+    assert cache.get("a") == b"\x01"
+    cache.set("b", b"\x02")
+    assert len(cache) == 2
+
+
+def test_tiered_cache_promotes_disk_hits(tmp_path):
+    path = str(tmp_path / "web.sqlite3")
+    TieredCache(path, table="results").set("q", [{"title": "t"}])
+
+    cache = TieredCache(path, table="results")
+    assert cache.get("q") == [{"title": "t"}]
+    assert cache.get("q") == [{"title": "t"}]
+    assert cache.get("missing") is None
+    stats = cache.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 1)
+
+
+def test_search_results_keyed_by_normalized_query(tmp_path):
+    cache = WebCache(path=str(tmp_path / "web.sqlite3"))
+    cache.set_search_results("  Rust  ASYNC ", 3, [{"title": "t", "link": "u"}])
+
+    assert normalize_query("  Rust  ASYNC ") == "rust async"
+    assert cache.get_search_results("rust async", 3) == [{"title": "t", "link": "u"}]
+    assert cache.get_search_results("rust async", 5) is None
+
+
+def test_page_freshness_and_conditional_headers():
+    cache = WebCache(path=None, page_fresh_seconds=60)
+    cache.set_page("https://a", "A", "text", etag='"v1"', last_modified="Mon")
+    entry = cache.get_page("https://a")
+
+    assert cache.is_fresh(entry)
+    assert cache.conditional_headers(entry) == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon",
+    }
+    entry["fetched_at"] -= 120
+    assert not cache.is_fresh(entry)
@@ -1 +1,135 @@
-# TODO: make these tests
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app.core.http import HttpClient
+from app.services.web_cache import WebCache
+from app.services.web_fetcher import WebFetcher
+import asyncio
+import pytest
+
+PAGE = "<html><head><title>Doc</title></head><body><p>Hello</p></body></html>"
+
+
+@pytest.fixture
+def requests():
+    return []
+
+
+@pytest.fixture
+def app(requests):
+    async def page(request):
+        requests.append(dict(request.headers))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.Response(
+            text=PAGE, content_type="text/html", headers={"ETag": '"v1"'}
+        )
+
+    app = web.Application()
+    app.router.add_get("/page", page)
+    return app
+
+
+def fetch_twice(app, cache):
+    async def run():
+        async with TestServer(app) as server:
+            url = str(server.make_url("/page"))
+            http = HttpClient()
+            fetcher = WebFetcher(cache=cache, http=http)
+            first = await fetcher.fetch_all([url])
+            second = await fetcher.fetch_all([url])
+            await http.close()
+            return first[url], second[url]
+
+    return asyncio.run(run())
+
+
+def test_fetch_extracts_title_and_text(app):
+    first, _ = fetch_twice(app, cache=None)
+    assert first == ("Doc", "Doc\nHello")
+
+
+def test_fresh_page_served_from_cache(app, requests):
+    first, second = fetch_twice(app, WebCache(path=None, page_fresh_seconds=60))
+    assert first == second
+    assert len(requests) == 1
+
+
+def test_stale_page_revalidated_with_etag(app, requests):
+    first, second = fetch_twice(app, WebCache(path=None, page_fresh_seconds=0))
+    assert first == second
+    assert len(requests) == 2
+    assert requests[1]["If-None-Match"] == '"v1"'
+
+
+def fetch_one(handler, **kwargs):
+    async def run():
+        app = web.Application()
+        app.router.add_get("/doc", handler)
+        async with TestServer(app) as server:
+            url = str(server.make_url("/doc"))
+            http = HttpClient()
+            fetcher = WebFetcher(http=http, **kwargs)
+            result = await fetcher.fetch_all([url])
+            await http.close()
+            return result[url]
+
+    return asyncio.run(run())
+
+
+def test_body_truncated_at_max_bytes():
+    async def handler(request):
+        return web.Response(text="a" * 200_000, content_type="text/plain")
+
+    title, text = fetch_one(handler, max_bytes=1000)
+    assert title == ""
+    assert text == "a" * 1000
+
+
+def test_non_text_content_type_skipped():
+    async def handler(request):
+        return web.Response(body=b"%PDF-1.4 ...", content_type="application/pdf")
+
+    assert fetch_one(handler) == ("", "")
+
+
+def test_untyped_body_sniffed():
+    async def binary(request):
+        return web.Response(
+            body=b"\x89PNG\r\n\x1a\n\x00\x00", content_type="application/octet-stream"
+        )
+
+    async def html(request):
+        return web.Response(body=PAGE.encode(), content_type="application/octet-stream")
+
+    assert fetch_one(binary) == ("", "")
+    assert fetch_one(html) == ("Doc", "Doc\nHello")
+
+
+def test_session_reused_and_per_host_limit():
+    in_flight = []
+    peak = []
+
+    async def handler(request):
+        in_flight.append(1)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.02)
+        in_flight.pop()
+        return web.Response(text="ok", content_type="text/plain")
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/doc", handler)
+        async with TestServer(app) as server:
+            http = HttpClient(max_per_host=2)
+            fetcher = WebFetcher(http=http)
+            urls = [str(server.make_url(f"/doc?n={i}")) for i in range(6)]
+            session = http.session()
+            results = await fetcher.fetch_all(urls)
+            assert http.session() is session
+            assert http._host_limits == {}
+            await http.close()
+            return results
+
+    results = asyncio.run(run())
+    assert all(text == "ok" for _, text in results.values())
+    assert max(peak) == 2
@@ -0,0 +1,133 @@
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from unittest.mock import patch
+from app.core.http import HttpClient
+from app.services.search_client import BraveSearchClient, StubSearchClient
+from app.services.web_fetcher import WebFetcher
+from app.services.web_search import WebSearch
+import asyncio
+import pytest
+
+
+class KeepOrderReranker:
+    def rerank(self, query, chunks, scores=None):
+        return [{"chunk": chunk, "score": 1.0} for chunk in chunks]
+
+
+@pytest.fixture
+def app():
+    def page(title, body, delay=0.0):
+        async def handler(request):
+            await asyncio.sleep(delay)
+            return web.Response(
+                text=f"<html><head><title>{title}</title></head><body>{body}</body></html>",
+                content_type="text/html",
+            )
+
+        return handler
+
+    app = web.Application()
+    app.router.add_get("/fast", page("Fast", "Rust async runtimes explained."))
+    app.router.add_get("/medium", page("Medium", "Tokio is a Rust runtime.", 0.2))
+    app.router.add_get("/slow", page("Slow", "Never arrives in time.", 5))
+    return app
+
+
+def run_search(app, document_processor, deadline):
+    async def run():
+        async with TestServer(app) as server:
+            client = StubSearchClient(
+                [
+                    {"title": name, "link": str(server.make_url(f"/{name}"))}
+                    for name in ("slow", "medium", "fast")
+                ]
+            )
+            http = HttpClient()
+            search = WebSearch(
+                client=client,
+                fetcher=WebFetcher(http=http),
+                processor=document_processor,
+                reranker=KeepOrderReranker(),
+                deadline=deadline,
+            )
+            events = [event async for event in search.stream("rust runtime")]
+            await http.close()
+            return events
+
+    return asyncio.run(run())
+
+
+def test_stream_emits_partial_results_in_arrival_order(app, document_processor):
+    events = run_search(app, document_processor, deadline=1.0)
+    statuses = [event["status"] for event in events]
+
+    assert statuses == [
+        "searching",
+        "found_results",
+        "indexing",
+        "partial",
+        "partial",
+        "fetched",
+        "completed",
+    ]
+    first_partial = events[3]
+    assert first_partial["pages"] == 1
+    assert {r["metadata"]["title"] for r in first_partial["results"]} == {"Fast"}
+
+
+def test_deadline_drops_stragglers(app, document_processor):
+    events = run_search(app, document_processor, deadline=1.0)
+    final = events[-1]
+
+    assert final["query"] == "rust runtime"
+    urls = {result["metadata"]["url"] for result in final["results"]}
+    assert not any(url.endswith("/slow") for url in urls)
+    assert {result["metadata"]["source"] for result in final["results"]} == {"web"}
+    assert {"fetch", "extract_html", "chunk", "embed"} <= set(final["timings"])
+
+
+def test_failed_page_is_skipped(app, document_processor):
+    process = document_processor.process_documents
+
+    def fail_on_tokio(content, content_type, reuse=None):
+        if b"Tokio" in content:
+            raise ValueError("Broken page")
+        return process(content, content_type, reuse)
+
+    with patch.object(
+        document_processor, "process_documents", side_effect=fail_on_tokio
+    ):
+        events = run_search(app, document_processor, deadline=1.0)
+
+    assert [event["status"] for event in events][-3:] == [
+        "partial",
+        "fetched",
+        "completed",
+    ]
+    assert events[-3]["pages"] == 1
+    assert {r["metadata"]["title"] for r in events[-1]["results"]} == {"Fast"}
+
+
+def test_brave_client_parses_web_results():
+    async def brave(request):
+        assert request.headers["X-Subscription-Token"] == "key"
+        assert request.query["q"] == "rust"
+        return web.json_response(
+            {"web": {"results": [{"title": "Rust", "url": "https://rust-lang.org"}]}}
+        )
+
+    app = web.Application()
+    app.router.add_get("/search", brave)
+
+    async def run():
+        async with TestServer(app) as server:
+            with patch(
+                "app.services.search_client.BRAVE_SEARCH_URL",
+                str(server.make_url("/search")),
+            ):
+                http = HttpClient()
+                results = await BraveSearchClient("key", http=http).search("rust", 3)
+                await http.close()
+                return results
+
+    assert asyncio.run(run()) == [{"title": "Rust", "link": "https://rust-lang.org"}]
@@ -0,0 +1,134 @@
+"""
+Benchmark columnar ChunkStore against a list of Chunks with per-chunk metadata.
+
+The list layout is the one DocumentProcessor used before: one dataclass per
+chunk, each with a copy of the document metadata (here a typical set of PDF
+metadata entries). Reports the memory each layout holds, build time, pickle
+size and time, and the time to materialize the top k chunks of a query.
+
+Usage:
+    python -m benchmarks.chunk_store --chunks 1000000 --chunk-size 400
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+import argparse
+import json
+import pickle
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.services.chunk_store import ChunkStoreBuilder
+from app.services.chunker import Chunker
+from benchmarks.data import synthetic_text
+
+PDF_METADATA = {
+    "/Author": "Jane Doe",
+    "/Creator": "Microsoft Word for Microsoft 365",
+    "/CreationDate": "D:20240105093000+01'00'",
+    "/ModDate": "D:20240105093000+01'00'",
+    "/Producer": "Microsoft Word for Microsoft 365",
+    "/Title": "Quarterly report on synthetic benchmark corpora",
+    "/Subject": "Benchmarks",
+    "/Keywords": "retrieval, chunking, memory",
+}
+
+
+@dataclass
+class DictChunk:
+    content: str
+    metadata: Dict
+    index: int
+
+
+def build_list(texts: List[str]) -> List[DictChunk]:
+    chunks = [
+        DictChunk(content=text, metadata={**PDF_METADATA, "chunk_index": i}, index=i)
+        for i, text in enumerate(texts)
+    ]
+    for chunk in chunks:
+        chunk.metadata["total_chunks"] = len(chunks)
+    return chunks
+
+
+def build_store(texts: List[str]):
+    builder = ChunkStoreBuilder()
+    doc_id = builder.add_document(dict(PDF_METADATA))
+    for text in texts:
+        builder.add(text, doc_id)
+    return builder.build()
+
+
+def run_layout(build: Callable, texts: List[str], top: np.ndarray) -> Dict:
+    tracemalloc.start()
+    start = time.perf_counter()
+    chunks = build(texts)
+    build_seconds = time.perf_counter() - start
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    if isinstance(chunks, list):
+        # The list keeps the chunk strings alive; the store copied them
+        allocated += sum(sys.getsizeof(text) for text in texts)
+
+    start = time.perf_counter()
+    payload = pickle.dumps(chunks, protocol=pickle.HIGHEST_PROTOCOL)
+    dump_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    pickle.loads(payload)
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for ids in top:
+        [chunks[i] for i in ids]
+    materialize_seconds = time.perf_counter() - start
+
+    return {
+        "memory_mb": round(allocated / 1e6, 1),
+        "build_seconds": round(build_seconds, 3),
+        "pickle_mb": round(len(payload) / 1e6, 1),
+        "pickle_dump_seconds": round(dump_seconds, 3),
+        "pickle_load_seconds": round(load_seconds, 3),
+        "materialize_us_per_query": round(materialize_seconds / len(top) * 1e6, 1),
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, default=200_000)
+    parser.add_argument("--chunk-size", type=int, default=400)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    chunker = Chunker(args.chunk_size, 0)
+    texts: List[str] = []
+    block = 0
+    while len(texts) < args.chunks:
+        words = 10_000 * args.chunk_size // 5
+        texts.extend(chunker.split_text(synthetic_text(words, seed=args.seed + block)))
+        block += 1
+    del texts[args.chunks :]
+
+    rng = np.random.default_rng(args.seed)
+    top = rng.integers(0, args.chunks, size=(args.queries, args.k))
+    print(
+        json.dumps(
+            {
+                "chunks": args.chunks,
+                "text_mb": round(sum(map(len, texts)) / 1e6, 1),
+                "results": {
+                    "list": run_layout(build_list, texts, top),
+                    "store": run_layout(build_store, texts, top),
+                },
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
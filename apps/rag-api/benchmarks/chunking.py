@@ -0,0 +1,94 @@
+"""
+Benchmark the single-pass Chunker against LangChain's RecursiveCharacterTextSplitter.
+
+Both split the same synthetic text by characters with the same separators, for
+three layouts: short paragraphs, one line per dozen words (like extracted PDF
+text) and a single run of words. LangChain only splits recursively when coarse
+pieces are too large, so the layouts exercise its fast and slow paths. Token-sized
+chunking is reported too when a tokenizer model is given.
+
+Usage:
+    python -m benchmarks.chunking --words 1000000 --chunk-size 500
+"""
+
+from typing import Callable, Dict, List
+import argparse
+import json
+import time
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from app.services.chunker import DEFAULT_SEPARATORS, Chunker
+from benchmarks.data import synthetic_text
+
+
+def layouts(n_words: int, seed: int) -> Dict[str, str]:
+    words = synthetic_text(n_words, seed=seed).split()
+    sentences = [" ".join(words[i : i + 15]) + "." for i in range(0, len(words), 15)]
+    return {
+        "paragraphs": "\n\n".join(
+            " ".join(sentences[i : i + 6]) for i in range(0, len(sentences), 6)
+        ),
+        "lines": "\n".join(
+            " ".join(words[i : i + 12]) for i in range(0, len(words), 12)
+        ),
+        "words": " ".join(words),
+    }
+
+
+def timed(split: Callable[[str], List[str]], text: str) -> Dict:
+    start = time.perf_counter()
+    chunks = split(text)
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": round(seconds, 3),
+        "mb_per_second": round(len(text) / 1e6 / seconds, 2),
+        "chunks": len(chunks),
+        "mean_chunk_chars": round(sum(map(len, chunks)) / len(chunks), 1),
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--words", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--chunk-overlap", type=int, default=50)
+    parser.add_argument("--model", default=None, help="Tokenizer for token sizing")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    langchain = RecursiveCharacterTextSplitter(
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        separators=[*DEFAULT_SEPARATORS, ""],
+    )
+    chunker = Chunker(args.chunk_size, args.chunk_overlap)
+    token_chunker = None
+    if args.model:
+        from transformers import AutoTokenizer
+
+        token_chunker = Chunker(
+            args.chunk_size // 4,
+            args.chunk_overlap // 4,
+            tokenizer=AutoTokenizer.from_pretrained(args.model),
+        )
+
+    results = {}
+    for layout, text in layouts(args.words, args.seed).items():
+        row = {
+            "text_mb": round(len(text) / 1e6, 2),
+            "langchain_chars": timed(langchain.split_text, text),
+            "chunker_chars": timed(chunker.split_text, text),
+        }
+        row["speedup"] = round(
+            row["langchain_chars"]["seconds"] / row["chunker_chars"]["seconds"], 2
+        )
+        if token_chunker is not None:
+            row["chunker_tokens"] = timed(token_chunker.split_text, text)
+        results[layout] = row
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
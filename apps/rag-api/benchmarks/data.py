@@ -0,0 +1,145 @@
+from typing import List, Tuple
+import numpy as np
+
+
+def synthetic_embeddings(
+    n_vectors: int,
+    dim: int = 768,
+    n_clusters: int = 256,
+    n_queries: int = 100,
+    noise: float = 0.5,
+    seed: int = 0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Generate clustered, L2-normalized embeddings and queries drawn near them.
+
+    Real sentence embeddings are far from uniform, so vectors are sampled around
+    random cluster centers to give approximate indexes realistic structure.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (embeddings, queries) as float32
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim)).astype(np.float32)
+    embeddings = np.empty((n_vectors, dim), dtype=np.float32)
+    # Generate in blocks to keep peak memory close to the output size
+    for start in range(0, n_vectors, 100_000):
+        stop = min(start + 100_000, n_vectors)
+        block = centers[rng.integers(0, n_clusters, stop - start)]
+        block += noise * rng.normal(size=block.shape).astype(np.float32)
+        embeddings[start:stop] = block / np.linalg.norm(block, axis=1, keepdims=True)
+
+    queries = embeddings[rng.integers(0, n_vectors, n_queries)]
+    queries = queries + noise * rng.normal(size=queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return embeddings, queries.astype(np.float32)
+
+
+def recall_at_k(approximate, exact, k: int) -> float:
+    """
+    Mean fraction of the exact top-k ids found by an approximate search.
+
+    Args:
+        approximate: Per query, (id, score) pairs from the approximate index
+        exact: Per query, (id, score) pairs from exact search
+        k: Cutoff
+    """
+    hits = [
+        len({i for i, _ in a[:k]} & {i for i, _ in e[:k]}) / k
+        for a, e in zip(approximate, exact)
+    ]
+    return float(np.mean(hits))
+
+
+def synthetic_text(n_words: int, vocabulary_size: int = 5000, seed: int = 0) -> str:
+    """
+    Generate text whose word frequencies roughly follow Zipf's law.
+
+    Returns:
+        str: Space separated words such as "w17 w3 w402"
+    """
+    rng = np.random.default_rng(seed)
+    ranks = np.minimum(rng.zipf(1.3, n_words), vocabulary_size)
+    return " ".join(f"w{rank}" for rank in ranks)
+
+
+def synthetic_pdf(n_pages: int, lines_per_page: int = 45, seed: int = 0) -> bytes:
+    """
+    Build a PDF with `n_pages` pages of text in the standard Helvetica font.
+
+    The file is written directly rather than through a PDF library, so benchmarks
+    only depend on pypdf for reading.
+
+    Returns:
+        bytes: The PDF file
+    """
+    words_per_line = 12
+    text = synthetic_text(n_pages * lines_per_page * words_per_line, seed=seed).split()
+
+    objects: List[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # Page tree, filled in once the page object ids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for page in range(n_pages):
+        lines = []
+        for line in range(lines_per_page):
+            start = (page * lines_per_page + line) * words_per_line
+            lines.append(f"({' '.join(text[start : start + words_per_line])}) Tj T*")
+        stream = ("BT /F1 10 Tf 12 TL 50 780 Td\n" + "\n".join(lines) + "\nET").encode()
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, n_pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(out)
+
+
+def synthetic_html(n_paragraphs: int = 40, seed: int = 0) -> str:
+    """
+    Build an article-like HTML page with navigation, scripts, styles and a footer.
+
+    Returns:
+        str: The HTML document
+    """
+    rng = np.random.default_rng(seed)
+    words = synthetic_text(n_paragraphs * 60, seed=seed).split()
+    nav = "".join(f'<li><a href="/section/{i}">Section {i}</a></li>' for i in range(12))
+    paragraphs = []
+    for i in range(n_paragraphs):
+        text = " ".join(words[i * 60 : (i + 1) * 60])
+        link = f'<a href="/doc/{i}">reference {i}</a>'
+        if rng.random() < 0.2:
+            paragraphs.append(f"<h2>Heading {i}</h2>")
+        paragraphs.append(f"<p>{text} &amp; <em>{link}</em> more.</p>")
+        if rng.random() < 0.1:
+            paragraphs.append(f"<script>track({i}, 'view');</script>")
+    return (
+        "<!DOCTYPE html><html><head><title>Synthetic article</title>"
+        '<meta name="description" content="A generated page">'
+        "<style>body { font-family: sans-serif; } p { margin: 0 }</style>"
+        "<script>window.analytics = [];</script></head><body>"
+        f"<nav><ul>{nav}</ul></nav><!-- main content --><article>"
+        + "".join(paragraphs)
+        + "</article><footer><p>Copyright, contact and legal links</p></footer>"
+        "</body></html>"
+    )
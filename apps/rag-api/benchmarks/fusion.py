@@ -0,0 +1,105 @@
+"""
+Benchmark vectorized rank fusion against the previous dict-based fusion.
+
+Fuses a semantic and a BM25 candidate list of the same depth, drawn from one
+corpus so that the lists partly overlap, and reports microseconds per fusion for
+each method at each depth.
+
+Usage:
+    python -m benchmarks.fusion --depths 10 100 1000 10000 --chunks 100000
+"""
+
+from typing import Dict, List, Tuple
+import argparse
+import json
+import time
+
+import numpy as np
+
+from app.services.fusion import FUSION_METHODS, Fusion
+
+
+def dict_min_max_fusion(
+    semantic: List[Tuple[int, float]], lexical: List[Tuple[int, float]], alpha=0.5
+) -> List[Tuple[int, float]]:
+    """The weighted min-max fusion Retriever used before, over (id, score) tuples."""
+
+    def normalize(results):
+        scores = [score for _, score in results]
+        low, high = min(scores), max(scores)
+        if high == low:
+            return [(i, 1.0) for i, _ in results]
+        return [(i, (score - low) / (high - low)) for i, score in results]
+
+    semantic_normalized = dict(normalize(semantic))
+    lexical_normalized = dict(normalize(lexical))
+    scores = {
+        i: alpha * semantic_normalized.get(i, 0.0)
+        + (1 - alpha) * lexical_normalized.get(i, 0.0)
+        for i in set(semantic_normalized) | set(lexical_normalized)
+    }
+    return sorted(scores.items(), key=lambda x: x[1], reverse=True)
+
+
+def candidates(n_chunks: int, depth: int, rng) -> Tuple[np.ndarray, np.ndarray]:
+    ids = rng.choice(n_chunks, size=depth, replace=False)
+    return ids, np.sort(rng.random(depth))[::-1]
+
+
+def time_per_call(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def run_depth(depth: int, n_chunks: int, repeat: int, seed: int) -> Dict:
+    rng = np.random.default_rng(seed)
+    # Draw both lists from a pool twice the depth, so about half the ids overlap
+    pool = rng.choice(n_chunks, size=min(n_chunks, 2 * depth), replace=False)
+    semantic = candidates(len(pool), depth, rng)
+    lexical = candidates(len(pool), depth, rng)
+    semantic, lexical = (pool[semantic[0]], semantic[1]), (pool[lexical[0]], lexical[1])
+    semantic_pairs = list(zip(semantic[0].tolist(), semantic[1].tolist()))
+    lexical_pairs = list(zip(lexical[0].tolist(), lexical[1].tolist()))
+
+    timings = {
+        "dict_minmax": time_per_call(
+            lambda: dict_min_max_fusion(semantic_pairs, lexical_pairs), repeat
+        )
+    }
+    for method in FUSION_METHODS:
+        fusion = Fusion(method, weights=(0.5, 0.5))
+        timings[method] = time_per_call(
+            lambda: fusion.fuse([semantic, lexical], top_k=10), repeat
+        )
+    return {
+        "depth": depth,
+        "microseconds": {name: round(t * 1e6, 1) for name, t in timings.items()},
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--depths", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(
+        json.dumps(
+            {
+                "chunks": args.chunks,
+                "results": [
+                    run_depth(depth, args.chunks, args.repeat, args.seed)
+                    for depth in args.depths
+                ],
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
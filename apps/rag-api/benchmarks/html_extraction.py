@@ -0,0 +1,67 @@
+"""
+Benchmark lxml HTML text extraction against the BeautifulSoup html.parser path.
+
+Reports documents per second for both backends on synthetic article pages, and
+the fraction of pages where the backends return the same title, description and
+text.
+
+Usage:
+    python -m benchmarks.html_extraction --pages 200 --paragraphs 40
+"""
+
+from typing import Dict, List
+import argparse
+import json
+import time
+
+from app.services.html_extractor import extract_html
+from benchmarks.data import synthetic_html
+
+
+def run_backend(pages: List[str], backend: str, repeat: int) -> Dict:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [extract_html(page, backend=backend) for page in pages]
+        best = min(best, time.perf_counter() - start)
+    return {"results": results, "seconds": best}
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--paragraphs", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    pages = [
+        synthetic_html(args.paragraphs, seed=args.seed + i) for i in range(args.pages)
+    ]
+    soup = run_backend(pages, "soup", args.repeat)
+    fast = run_backend(pages, "lxml", args.repeat)
+    matches = sum(a == b for a, b in zip(soup["results"], fast["results"]))
+
+    print(
+        json.dumps(
+            {
+                "pages": args.pages,
+                "mean_page_bytes": round(sum(map(len, pages)) / len(pages)),
+                "results": [
+                    {
+                        "backend": name,
+                        "seconds": round(result["seconds"], 3),
+                        "pages_per_second": round(args.pages / result["seconds"], 1),
+                    }
+                    for name, result in (("soup", soup), ("lxml", fast))
+                ],
+                "speedup": round(soup["seconds"] / fast["seconds"], 2),
+                "parity": round(matches / args.pages, 4),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
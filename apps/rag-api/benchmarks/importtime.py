@@ -0,0 +1,94 @@
+"""
+Measure how long a fresh interpreter takes to import the API.
+
+Runs `python -X importtime -c "import <module>"` in subprocesses, then reports
+the best wall time, the cumulative import time of the slowest modules, and which
+heavy libraries (torch, tokenizers, NLP toolkits) were imported eagerly. Worker
+cold start is bounded by this import, so none of them should show up.
+
+Usage:
+    python -m benchmarks.importtime --module app.main --repeat 5
+"""
+
+from typing import Dict, List
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = (
+    "torch",
+    "transformers",
+    "sentence_transformers",
+    "tiktoken",
+    "nltk",
+    "langchain",
+    "langchain_text_splitters",
+    "duckduckgo_search",
+    "bs4",
+)
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Map each imported module to its cumulative import time in microseconds."""
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        cumulative[name.strip()] = int(cumulative_us)
+    return cumulative
+
+
+def run_import(module: str) -> Dict:
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return {
+        "seconds": time.perf_counter() - start,
+        "modules": parse_importtime(completed.stderr),
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    runs = [run_import(args.module) for _ in range(args.repeat)]
+    best = min(runs, key=lambda run: run["seconds"])
+    modules = best["modules"]
+    top_level = {
+        name: us
+        for name, us in modules.items()
+        if "." not in name and name != "encodings"
+    }
+
+    print(
+        json.dumps(
+            {
+                "module": args.module,
+                "seconds": round(best["seconds"], 3),
+                "import_seconds": round(modules.get(args.module, 0) / 1e6, 3),
+                "slowest": [
+                    {"module": name, "seconds": round(us / 1e6, 3)}
+                    for name, us in sorted(
+                        top_level.items(), key=lambda item: item[1], reverse=True
+                    )[: args.top]
+                ],
+                "heavy_imported": [name for name in HEAVY_MODULES if name in modules],
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
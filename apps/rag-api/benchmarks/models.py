@@ -0,0 +1,63 @@
+"""
+Local stand-ins for the embedding model and cross-encoder.
+
+They have the interface the services use but no weights, so the pipeline
+benchmark runs offline and measures everything except model inference. Their
+scores are not meaningful for ranking quality.
+"""
+
+from functools import lru_cache
+from typing import List, Sequence
+import zlib
+
+import numpy as np
+
+EMBEDDING_MODEL = "local/hashing-encoder"
+RERANKER_MODEL = "local/overlap-reranker"
+
+
+@lru_cache(maxsize=1 << 20)
+def _token_hash(token: str) -> int:
+    return zlib.crc32(token.encode())
+
+
+class HashingEncoder:
+    """
+    Embeds text as a hashed bag of words, like a SentenceTransformer.
+
+    Attributes:
+        dim (int): Embedding dimension
+        max_seq_length (int): Reported sequence limit
+    """
+
+    def __init__(self, dim: int = 384, max_seq_length: int = 512):
+        self.dim = dim
+        self.max_seq_length = max_seq_length
+
+    def encode(
+        self, texts: Sequence[str], normalize_embeddings: bool = False, **kwargs
+    ) -> np.ndarray:
+        rows: List[int] = []
+        columns: List[int] = []
+        for i, text in enumerate(texts):
+            hashes = [_token_hash(token) for token in text.lower().split()]
+            rows.extend([i] * len(hashes))
+            columns.extend(hashes)
+        embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(embeddings, (rows, np.array(columns, dtype=np.int64) % self.dim), 1)
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.maximum(norms, 1e-12)
+        return embeddings
+
+
+class OverlapCrossEncoder:
+    """Scores (query, text) pairs by the fraction of query words in the text."""
+
+    def predict(self, sentence_pairs: Sequence[Sequence[str]], **kwargs) -> np.ndarray:
+        scores = []
+        for query, text in sentence_pairs:
+            query_words = set(query.lower().split())
+            text_words = set(text.lower().split())
+            scores.append(len(query_words & text_words) / max(len(query_words), 1))
+        return np.array(scores, dtype=np.float32)
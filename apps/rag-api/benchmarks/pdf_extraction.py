@@ -0,0 +1,101 @@
+"""
+Benchmark parallel PDF page extraction against the serial path.
+
+Reports wall time and pages per second for serial extraction and for process pools
+of increasing size, and checks that every configuration returns the same text.
+
+Usage:
+    python -m benchmarks.pdf_extraction --pages 500 --workers 1 2 4 8
+"""
+
+from typing import Dict, List
+import argparse
+import json
+import time
+
+from app.core.executor import Executor
+from app.services.pdf_extractor import iter_pdf_pages, iter_pdf_pages_parallel
+from benchmarks.data import synthetic_pdf
+
+
+def _noop() -> None:
+    pass
+
+
+def run_serial(file_content: bytes) -> Dict:
+    start = time.perf_counter()
+    _, pages = iter_pdf_pages(file_content)
+    texts = [text for _, text in pages]
+    return {"texts": texts, "seconds": time.perf_counter() - start}
+
+
+def run_parallel(file_content: bytes, workers: int, pages_per_task: int) -> Dict:
+    executor = Executor(thread_workers=1, process_workers=workers)
+    try:
+        # Start the worker processes outside the timed region
+        start = time.perf_counter()
+        for future in [executor.submit_process(_noop) for _ in range(workers)]:
+            future.result()
+        startup_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        _, pages = iter_pdf_pages_parallel(
+            file_content,
+            executor,
+            workers=workers,
+            pages_per_task=pages_per_task,
+            min_pages=0,
+        )
+        texts = [text for _, text in pages]
+        seconds = time.perf_counter() - start
+    finally:
+        executor.shutdown()
+    return {"texts": texts, "seconds": seconds, "startup_seconds": startup_seconds}
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--pages-per-task", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    file_content = synthetic_pdf(args.pages, seed=args.seed)
+    serial = run_serial(file_content)
+    rows = [
+        {
+            "mode": "serial",
+            "seconds": round(serial["seconds"], 3),
+            "pages_per_second": round(args.pages / serial["seconds"], 1),
+        }
+    ]
+    for workers in args.workers:
+        result = run_parallel(file_content, workers, args.pages_per_task)
+        rows.append(
+            {
+                "mode": "parallel",
+                "workers": workers,
+                "seconds": round(result["seconds"], 3),
+                "startup_seconds": round(result["startup_seconds"], 3),
+                "pages_per_second": round(args.pages / result["seconds"], 1),
+                "speedup": round(serial["seconds"] / result["seconds"], 2),
+                "matches_serial": result["texts"] == serial["texts"],
+            }
+        )
+
+    print(
+        json.dumps(
+            {
+                "pages": args.pages,
+                "file_bytes": len(file_content),
+                "pages_per_task": args.pages_per_task,
+                "results": rows,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+"""
+Benchmark the retrieval pipeline end to end and compare runs against a baseline.
+
+Generated PDFs and HTML pages go through DocumentProcessor, and synthetic
+corpora of 1k, 100k or 1M chunks are chunked, embedded, indexed and queried.
+Every stage reports its wall time, throughput and peak RSS; queries report
+latency percentiles. With `--offline`, hashing and word-overlap stand-ins
+replace the embedding model and cross-encoder, so the run needs no downloads and
+measures everything except model inference.
+
+Each benchmark runs `--repeat` times and the best figure of the runs is kept,
+which leaves out cold caches and most noise from other processes. Results are
+printed as JSON and can be saved with `--output`. Given `--baseline`,
+every throughput, latency, time and memory figure is compared with the same
+figure of a previous run, and the process exits with status 1 if any got worse
+by more than `--tolerance`.
+
+Usage:
+    python -m benchmarks.pipeline --offline --scales 1k 100k --output run.json
+    python -m benchmarks.pipeline --offline --scales 1k 100k --baseline run.json
+"""
+
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import sys
+import time
+
+import numpy as np
+import structlog
+
+from app.core.config import DEFAULT_EMBEDDING_MODEL, DEFAULT_RERANKER_MODEL
+from app.core.metrics import request_timings
+from app.services.analyzer import Analyzer
+from app.services.bm25 import SparseBM25
+from app.services.chunker import Chunker
+from app.services.chunk_store import ChunkStoreBuilder
+from app.services.document_processor import DocumentProcessor
+from app.services.embedding_cache import EmbeddingCache
+from app.services.model_registry import ModelRegistry, model_registry
+from app.services.reranker import Reranker
+from app.services.retriever import Retriever
+from app.services.vector_index import VECTOR_INDEXES, create_vector_index
+from benchmarks import models
+from benchmarks.data import synthetic_html, synthetic_pdf, synthetic_text
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+# Chunks generated and split per block, so the corpus text is never held at once
+BLOCK_CHUNKS = 10_000
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset the peak resident set size of this process, where Linux allows it.
+
+    Returns:
+        bool: Whether peaks are measured per stage rather than per process
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size since the last reset, or since the process started."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1e3
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+@contextmanager
+def measure(row: Dict, items: Optional[int] = None, unit: str = "items") -> Iterator:
+    """Record wall time, throughput and peak RSS of the block into `row`."""
+    reset_peak_rss()
+    start = time.perf_counter()
+    yield row
+    seconds = time.perf_counter() - start
+    row["seconds"] = round(seconds, 4)
+    if items is not None:
+        row[f"{unit}_per_second"] = round(items / max(seconds, 1e-9), 1)
+    row["peak_rss_mb"] = round(peak_rss_mb(), 1)
+
+
+def latency_percentiles(latencies: List[float]) -> Dict:
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        f"latency_ms_p{p}": round(float(np.percentile(latencies_ms, p)), 3)
+        for p in (50, 95, 99)
+    }
+
+
+def bench_documents(args, processor: DocumentProcessor) -> Dict:
+    pdf = synthetic_pdf(args.pdf_pages, seed=args.seed)
+    pdf_row = {"pages": args.pdf_pages, "mb": round(len(pdf) / 1e6, 2)}
+    with request_timings() as timings, measure(pdf_row, args.pdf_pages, "pages"):
+        chunks, _, _ = processor.process_documents(pdf, "application/pdf")
+    pdf_row.update(chunks=len(chunks), timings=timings.as_dict())
+
+    pages = [
+        synthetic_html(args.html_paragraphs, seed=args.seed + i).encode()
+        for i in range(args.html_pages)
+    ]
+    html_row = {"pages": args.html_pages, "mb": round(sum(map(len, pages)) / 1e6, 2)}
+    chunk_count = 0
+    with request_timings() as timings, measure(html_row, args.html_pages, "pages"):
+        for page in pages:
+            chunk_count += len(processor.process_documents(page, "text/html")[0])
+    html_row.update(chunks=chunk_count, timings=timings.as_dict())
+    return {"pdf": pdf_row, "html": html_row}
+
+
+def bench_scale(args, n_chunks: int, embedding_model, reranker: Reranker) -> Dict:
+    chunker = Chunker(args.chunk_size, args.chunk_overlap)
+    # Words of about 4 characters plus a space
+    words_per_block = BLOCK_CHUNKS * args.chunk_size // 5
+    texts: List[str] = []
+    chunk_row = {}
+    chunk_seconds = 0.0
+    block = 0
+    reset_peak_rss()
+    while len(texts) < n_chunks:
+        text = synthetic_text(words_per_block, seed=args.seed + block)
+        start = time.perf_counter()
+        texts.extend(chunker.split_text(text))
+        chunk_seconds += time.perf_counter() - start
+        block += 1
+    del texts[n_chunks:]
+    chunk_row.update(
+        seconds=round(chunk_seconds, 4),
+        chunks_per_second=round(n_chunks / chunk_seconds, 1),
+        peak_rss_mb=round(peak_rss_mb(), 1),
+    )
+
+    embed_row, analyze_row, bm25_row, index_row = {}, {}, {}, {}
+    with measure(embed_row, n_chunks, "chunks"):
+        embeddings = np.concatenate(
+            [
+                embedding_model.encode(
+                    texts[i : i + args.batch_size], normalize_embeddings=True
+                )
+                for i in range(0, n_chunks, args.batch_size)
+            ]
+        ).astype(np.float32)
+    analyzer = Analyzer()
+    with measure(analyze_row, n_chunks, "chunks"):
+        tokenized = analyzer.analyze_many(texts)
+    with measure(bm25_row, n_chunks, "chunks"):
+        bm25 = SparseBM25(tokenized)
+    del tokenized
+    with measure(index_row, n_chunks, "chunks"):
+        index = create_vector_index(embeddings, kind=args.index)
+    index_row.update(kind=index.kind, memory_mb=round(index.memory_bytes / 1e6, 1))
+
+    builder = ChunkStoreBuilder()
+    doc_id = builder.add_document({})
+    for text in texts:
+        builder.add(text, doc_id)
+    chunks = builder.build()
+    rng = np.random.default_rng(args.seed)
+    queries = []
+    for i in rng.integers(0, n_chunks, args.queries):
+        words = texts[i].split()
+        start = rng.integers(0, max(1, len(words) - 6))
+        queries.append(" ".join(words[start : start + 6]))
+
+    retriever = Retriever(embedding_model, analyzer=analyzer)
+    query_row, rerank_row = {"queries": len(queries)}, {"queries": len(queries)}
+    latencies, candidates = [], []
+    with measure(query_row, len(queries), "queries"):
+        for query in queries:
+            start = time.perf_counter()
+            candidates.append(
+                retriever.retrieve(query, chunks, index, bm25, top_k=args.candidates)
+            )
+            latencies.append(time.perf_counter() - start)
+    query_row.update(latency_percentiles(latencies))
+
+    latencies = []
+    with measure(rerank_row, len(queries), "queries"):
+        for query, results in zip(queries, candidates):
+            start = time.perf_counter()
+            reranker.rerank(
+                query,
+                [result["chunk"] for result in results],
+                [result["score"] for result in results],
+            )
+            latencies.append(time.perf_counter() - start)
+    rerank_row.update(latency_percentiles(latencies))
+
+    return {
+        "chunks": n_chunks,
+        "chunk": chunk_row,
+        "embed": embed_row,
+        "analyze": analyze_row,
+        "bm25": bm25_row,
+        "vector_index": index_row,
+        "query": query_row,
+        "rerank": rerank_row,
+    }
+
+
+def flatten(results: Dict, prefix: str = "") -> Dict[str, float]:
+    """Map dotted paths such as "scales.1k.query.latency_ms_p95" to numbers."""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def _higher_is_better(metric: str) -> Optional[bool]:
+    name = metric.rsplit(".", 1)[-1]
+    if name.endswith("_per_second"):
+        return True
+    if name in ("seconds", "peak_rss_mb", "memory_mb") or name.startswith("latency_ms"):
+        return False
+    return None
+
+
+def best_of(runs: List[Dict]) -> Dict:
+    """Merge runs, keeping the best value of each figure and the first of the rest."""
+    merged = {}
+    for key, value in runs[0].items():
+        values = [run[key] for run in runs]
+        direction = _higher_is_better(key)
+        if isinstance(value, dict) and key != "timings":
+            merged[key] = best_of(values)
+        elif direction is None:
+            merged[key] = value
+        else:
+            merged[key] = max(values) if direction else min(values)
+    return merged
+
+
+def compare(
+    results: Dict, baseline: Dict, tolerance: float, min_seconds: float = 0.01
+) -> Dict:
+    """
+    Compare the throughput, latency, time and memory figures of two runs.
+
+    Stage timings inside `timings` are left out, since they are not independent
+    of the stage totals, and so are figures of stages too short to time reliably.
+    Figures present in only one run are skipped.
+
+    Args:
+        results: The current run
+        baseline: A previous run with the same options
+        tolerance: Relative change beyond which a worse figure is a regression
+        min_seconds: Stages that took less than this in the baseline are skipped
+
+    Returns:
+        dict: Every compared figure, and the subset that regressed
+    """
+    current, previous = flatten(results), flatten(baseline)
+    changes = []
+    for metric, value in current.items():
+        higher_is_better = _higher_is_better(metric)
+        stage_seconds = previous.get(f"{metric.rsplit('.', 1)[0]}.seconds", min_seconds)
+        if (
+            higher_is_better is None
+            or ".timings." in metric
+            or not previous.get(metric)
+            or stage_seconds < min_seconds
+        ):
+            continue
+        change = value / previous[metric] - 1
+        worse = -change if higher_is_better else change
+        changes.append(
+            {
+                "metric": metric,
+                "baseline": previous[metric],
+                "current": value,
+                "change": round(change, 4),
+                "regression": worse > tolerance,
+            }
+        )
+    return {
+        "tolerance": tolerance,
+        "changes": changes,
+        "regressions": [change["metric"] for change in changes if change["regression"]],
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", nargs="+", choices=SCALES, default=["1k"])
+    parser.add_argument("--offline", action="store_true", help="Use stand-in models")
+    parser.add_argument("--embedding-model", default=DEFAULT_EMBEDDING_MODEL)
+    parser.add_argument("--reranker-model", default=DEFAULT_RERANKER_MODEL)
+    parser.add_argument("--index", choices=VECTOR_INDEXES, default="flat")
+    parser.add_argument("--chunk-size", type=int, default=400, help="Characters")
+    parser.add_argument("--chunk-overlap", type=int, default=40)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--pdf-pages", type=int, default=200)
+    parser.add_argument("--html-pages", type=int, default=100)
+    parser.add_argument("--html-paragraphs", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Also write results here")
+    parser.add_argument("--baseline", default=None, help="Results of a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument("--min-seconds", type=float, default=0.01)
+    args = parser.parse_args(argv)
+
+    # Per-call service logs would dominate query latency and mix with the output
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING)
+    )
+    if args.offline:
+        args.embedding_model = models.EMBEDDING_MODEL
+        args.reranker_model = models.RERANKER_MODEL
+        model_registry.register(
+            ModelRegistry.EMBEDDING, args.embedding_model, models.HashingEncoder()
+        )
+        model_registry.register(
+            ModelRegistry.CROSS_ENCODER,
+            args.reranker_model,
+            models.OverlapCrossEncoder(),
+        )
+
+    reranker = Reranker(args.reranker_model)
+    documents, scales = [], []
+    for _ in range(args.repeat):
+        # A fresh cache per run, so that later runs embed every chunk again
+        processor = DocumentProcessor(
+            args.embedding_model,
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.chunk_overlap,
+            chunk_unit="chars",
+            embedding_cache=EmbeddingCache(path=None),
+        )
+        documents.append(bench_documents(args, processor))
+        scales.append(
+            {
+                scale: bench_scale(args, SCALES[scale], processor.model, reranker)
+                for scale in args.scales
+            }
+        )
+
+    results = {
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "peak_rss_scope": "stage" if reset_peak_rss() else "process",
+        },
+        "options": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("output", "baseline", "tolerance", "min_seconds")
+        },
+        "documents": best_of(documents),
+        "scales": best_of(scales),
+    }
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            results["comparison"] = compare(
+                results, json.load(f), args.tolerance, args.min_seconds
+            )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+    if args.baseline and results["comparison"]["regressions"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark int8 and binary quantized indexes against exact float32 search.
+
+The float embeddings are written to an .npy file and memory-mapped, the way
+IndexStore loads collections, so quantized indexes only keep their codes in RAM
+and rescore shortlists from the file. Reports resident memory, build time,
+per-query latency and recall@k for each oversampling factor.
+
+Usage:
+    python -m benchmarks.quantization --vectors 200000 --dim 768 --k 10
+"""
+
+from typing import Dict, List
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from app.services.vector_index import VECTOR_INDEXES, FlatIndex
+from benchmarks.data import recall_at_k, synthetic_embeddings
+
+CONFIGS = [
+    ("int8", {"oversample": 1}),
+    ("int8", {"oversample": 2}),
+    ("int8", {"oversample": 4}),
+    ("binary", {"oversample": 4}),
+    ("binary", {"oversample": 10}),
+    ("binary", {"oversample": 25}),
+]
+
+
+def run_config(embeddings, queries, k, kind, params, exact) -> Dict:
+    start = time.perf_counter()
+    index = VECTOR_INDEXES[kind](embeddings, **params)
+    build_seconds = time.perf_counter() - start
+
+    latencies = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        results.extend(index.search(query, k))
+        latencies.append(time.perf_counter() - start)
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "kind": kind,
+        "params": params,
+        "memory_mb": round(index.memory_bytes / 1e6, 2),
+        "build_seconds": round(build_seconds, 3),
+        "latency_ms_p50": round(float(np.percentile(latencies_ms, 50)), 3),
+        "latency_ms_p99": round(float(np.percentile(latencies_ms, 99)), 3),
+        f"recall@{k}": round(recall_at_k(results, exact, k) if exact else 1.0, 4),
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vectors", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    embeddings, queries = synthetic_embeddings(
+        args.vectors, args.dim, n_queries=args.queries, seed=args.seed
+    )
+    exact = FlatIndex(embeddings).search(queries, args.k)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "embeddings.npy")
+        np.save(path, embeddings)
+        mapped = np.load(path, mmap_mode="r")
+        rows = [run_config(embeddings, queries, args.k, "flat", {}, exact=None)] + [
+            run_config(mapped, queries, args.k, kind, params, exact)
+            for kind, params in CONFIGS
+        ]
+        del mapped
+
+    print(
+        json.dumps(
+            {
+                "vectors": args.vectors,
+                "dim": args.dim,
+                "queries": args.queries,
+                "k": args.k,
+                "results": rows,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
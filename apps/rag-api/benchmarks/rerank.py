@@ -0,0 +1,146 @@
+"""
+Benchmark reranking policies: cross-encoder latency against ranking quality.
+
+Candidates for each query are the top BM25 matches over a chunked corpus, with
+their BM25 scores standing in for fused retrieval scores. Every policy reranks
+the same candidates; quality is measured against reranking all candidates at
+full length, as top-1 agreement and overlap of the top k results.
+
+Synthetic text gives meaningful latencies only; pass `--corpus` with a real text
+file for meaningful quality numbers.
+
+Usage:
+    python -m benchmarks.rerank --queries 50 --candidates 30 --corpus docs.txt
+"""
+
+from typing import Dict, List
+import argparse
+import json
+import time
+
+import numpy as np
+
+from app.services.analyzer import Analyzer
+from app.services.bm25 import SparseBM25
+from app.services.chunker import Chunker
+from app.services.document_processor import Chunk
+from app.services.reranker import Reranker, RerankPolicy
+from benchmarks.data import synthetic_text
+
+POLICIES = {
+    "full": {},
+    "max_candidates=10": {"max_candidates": 10},
+    "max_tokens=128": {"max_tokens": 128},
+    "skip_margin=0.3": {"skip_margin": 0.3},
+    "combined": {"max_candidates": 10, "max_tokens": 128, "skip_margin": 0.3},
+}
+
+
+def build_queries(
+    text: str, n_queries: int, n_candidates: int, chunk_size: int, seed: int
+) -> List[Dict]:
+    chunks = [
+        Chunk(content=content, metadata={}, index=i)
+        for i, content in enumerate(Chunker(chunk_size, 0).split_text(text))
+    ]
+    analyzer = Analyzer()
+    bm25 = SparseBM25(analyzer.analyze_many(chunk.content for chunk in chunks))
+
+    rng = np.random.default_rng(seed)
+    queries = []
+    for i in rng.choice(len(chunks), size=n_queries, replace=False):
+        words = chunks[i].content.split()
+        start = rng.integers(0, max(1, len(words) - 6))
+        query = " ".join(words[start : start + 6])
+        candidates = bm25.top_k(analyzer.analyze(query), n_candidates)
+        queries.append(
+            {
+                "query": query,
+                "chunks": [chunks[c] for c, _ in candidates],
+                "scores": [score for _, score in candidates],
+            }
+        )
+    return queries
+
+
+def run_policy(model: str, policy: RerankPolicy, queries: List[Dict]) -> Dict:
+    reranker = Reranker(model, policy=policy)
+    latencies, rankings = [], []
+    for q in queries:
+        start = time.perf_counter()
+        ranking = reranker.rerank(q["query"], q["chunks"], q["scores"])
+        latencies.append(time.perf_counter() - start)
+        rankings.append([result["chunk"].index for result in ranking])
+    return {"latencies": np.array(latencies), "rankings": rankings}
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default="jinaai/jina-reranker-v2-base-multilingual")
+    parser.add_argument("--corpus", default=None, help="Text file to chunk")
+    parser.add_argument("--words", type=int, default=50_000)
+    parser.add_argument("--chunk-size", type=int, default=800)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--candidates", type=int, default=30)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        with open(args.corpus, encoding="utf-8") as f:
+            text = f.read()
+    else:
+        text = synthetic_text(args.words, seed=args.seed)
+    queries = build_queries(
+        text, args.queries, args.candidates, args.chunk_size, args.seed
+    )
+
+    # Load the model and tokenizer before timing
+    Reranker(args.model).rerank(queries[0]["query"], queries[0]["chunks"][:1])
+
+    runs = {
+        name: run_policy(args.model, RerankPolicy(**params), queries)
+        for name, params in POLICIES.items()
+    }
+    reference = runs["full"]["rankings"]
+    results = []
+    for name, run in runs.items():
+        overlap = [
+            len(set(ranking[: args.k]) & set(full[: args.k])) / min(args.k, len(full))
+            for ranking, full in zip(run["rankings"], reference)
+            if full
+        ]
+        results.append(
+            {
+                "policy": name,
+                "mean_ms": round(1000 * run["latencies"].mean(), 2),
+                "p95_ms": round(1000 * np.percentile(run["latencies"], 95), 2),
+                "top1_agreement": round(
+                    float(
+                        np.mean(
+                            [
+                                bool(r) and bool(f) and r[0] == f[0]
+                                for r, f in zip(run["rankings"], reference)
+                            ]
+                        )
+                    ),
+                    3,
+                ),
+                f"overlap_at_{args.k}": round(float(np.mean(overlap)), 3),
+            }
+        )
+
+    print(
+        json.dumps(
+            {
+                "queries": len(queries),
+                "candidates": args.candidates,
+                "results": results,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Benchmark loading a collection from memory-mapped segment files.
+
+A synthetic collection is written once as a Segment, then opened three ways:
+memory-mapped (how IndexStore loads it), read into memory, and, for
+comparison with the previous format, from a compressed BM25 .npz whose weights
+are recomputed on load plus a fully read embedding matrix. Then `--workers`
+spawned processes open the segment at the same time and query it; their
+proportional set size (Pss) shows how much of their resident memory is shared
+page cache rather than a private copy per worker.
+
+Usage:
+    python -m benchmarks.segment_load --chunks 200000 --dim 768 --workers 4
+"""
+
+from typing import Dict, List, Optional
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+
+import numpy as np
+import structlog
+
+from app.services.bm25 import SparseBM25
+from app.services.chunk_store import ChunkStoreBuilder
+from app.services.chunker import Chunker
+from app.services.segment import Segment
+from benchmarks.data import synthetic_embeddings, synthetic_text
+
+QUERIES = [["w1", "w20"], ["w300", "w4000", "w7"], ["w55"]]
+
+
+def build_segment(path: str, n_chunks: int, dim: int, chunk_size: int) -> None:
+    chunker = Chunker(chunk_size, 0)
+    builder = ChunkStoreBuilder()
+    doc_id = builder.add_document({"title": "Synthetic corpus"})
+    tokenized: List[List[str]] = []
+    block = 0
+    while len(builder) < n_chunks:
+        text = synthetic_text(10_000 * chunk_size // 5, seed=block)
+        for chunk in chunker.split_text(text)[: n_chunks - len(builder)]:
+            builder.add(chunk, doc_id)
+            tokenized.append(chunk.split())
+        block += 1
+    embeddings, _ = synthetic_embeddings(n_chunks, dim, n_queries=1)
+    Segment.write(path, builder.build(), embeddings, SparseBM25(tokenized))
+
+
+def memory_mb() -> Dict[str, float]:
+    """Rss and Pss of this process from /proc/self/smaps_rollup, in MB."""
+    usage = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("Rss", "Pss"):
+                usage[key.lower() + "_mb"] = int(value.split()[0]) / 1024
+    return usage
+
+
+def query(segment: Segment) -> None:
+    """Touch every page of the segment the way a full scan would."""
+    vector = np.asarray(segment.embeddings[0], dtype=np.float32)
+    segment.embeddings @ vector
+    segment.bm25.get_scores_many(QUERIES)
+    int(segment.chunks.buffer.sum())
+
+
+def worker(path: str, mmap_mode: Optional[str], barrier, results) -> None:
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING)
+    )
+    before = memory_mb()
+    segment = Segment.open(path, mmap_mode=mmap_mode)
+    query(segment)
+    # Measure while every worker holds the segment, so shared pages are split
+    barrier.wait()
+    after = memory_mb()
+    results.put({key: after[key] - before[key] for key in after})
+    barrier.wait()
+
+
+def run_workers(path: str, mmap_mode: Optional[str], n_workers: int) -> Dict:
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(n_workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(path, mmap_mode, barrier, results))
+        for _ in range(n_workers)
+    ]
+    for process in processes:
+        process.start()
+    usage = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return {key: round(sum(u[key] for u in usage) / n_workers, 1) for key in usage[0]}
+
+
+def time_load(load, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load()
+        best = min(best, time.perf_counter() - start)
+    return round(best, 4)
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--chunk-size", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING)
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "segment")
+        build_segment(path, args.chunks, args.dim, args.chunk_size)
+        segment = Segment.open(path)
+        npz_path = os.path.join(tmp_dir, "bm25.npz")
+        segment.bm25.save(npz_path)
+        embeddings_path = os.path.join(path, "embeddings.npy")
+
+        def load_npz():
+            SparseBM25.load(npz_path)
+            np.load(embeddings_path)
+
+        size = sum(
+            os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)
+        )
+        load_seconds = {
+            "mmap": time_load(lambda: Segment.open(path), args.repeat),
+            "copy": time_load(lambda: Segment.open(path, mmap_mode=None), args.repeat),
+            "npz_recompute": time_load(load_npz, args.repeat),
+        }
+        workers = {
+            "mmap": run_workers(path, "r", args.workers),
+            "copy": run_workers(path, None, args.workers),
+        }
+
+    print(
+        json.dumps(
+            {
+                "chunks": args.chunks,
+                "dim": args.dim,
+                "segment_mb": round(size / 1e6, 1),
+                "load_seconds": load_seconds,
+                "workers": args.workers,
+                "per_worker_memory": workers,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
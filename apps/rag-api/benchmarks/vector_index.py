@@ -0,0 +1,89 @@
+"""
+Benchmark approximate vector indexes against exact flat search.
+
+Reports build time, per-query latency and recall@k for each backend configuration.
+
+Usage:
+    python -m benchmarks.vector_index --vectors 200000 --dim 768 --k 10
+"""
+
+from typing import Dict, List
+import argparse
+import json
+import time
+
+import numpy as np
+
+from app.services.vector_index import VECTOR_INDEXES, FlatIndex
+from benchmarks.data import recall_at_k, synthetic_embeddings
+
+CONFIGS = [
+    ("ivf", {"n_probe": 4}),
+    ("ivf", {"n_probe": 16}),
+    ("ivf", {"n_probe": 64}),
+    ("hnsw", {"ef_search": 32}),
+    ("hnsw", {"ef_search": 128}),
+]
+
+
+def run_config(embeddings, queries, k, kind, params, exact) -> Dict:
+    start = time.perf_counter()
+    try:
+        index = VECTOR_INDEXES[kind](embeddings, **params)
+    except ImportError as e:
+        return {"kind": kind, "params": params, "skipped": str(e)}
+    build_seconds = time.perf_counter() - start
+
+    latencies = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        results.extend(index.search(query, k))
+        latencies.append(time.perf_counter() - start)
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "kind": kind,
+        "params": params,
+        "build_seconds": round(build_seconds, 3),
+        "latency_ms_p50": round(float(np.percentile(latencies_ms, 50)), 3),
+        "latency_ms_p99": round(float(np.percentile(latencies_ms, 99)), 3),
+        f"recall@{k}": round(recall_at_k(results, exact, k) if exact else 1.0, 4),
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vectors", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    embeddings, queries = synthetic_embeddings(
+        args.vectors, args.dim, n_queries=args.queries, seed=args.seed
+    )
+
+    flat = run_config(embeddings, queries, args.k, "flat", {}, exact=None)
+    exact = FlatIndex(embeddings).search(queries, args.k)
+    rows = [flat] + [
+        run_config(embeddings, queries, args.k, kind, params, exact)
+        for kind, params in CONFIGS
+    ]
+    print(
+        json.dumps(
+            {
+                "vectors": args.vectors,
+                "dim": args.dim,
+                "queries": args.queries,
+                "k": args.k,
+                "results": rows,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()